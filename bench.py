@@ -0,0 +1,1376 @@
+"""Headless benchmarks for the data and rendering hot paths.
+
+    python bench.py [-o results.json] [--compare baseline.json]
+                    [--threshold 0.25] [-k substring] [--quick]
+
+Runs on any platform: only the core package is imported, against a scratch
+copy of data/ so the real profile is never touched. Results are written as
+JSON: seconds per call, plus peak RSS growth for the decode benchmarks, peak
+traced allocations for the page parsers and the number of files written for
+menu.tick.hour. With --compare, every
+benchmark whose median time (or peak RSS) grew past the baseline by more
+than --threshold, or that writes more files, is reported and the exit
+status is 1, so a stored baseline can gate changes to the menu loop.
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import timeit
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+# Stand-in dashboard process used by the launch benchmarks
+STAND_IN_FLAG = "--stand-in-dashboard"
+# Child process that decodes one picture and reports its peak RSS growth
+RSS_PROBE_FLAG = "--rss-probe"
+# Child process that builds the dashboard on the GUI stubs
+DASHBOARD_PROBE_FLAG = "--dashboard-probe"
+BENCHMARKS = []
+
+
+def benchmark(name):
+    def register(fn):
+        BENCHMARKS.append((name, fn))
+        return fn
+    return register
+
+
+class Skip(Exception):
+    """Raised by a benchmark that cannot run here (e.g. Pillow is missing)."""
+
+
+def measure(fn, repeat=5, min_time=0.2):
+    """Time fn() like timeit: autorange the loop count, then repeat."""
+    timer = timeit.Timer(fn)
+    loops, _ = timer.autorange()
+    loops = max(1, int(loops * min_time / 0.2))
+    runs = [t / loops for t in timer.repeat(repeat=repeat, number=loops)]
+    return {"best": min(runs), "median": statistics.median(runs),
+            "loops": loops, "repeat": repeat}
+
+
+def measure_once(fn, repeat=5):
+    """Time fn() once per run, for benchmarks too slow or stateful to loop."""
+    runs = [fn() for _ in range(repeat)]
+    return {"best": min(runs), "median": statistics.median(runs),
+            "loops": 1, "repeat": repeat}
+
+
+# --- Reference implementations (the pre-core code, kept for comparison) ---
+LEGACY_LEVEL_THRESHOLDS = [
+    (1, 99, 60), (100, 199, 90), (200, 299, 450), (300, 399, 900),
+    (400, 499, 1350), (500, 599, 1800), (600, 699, 2250), (700, 799, 2700),
+    (800, 899, 3150), (900, 999, 3600),
+]
+
+
+def legacy_calculate_level(points):
+    level = 1
+    total = 0
+    for start, end, inc in LEGACY_LEVEL_THRESHOLDS:
+        for _ in range(start, end + 1):
+            if total + inc > points:
+                return level, points - total, inc
+            total += inc
+            level += 1
+    return 999, points, 1
+
+
+def legacy_tick(paths, make_circle_icon):
+    """One refresh_menu() pass as the menu bar did it on every timer tick."""
+    from core.levels import calculate_points
+    with open(paths.CONFIG_JSON) as f:
+        config = json.load(f)
+    with open(paths.TROPHY_CSV, newline='') as f:
+        trophies = next(csv.DictReader(f))
+    points = calculate_points(trophies)
+    level, current, required = legacy_calculate_level(points)
+    percent = int((current / required) * 100) if required else 100
+    trophy_total = sum(int(trophies[t]) for t in trophies)
+    subtitle = f"{config['username']} | Lv. {level} | {percent}% | {trophy_total} trophies"
+    icon = make_circle_icon(config.get("profile_path") or
+                            os.path.join(paths.DATA_DIR, "menu_icon.png"),
+                            os.path.join(paths.DATA_DIR, "temp_profile_icon.png"))
+    return subtitle, icon
+
+
+# Points spread over every tier, so both level implementations see the
+# same mix of cheap and expensive lookups
+LEVEL_SAMPLE = [0, 59, 6000, 30000, 120000, 450000, 900000, 1500000, 2200000, 10 ** 7]
+
+
+def source_image(tmp, px):
+    from PIL import Image
+    path = os.path.join(tmp, f"source-{px}.png")
+    if not os.path.exists(path):
+        Image.effect_noise((px, px), 64).convert("RGB").save(path)
+    return path
+
+
+def require_pillow():
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        raise Skip("Pillow is not installed")
+
+
+# --- Benchmarks ---
+@benchmark("levels.calculate_points")
+def bench_points(env, opts):
+    from core.levels import calculate_points
+    trophies = {"bronze": "812", "silver": "240", "gold": "61", "platinum": "9"}
+    return measure(lambda: calculate_points(trophies), **opts)
+
+
+@benchmark("levels.calculate_level.legacy")
+def bench_level_legacy(env, opts):
+    return measure(lambda: [legacy_calculate_level(p) for p in LEVEL_SAMPLE], **opts)
+
+
+@benchmark("levels.calculate_level")
+def bench_level(env, opts):
+    from core.levels import calculate_level
+    return measure(lambda: [calculate_level(p) for p in LEVEL_SAMPLE], **opts)
+
+
+@benchmark("levels.calculate_levels.10k")
+def bench_levels_batch(env, opts):
+    from core.levels import calculate_levels
+    points = [(i * 7919) % 2500000 for i in range(10000)]
+    return measure(lambda: calculate_levels(points), **opts)
+
+
+def leaderboard_profiles(count):
+    """count profiles with a deterministic spread of trophy counts."""
+    return {f"user{i}": {"bronze": i * 7 % 900, "silver": i * 11 % 300,
+                         "gold": i * 13 % 90, "platinum": i % 12}
+            for i in range(count)}
+
+
+@benchmark("leaderboard.build.10k")
+def bench_leaderboard_build(env, opts):
+    from core.leaderboard import Leaderboard
+    profiles = leaderboard_profiles(10000)
+    return measure(lambda: Leaderboard(profiles), **opts)
+
+
+@benchmark("leaderboard.update.10k")
+def bench_leaderboard_update(env, opts):
+    from core.leaderboard import Leaderboard
+    board = Leaderboard(leaderboard_profiles(10000))
+    counter = itertools.count()
+
+    def update():
+        i = next(counter)
+        board.update(f"user{i % 10000}", {"bronze": i % 2000, "silver": 0,
+                                          "gold": 0, "platinum": 0})
+    return measure(update, **opts)
+
+
+def bench_circle_icon(px):
+    def run(env, opts):
+        require_pillow()
+        from core.images import make_circle_icon
+        source = source_image(env["tmp"], px)
+        output = os.path.join(env["tmp"], f"icon-{px}.png")
+        return measure(lambda: make_circle_icon(source, output), **opts)
+    return run
+
+
+for _px in (256, 1024, 3000):
+    benchmark(f"images.make_circle_icon.{_px}px")(bench_circle_icon(_px))
+
+
+@benchmark("images.icon_cache.hit")
+def bench_icon_cache_hit(env, opts):
+    require_pillow()
+    from core.images import IconCache
+    cache = IconCache()
+    source = source_image(env["tmp"], 1024)
+    cache.get(source)
+    return measure(lambda: cache.get(source), **opts)
+
+
+@benchmark("images.render_derivatives.avatar")
+def bench_render_derivatives(env, opts):
+    require_pillow()
+    from core.images import render_derivatives
+    source = source_image(env["tmp"], 3000)
+    runs = itertools.count()
+
+    def render():
+        out_dir = os.path.join(env["tmp"], f"derivatives-{next(runs)}")
+        started = time.perf_counter()
+        render_derivatives(source, "avatar", out_dir)
+        return time.perf_counter() - started
+    return measure_once(render, repeat=opts["repeat"])
+
+
+def pillow_decode(path):
+    from PIL import Image
+    with Image.open(path) as im:
+        im.load()
+        return im.copy()
+
+
+def pillow_crop(image, rect):
+    x, y, width, height = rect
+    return image.crop((x, y, x + width, y + height))
+
+
+@benchmark("assets.preload.files")
+def bench_assets_files(env, opts):
+    require_pillow()
+    from core.assets import AssetRegistry
+    return measure(lambda: AssetRegistry(decode=pillow_decode).preload(), **opts)
+
+
+@benchmark("assets.preload.atlas")
+def bench_assets_atlas(env, opts):
+    require_pillow()
+    from core.assets import AssetRegistry
+    atlas = os.path.join(env["tmp"], "bench_atlas.png")
+    AssetRegistry(atlas_path=atlas).ensure_atlas()
+    return measure(lambda: AssetRegistry(decode=pillow_decode, crop=pillow_crop,
+                                         atlas_path=atlas).preload(), **opts)
+
+
+def synthetic_photo(tmp, fmt, width, height):
+    """A large, photo-sized picture that still encodes quickly."""
+    from PIL import Image
+    path = os.path.join(tmp, f"photo-{width}x{height}.{fmt}")
+    if not os.path.exists(path):
+        small = Image.effect_noise((width // 10, height // 10), 64).convert("RGB")
+        small.resize((width, height)).save(path)
+    return path
+
+
+def bench_decode_rss(fmt, width, height, bounded=True):
+    """Decode in a fresh process so ru_maxrss measures only this picture."""
+    def run(env, opts):
+        require_pillow()
+        path = synthetic_photo(env["tmp"], fmt, width, height)
+        probes = []
+
+        def probe():
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), RSS_PROBE_FLAG, path,
+                 "bounded" if bounded else "unbounded"],
+                check=True, capture_output=True, text=True).stdout
+            probes.append(json.loads(out))
+            return probes[-1]["seconds"]
+        result = measure_once(probe, repeat=opts["repeat"])
+        result["peak_rss_delta"] = max(p["peak_rss_delta"] for p in probes)
+        result["refused"] = probes[-1]["refused"]
+        return result
+    return run
+
+
+# The memory bounds themselves are checked in tests/test_images.py
+for _fmt, _w, _h in (("jpeg", 8000, 6000), ("png", 6000, 4000), ("png", 8000, 6000)):
+    _mp = _w * _h // 1000000
+    benchmark(f"images.decode_rss.{_fmt}.{_mp}mp")(bench_decode_rss(_fmt, _w, _h))
+benchmark("images.decode_rss.jpeg.48mp.unbounded")(
+    bench_decode_rss("jpeg", 8000, 6000, bounded=False))
+
+
+def run_rss_probe(argv):
+    """Decode argv[0] as the icon renderer would and print timing and RSS."""
+    path, mode = argv
+    sys.path.insert(0, ROOT)
+    from PIL import Image
+    from core.images import ImageTooLarge, open_downscaled, peak_rss
+    before = peak_rss()
+    started = time.perf_counter()
+    refused = False
+    if mode == "bounded":
+        try:
+            open_downscaled(path, (64, 64))
+        except ImageTooLarge:
+            refused = True
+    else:
+        # What make_circle_icon did before bounded decoding
+        with Image.open(path) as im:
+            im.convert("RGBA")
+    print(json.dumps({"seconds": time.perf_counter() - started,
+                      "peak_rss_delta": peak_rss() - before,
+                      "refused": refused}))
+
+
+# --- psnprofiles.com fixtures ---
+PROFILE_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{user}'s Trophies</title>
+<link rel="stylesheet" href="/css/main.css"><script>var user = "{user}";</script>
+</head><body><div id="header"><ul class="nav"><li><a href="/">Home</a></li>
+<li><a href="/leaderboard">Leaderboards</a></li><li><a href="/guides">Guides</a></li></ul></div>
+<div id="user-bar"><span class="username">{user}</span>
+<div class="trophy-count"><ul>
+<li class="total"><img src="/lib/img/icons/trophy.png" alt=""> {total:,}</li>
+<li class="platinum"><img src="/lib/img/icons/platinum.png" alt=""> {platinum:,}</li>
+<li class="gold"><img src="/lib/img/icons/gold.png" alt=""> {gold:,}</li>
+<li class="silver"><img src="/lib/img/icons/silver.png" alt=""> {silver:,}</li>
+<li class="bronze"><img src="/lib/img/icons/bronze.png" alt=""> {bronze:,}</li>
+</ul></div></div>
+<div class="box no-top-border"><table class="zebra" id="gamesTable">
+"""
+PROFILE_PAGE_ROW = """<tr class="{row_class}">
+<td style="width: 50px;"><a href="/trophies/{game_id}-{slug}/{user}"><picture class="game">
+<source srcset="https://i.psnprofiles.com/games/{game_id:x}/S{game_id}.webp" type="image/webp">
+<img src="https://i.psnprofiles.com/games/{game_id:x}/S{game_id}.png" alt="" height="50"></picture></a></td>
+<td style="width: 100%;"><div class="ellipsis"><span>
+<a class="title" href="/trophies/{game_id}-{slug}/{user}" rel="nofollow">{title}</a>
+<bullet>&bull;</bullet> <span class="separator"><img src="/lib/img/icons/ps5.png" alt="PS5"></span>
+</span></div><div class="small-info">{info} <bullet>&bull;</bullet> {points:,} points
+<bullet>&bull;</bullet> Last played {played}</div></td>
+<td class="nowrap" style="width: 5%;"><div class="progress-bar"><span style="width: {completion}%;"></span>
+<span class="percent">{completion}%</span></div>{platinum_icon}</td>
+<td style="width: 10%;"><span class="separator right"><span class="tag">{rank}</span></span></td>
+</tr>
+"""
+PROFILE_PAGE_TAIL = """</table></div><div id="footer"><p>&copy; PSNProfiles</p>
+<script src="/js/main.js"></script></div></body></html>
+"""
+
+
+GAME_PAGE_HEAD = """<!DOCTYPE html>
+<html lang="en"><head><meta charset="utf-8"><title>{title} Trophies</title></head>
+<body><div id="content"><h3>{title}</h3><table class="zebra">
+"""
+GAME_PAGE_ROW = """<tr class="{row_class}">
+<td style="width: 54px;"><a href="/trophy/{game_id}-{slug}/{n}-trophy-{n}"><picture class="trophy">
+<img src="https://i.psnprofiles.com/games/{game_id:x}/trophies/{n}.png" alt="" height="54"></picture></a></td>
+<td style="width: 100%;"><a class="title" href="/trophy/{game_id}-{slug}/{n}-trophy-{n}">Trophy {n}</a>
+<br>Do thing number {n} in {title}.</td>
+<td class="nowrap" style="padding-right: 10px;">{earned}</td>
+<td style="width: 5%;" class="hover-show"><span class="separator left"><span class="typo-top">{rarity}%</span>
+<br><span class="typo-bottom">Rare</span></span></td>
+<td style="width: 5%;"><span class="separator left"><img src="/lib/img/icons/{grade}-large.png" title="{Grade}"></span></td>
+</tr>
+"""
+GAME_PAGE_EARNED = ('<span class="typo-top-date"><nobr>{day}th Mar 2024</nobr></span>'
+                    '<br><span class="typo-bottom-date"><nobr>8:{minute:02d}:00 PM</nobr></span>')
+
+
+def fixture_game(i, plays=0):
+    """Trophy numbers of the i-th fixture game, played plays more times
+    (one more trophy each)."""
+    total = 20 + i % 60
+    earned = min(total, (total if i % 7 == 0 else (i * 13) % total) + plays)
+    bronze, silver = earned * 3 // 4, earned // 6
+    return {"total": total, "earned": earned,
+            "platinum": earned == total and i % 2 == 0,
+            "grades": {"bronze": bronze, "silver": silver,
+                       "gold": earned - bronze - silver}}
+
+
+def profile_fixture_html(games, user="bench_user", plays=None):
+    """Return a psnprofiles.com-style profile page and its trophy counts.
+
+    plays maps a game's index to how often it was played since.
+    """
+    plays = plays or {}
+    counts = {"bronze": 0, "silver": 0, "gold": 0, "platinum": 0}
+    rows = []
+    for i in range(games):
+        game = fixture_game(i, plays.get(i, 0))
+        total, earned, platinum = game["total"], game["earned"], game["platinum"]
+        for grade, n in game["grades"].items():
+            counts[grade] += n
+        counts["platinum"] += platinum
+        info = (f"<b>All {total}</b> Trophies" if earned == total
+                else f"<b>{earned}</b> of <b>{total}</b> Trophies")
+        rows.append(PROFILE_PAGE_ROW.format(
+            row_class="completed" if earned == total else "", game_id=10000 + i,
+            slug=f"bench-game-{i}", user=user, title=f"Bench Game {i}: Remastered",
+            info=info, points=earned * 15,
+            played=f"{1 + (i + plays.get(i, 0)) % 28} {'Apr' if i in plays else 'Mar'} 2024",
+            completion=earned * 100 // total, rank="A" if platinum else "C",
+            platinum_icon='<img class="platinum" src="/lib/img/icons/platinum.png" alt="">'
+            if platinum else ""))
+    html = (PROFILE_PAGE_HEAD.format(user=user, total=sum(counts.values()), **counts)
+            + "".join(rows) + PROFILE_PAGE_TAIL)
+    return html, counts
+
+
+def game_fixture_html(i, plays=0):
+    """Return the trophy list page of the i-th fixture game."""
+    game = fixture_game(i, plays)
+    grades = [g for g, n in game["grades"].items() for _ in range(n)]
+    grades += ["bronze"] * (game["total"] - len(grades))
+    if game["platinum"]:
+        grades.append("platinum")
+    title = f"Bench Game {i}: Remastered"
+    rows = []
+    for n, grade in enumerate(grades, 1):
+        earned = n <= game["earned"] or grade == "platinum"
+        rows.append(GAME_PAGE_ROW.format(
+            row_class="completed" if earned else "", game_id=10000 + i,
+            slug=f"bench-game-{i}", n=n, title=title, grade=grade,
+            Grade=grade.title(), rarity=f"{(n * 7.3) % 100:.2f}",
+            earned=GAME_PAGE_EARNED.format(day=1 + n % 28, minute=n % 60)
+            if earned else ""))
+    return GAME_PAGE_HEAD.format(title=title) + "".join(rows) + PROFILE_PAGE_TAIL
+
+
+def profile_fixture(path, games, user="bench_user"):
+    """Write a profile page listing games games to path; returns the counts."""
+    html, counts = profile_fixture_html(games, user)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(html)
+    return counts
+
+
+class StandInSite:
+    """Local HTTP/1.1 server playing psnprofiles.com with the fixture pages.
+
+    Every response waits latency seconds; every throttle_every-th request
+    gets a 429 with Retry-After. Pages carry an ETag and Last-Modified and
+    answer conditional requests with 304. Counts requests, connections,
+    429s, full and 304 responses and the most requests in flight at once.
+    """
+
+    def __init__(self, games, user="bench_user", latency=0.0, throttle_every=0,
+                 retry_after="0.05"):
+        import http.server
+        import threading
+        self.games = games
+        self.user = user
+        self.plays = {}  # game index -> times played
+        self.pages = {}
+        profile, self.counts = profile_fixture_html(games, user)
+        self.pages[f"/{user}"] = profile.encode()
+        for i in range(games):
+            self.pages[f"/trophies/{10000 + i}-bench-game-{i}/{user}"] = None
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.retry_after = retry_after
+        self.modified = {}  # path -> Last-Modified
+        self.stats = {"requests": 0, "connections": 0, "throttled": 0,
+                      "full": 0, "not_modified": 0, "in_flight": 0, "max_in_flight": 0}
+        self._lock = threading.Lock()
+        site = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body go out in separate writes
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                site.count("connections")
+
+            def do_GET(self):
+                site.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def count(self, key, delta=1):
+        with self._lock:
+            self.stats[key] += delta
+            if key == "in_flight":
+                self.stats["max_in_flight"] = max(self.stats["max_in_flight"],
+                                                  self.stats["in_flight"])
+            return self.stats[key]
+
+    def page(self, path):
+        if path not in self.pages:
+            return None
+        if self.pages[path] is None:
+            i = int(path.split("/")[2].split("-")[0]) - 10000
+            self.pages[path] = game_fixture_html(i, self.plays.get(i, 0)).encode()
+        return self.pages[path]
+
+    def play(self, i):
+        """Earn one more trophy in game i: its page and the profile change."""
+        self.plays[i] = self.plays.get(i, 0) + 1
+        profile, self.counts = profile_fixture_html(self.games, self.user, self.plays)
+        modified = time.strftime("%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 1))
+        for path in (f"/{self.user}", f"/trophies/{10000 + i}-bench-game-{i}/{self.user}"):
+            self.pages[path] = None
+            self.modified[path] = modified
+        self.pages[f"/{self.user}"] = profile.encode()
+
+    def touch(self, path):
+        """Change the page at path, as a newly earned trophy would."""
+        self.pages[path] = self.page(path) + f"<!-- {time.time()} -->".encode()
+        self.modified[path] = time.strftime(
+            "%a, %d %b %Y %H:%M:%S GMT", time.gmtime(time.time() + 1))
+
+    def validators(self, path, body):
+        import hashlib
+        return {"ETag": '"%s"' % hashlib.sha1(body).hexdigest()[:16],
+                "Last-Modified": self.modified.get(path, "Mon, 04 Mar 2024 20:00:00 GMT")}
+
+    def handle(self, request):
+        self.count("in_flight")
+        try:
+            n = self.count("requests")
+            if self.latency:
+                time.sleep(self.latency)
+            body = self.page(request.path)
+            if self.throttle_every and n % self.throttle_every == 0:
+                self.count("throttled")
+                status, headers, body = 429, {"Retry-After": self.retry_after}, b""
+            elif body is None:
+                status, headers, body = 404, {}, b"not found"
+            else:
+                headers = self.validators(request.path, body)
+                if request.headers.get("If-None-Match") == headers["ETag"]:
+                    self.count("not_modified")
+                    status, body = 304, b""
+                else:
+                    self.count("full")
+                    status = 200
+                    headers["Content-Type"] = "text/html; charset=utf-8"
+            request.send_response(status)
+            for name, value in headers.items():
+                request.send_header(name, value)
+            if status != 304:
+                request.send_header("Content-Length", str(len(body)))
+            request.end_headers()
+            request.wfile.write(body)
+        finally:
+            self.count("in_flight", -1)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def measure_peak_alloc(fn):
+    """Return the peak bytes traced while fn() runs."""
+    import tracemalloc
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_parse_profile(games, stream):
+    def run(env, opts):
+        from core import psnprofiles
+        if not stream:
+            try:
+                import bs4  # noqa: F401
+            except ImportError:
+                raise Skip("beautifulsoup4 is not installed")
+        path = os.path.join(env["tmp"], f"profile-{games}.html")
+        if not os.path.exists(path):
+            profile_fixture(path, games)
+
+        def parse():
+            return psnprofiles.read_profile(path, stream=stream)
+        page = parse()
+        if len(page.games) != games:
+            raise RuntimeError(f"parsed {len(page.games)} of {games} games")
+        result = measure_once(lambda: timeit.timeit(parse, number=1),
+                              repeat=opts["repeat"])
+        result["peak_alloc"] = measure_peak_alloc(parse)
+        result["page_bytes"] = os.path.getsize(path)
+        return result
+    return run
+
+
+for _games in (100, 2000):
+    benchmark(f"psnprofiles.parse.soup.{_games}games")(bench_parse_profile(_games, False))
+    benchmark(f"psnprofiles.parse.stream.{_games}games")(bench_parse_profile(_games, True))
+# ~5 MB page: only the streaming parser is meant for this size
+benchmark("psnprofiles.parse.stream.5000games")(bench_parse_profile(5000, True))
+
+
+def bench_sync(games, latency=0.02, connections=4, rate=1000.0, burst=8,
+               throttle_every=0):
+    """sync_profile() against a StandInSite; checks every trophy arrived."""
+    def run(env, opts):
+        from core.fetch import Fetcher
+        from core.sync import sync_profile
+        site = StandInSite(games, latency=latency, throttle_every=throttle_every)
+        last = {}
+        try:
+            def sync():
+                fetcher = Fetcher(site.url, rate=rate, burst=burst,
+                                  max_connections=connections, backoff=0.01)
+                started = time.perf_counter()
+                try:
+                    result = sync_profile("bench_user", fetcher, store=False)
+                finally:
+                    fetcher.close()
+                elapsed = time.perf_counter() - started
+                earned = {g: 0 for g in site.counts}
+                for trophies in result.trophies.values():
+                    for trophy in trophies:
+                        earned[trophy.grade] += trophy.earned
+                if result.errors or earned != site.counts:
+                    raise RuntimeError(f"sync lost pages: {len(result.errors)} errors, "
+                                       f"{earned} != {site.counts}")
+                last.update(fetcher.stats, opened=fetcher.pool.opened)
+                return elapsed
+            result = measure_once(sync, repeat=opts["repeat"])
+        finally:
+            site.close()
+        result.update(requests=last["requests"], retries=last["retries"],
+                      throttled=last["throttled"], connections=last["opened"],
+                      max_in_flight=site.stats["max_in_flight"])
+        return result
+    return run
+
+
+benchmark("sync.fetch.serial.100games")(bench_sync(100, connections=1))
+benchmark("sync.fetch.100games")(bench_sync(100))
+benchmark("sync.fetch.1000games")(bench_sync(1000, connections=8))
+# Every 10th response is a 429: everything must still arrive
+benchmark("sync.fetch.throttled.100games")(bench_sync(100, throttle_every=10))
+# The default politeness settings: 4 requests/s after a burst of 8
+benchmark("sync.fetch.rate_limited.20games")(bench_sync(20, latency=0.0, rate=4.0))
+
+
+def bench_cached_sync(games, changed=0, fresh_for=0.0, cold=False):
+    """sync_profile() through a CachingFetcher, changing changed game pages
+    (and so the profile) before every run; checks only those were parsed."""
+    def run(env, opts):
+        from core.httpcache import CachingFetcher, HttpCache
+        from core.sync import sync_profile
+        from core.trophydb import TrophyDatabase
+        site = StandInSite(games, latency=0.005)
+        runs = itertools.count()
+        game_paths = [p for p in site.pages if p.startswith("/trophies/")]
+        last = {}
+
+        def sync(cache_dir):
+            fetcher = CachingFetcher(site.url, cache=HttpCache(cache_dir),
+                                     fresh_for=fresh_for, rate=1000.0,
+                                     max_connections=4, backoff=0.01)
+            db = TrophyDatabase(os.path.join(cache_dir, "trophies.db"))
+            try:
+                # full: every page is asked for, to measure the cache alone
+                return sync_profile("bench_user", fetcher, db, full=True)
+            finally:
+                fetcher.close()
+                db.close()
+        try:
+            warm_dir = os.path.join(env["tmp"], f"http-cache-{games}-{changed}")
+            sync(warm_dir)
+
+            def timed():
+                n = next(runs)
+                cache_dir = os.path.join(env["tmp"], f"http-cache-cold-{n}") if cold else warm_dir
+                for path in game_paths[:changed]:
+                    site.touch(path)
+                if changed:
+                    site.touch("/bench_user")
+                before = dict(site.stats)
+                started = time.perf_counter()
+                result = sync(cache_dir)
+                elapsed = time.perf_counter() - started
+                expected = games if cold else changed
+                if result.errors or len(result.trophies) != expected:
+                    raise RuntimeError(f"parsed {len(result.trophies)} game pages, "
+                                       f"expected {expected}")
+                last.update({k: site.stats[k] - before[k]
+                             for k in ("requests", "full", "not_modified")},
+                            parsed=len(result.trophies))
+                return elapsed
+            result = measure_once(timed, repeat=opts["repeat"])
+        finally:
+            site.close()
+        result.update(last)
+        return result
+    return run
+
+
+benchmark("httpcache.sync.cold.100games")(bench_cached_sync(100, cold=True))
+benchmark("httpcache.sync.revalidate.100games")(bench_cached_sync(100))
+benchmark("httpcache.sync.revalidate.100games.5changed")(bench_cached_sync(100, changed=5))
+benchmark("httpcache.sync.fresh.100games")(bench_cached_sync(100, fresh_for=3600.0))
+
+
+def bench_incremental_sync(games, played):
+    """sync_profile() after played games each earned a trophy; checks only
+    their pages were fetched and the menu counts moved by what they earned."""
+    def run(env, opts):
+        from core.fetch import Fetcher
+        from core.state import state_repository
+        from core.sync import sync_profile
+        from core.trophydb import TrophyDatabase
+        site = StandInSite(games, latency=0.005)
+        db = TrophyDatabase(os.path.join(env["tmp"], f"incremental-{games}.db"))
+        # Games with trophies left to earn, played in turn
+        active = iter([i for i in range(games)
+                       if fixture_game(i)["total"] - fixture_game(i)["earned"] > 5])
+        last = {}
+
+        def sync():
+            fetcher = Fetcher(site.url, rate=1000.0, max_connections=8, backoff=0.01)
+            try:
+                return sync_profile("bench_user", fetcher, db)
+            finally:
+                fetcher.close()
+
+        def menu_counts():
+            snapshot = state_repository.snapshot()
+            return {g: getattr(snapshot, g) for g in site.counts}
+        try:
+            sync()
+
+            def timed():
+                counts, menu = dict(site.counts), menu_counts()
+                for _ in range(played):
+                    site.play(next(active))
+                before = dict(site.stats)
+                started = time.perf_counter()
+                result = sync()
+                elapsed = time.perf_counter() - started
+                last.update({k: site.stats[k] - before[k]
+                             for k in ("requests", "full", "not_modified")},
+                            parsed=len(result.trophies))
+                requests = last["requests"]
+                if result.errors or len(result.trophies) != played or requests != played + 1:
+                    raise RuntimeError(f"{requests} requests, parsed {len(result.trophies)} "
+                                       f"game pages; expected {played + 1} and {played}")
+                expected = {g: menu[g] + site.counts[g] - counts[g] for g in counts}
+                if db.summary() != site.counts or menu_counts() != expected:
+                    raise RuntimeError(f"counts {menu_counts()} != {expected}")
+                return elapsed
+            result = measure_once(timed, repeat=opts["repeat"])
+        finally:
+            db.close()
+            site.close()
+        result.update(last)
+        return result
+    return run
+
+
+# Two games played since the last sync: the profile and their two pages
+benchmark("sync.incremental.1000games.2played")(bench_incremental_sync(1000, 2))
+
+
+def fixture_trophies(games=1000, per_game=50):
+    """{game_id: [Trophy]} for games x per_game trophies, 50k by default."""
+    from core.psnprofiles import Game, Trophy
+    rows = {}
+    game_list = []
+    for i in range(games):
+        game_id = 10000 + i
+        earned = (i * 13) % per_game if i % 7 else per_game
+        trophies = []
+        for n in range(1, per_game + 1):
+            grade = ("platinum" if n == per_game else "gold" if n % 10 == 0
+                     else "silver" if n % 4 == 0 else "bronze")
+            done = n <= earned
+            trophies.append(Trophy(game_id, n, f"Trophy {n}", grade, done,
+                                   1.6e9 + (i * per_game + n) * 3600.0 if done else None,
+                                   round((n * 7.3 + i) % 100, 2)))
+        rows[game_id] = trophies
+        game_list.append(Game(game_id, f"{game_id}-bench-game-{i}", f"Bench Game {i}",
+                              f"https://psnprofiles.com/trophies/{game_id}-bench-game-{i}",
+                              earned, per_game, earned * 100 // per_game, earned == per_game,
+                              1.7e9 + i * 60.0))
+    return game_list, rows
+
+
+def trophy_db(env):
+    """A 50k-trophy database, built once per bench run."""
+    from core.trophydb import TrophyDatabase
+    if "trophy_db" not in env:
+        db = TrophyDatabase(os.path.join(env["tmp"], "bench-trophies.db"))
+        games, rows = fixture_trophies()
+        db.upsert_games(games)
+        for game_id, trophies in rows.items():
+            db.replace_trophies(game_id, trophies)
+        env["trophy_db"] = db
+    return env["trophy_db"]
+
+
+@benchmark("trophydb.load.50k")
+def bench_trophydb_load(env, opts):
+    from core.trophydb import TrophyDatabase
+    games, rows = fixture_trophies()
+    runs = itertools.count()
+
+    def load():
+        db = TrophyDatabase(os.path.join(env["tmp"], f"load-{next(runs)}.db"))
+        started = time.perf_counter()
+        db.upsert_games(games)
+        for game_id, trophies in rows.items():
+            db.replace_trophies(game_id, trophies)
+        elapsed = time.perf_counter() - started
+        db.close()
+        return elapsed
+    return measure_once(load, repeat=opts["repeat"])
+
+
+@benchmark("trophydb.summary")
+def bench_trophydb_summary(env, opts):
+    return measure(trophy_db(env).summary, **opts)
+
+
+@benchmark("trophydb.summary.scan")
+def bench_trophydb_summary_scan(env, opts):
+    """The full scan the summary row replaces."""
+    db = trophy_db(env)
+    return measure(lambda: db._query(
+        "SELECT grade, COUNT(*) FROM trophies WHERE earned = 1 GROUP BY grade"), **opts)
+
+
+@benchmark("trophydb.closest_to_platinum")
+def bench_trophydb_closest(env, opts):
+    return measure(trophy_db(env).closest_to_platinum, **opts)
+
+
+@benchmark("trophydb.rarest_earned")
+def bench_trophydb_rarest(env, opts):
+    return measure(trophy_db(env).rarest_earned, **opts)
+
+
+@benchmark("trophydb.earned_per_month")
+def bench_trophydb_per_month(env, opts):
+    return measure(trophy_db(env).earned_per_month, **opts)
+
+
+@benchmark("trophydb.replace_trophies.one_earned")
+def bench_trophydb_replace(env, opts):
+    """Re-storing a game's list after one more trophy was earned."""
+    db = trophy_db(env)
+    _, rows = fixture_trophies(games=1)
+    trophies = rows[10000]
+    flips = itertools.count()
+
+    def replace():
+        n = next(flips) % len(trophies)
+        t = trophies[n]
+        trophies[n] = t._replace(earned=not t.earned, earned_at=None if t.earned else 1.7e9)
+        db.replace_trophies(10000, trophies)
+    return measure(replace, **opts)
+
+
+@benchmark("storage.load_config")
+def bench_load_config(env, opts):
+    from core.storage import load_config
+    return measure(load_config, **opts)
+
+
+@benchmark("storage.save_config")
+def bench_save_config(env, opts):
+    from core.storage import load_config, save_config, write_behind
+    config = load_config()
+
+    def save():
+        save_config(config)
+        write_behind.flush()
+    return measure(save, **opts)
+
+
+@benchmark("storage.load_trophies")
+def bench_load_trophies(env, opts):
+    from core.storage import load_trophies
+    return measure(load_trophies, **opts)
+
+
+@benchmark("storage.save_trophies")
+def bench_save_trophies(env, opts):
+    from core.storage import load_trophies, save_trophies, write_behind
+    trophies = load_trophies()
+
+    def save():
+        save_trophies(trophies)
+        write_behind.flush()
+    return measure(save, **opts)
+
+
+TODO_ITEMS = [f"Platinum game #{i}: finish the collectibles" for i in range(1000)]
+
+
+def bench_todo_journal_load(count):
+    def run(env, opts):
+        from core.todo import TodoJournal
+        path = os.path.join(env["tmp"], f"bench-{count}.journal")
+        journal = TodoJournal(path)
+        for i in range(count):
+            journal.add(f"Platinum game #{i}: finish the collectibles")
+        journal.close()
+
+        def load():
+            store = TodoJournal(path)
+            store.items()
+            store.close()
+        return measure(load, **opts)
+    return run
+
+
+benchmark("todo.load.journal.1k")(bench_todo_journal_load(1000))
+benchmark("todo.load.journal.100k")(bench_todo_journal_load(100000))
+
+
+@benchmark("todo.load.json.1k")
+def bench_todo_json_load(env, opts):
+    path = os.path.join(env["tmp"], "bench-todo.json")
+    with open(path, "w") as f:
+        json.dump(TODO_ITEMS, f)
+
+    def load():
+        with open(path) as f:
+            return json.load(f)
+    return measure(load, **opts)
+
+
+@benchmark("todo.save.journal.1k")
+def bench_todo_journal_save(env, opts):
+    from core.todo import TodoJournal
+    journal = TodoJournal(os.path.join(env["tmp"], "bench-save.journal"))
+    for text in TODO_ITEMS:
+        journal.add(text)
+
+    def edit():
+        journal.remove(journal.add("one more"))
+    result = measure(edit, **opts)
+    journal.close()
+    return result
+
+
+@benchmark("todo.save.json.1k")
+def bench_todo_json_save(env, opts):
+    path = os.path.join(env["tmp"], "bench-save-todo.json")
+    todos = list(TODO_ITEMS)
+
+    def edit():
+        # The old store rewrote the whole list on every add and remove
+        todos.append("one more")
+        with open(path, "w") as f:
+            json.dump(todos, f)
+        todos.pop()
+        with open(path, "w") as f:
+            json.dump(todos, f)
+    return measure(edit, **opts)
+
+
+@benchmark("menu.tick.legacy")
+def bench_tick_legacy(env, opts):
+    require_pillow()
+    from core import paths
+    from core.images import make_circle_icon
+    with open(paths.TROPHY_CSV, "w", newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=paths.TROPHY_FIELDS)
+        writer.writeheader()
+        writer.writerow({"bronze": 812, "silver": 240, "gold": 61, "platinum": 9})
+    return measure(lambda: legacy_tick(paths, make_circle_icon), **opts)
+
+
+def make_tick():
+    """One timer tick of the real menu bar app, built on the GUI stubs.
+
+    A watcher wake-up with nothing changed, then refresh_menu(); the app's
+    own watcher is stopped so only the benchmark drives it.
+    """
+    from core import profiling
+    profiling.install_gui_stubs()
+    import menubar
+    app = menubar.PSNTrophyMenuApp(prewarm=False)
+    app.watcher.stop()
+
+    def tick():
+        app.sync_from_disk(set())
+        app.refresh_menu(None)
+        return app.subtitle, app.icon_png
+    return tick
+
+
+@benchmark("menu.tick")
+def bench_tick(env, opts):
+    return measure(make_tick(), **opts)
+
+
+# Set while a benchmark counts the files opened for writing
+_write_counter = None
+
+
+def _count_writes(event, args):
+    if event == "open" and _write_counter is not None:
+        _, mode, flags = args
+        if (isinstance(mode, str) and any(c in mode for c in "wax+")) or \
+                flags & (os.O_WRONLY | os.O_RDWR):
+            _write_counter.append(args[0])
+
+
+def count_writes(fn):
+    """Run fn(); return (result, paths opened for writing while it ran)."""
+    global _write_counter
+    if not getattr(count_writes, "hooked", False):
+        sys.addaudithook(_count_writes)  # audit hooks can't be removed
+        count_writes.hooked = True
+    _write_counter = []
+    try:
+        return fn(), _write_counter
+    finally:
+        _write_counter = None
+
+
+@benchmark("menu.tick.hour")
+def bench_tick_hour(env, opts):
+    """3600 one-second ticks; the result counts the files written meanwhile."""
+    tick = make_tick()
+
+    def hour():
+        started = time.perf_counter()
+        for _ in range(3600):
+            tick()
+        return time.perf_counter() - started
+    # The first hour includes the icon render on a cold cache
+    _, written = count_writes(hour)
+    result = measure_once(hour, repeat=opts["repeat"])
+    result["writes"] = len(written)
+    return result
+
+
+def bench_metrics(enabled, kind):
+    """The cost of one instrumented call or span, with metrics on or off."""
+    def run(env, opts):
+        from core.metrics import Metrics
+        metrics = Metrics(enabled=enabled)
+
+        def noop():
+            pass
+        if kind == "call":
+            fn = noop
+        elif kind == "timed":
+            fn = metrics.timed("bench.noop")(noop)
+        else:
+            def fn():
+                with metrics.span("bench.noop"):
+                    pass
+        result = measure(fn, **opts)
+        if enabled and not metrics.histograms["bench.noop"].count:
+            raise RuntimeError("nothing was recorded")
+        return result
+    return run
+
+
+benchmark("metrics.baseline.call")(bench_metrics(False, "call"))
+for _enabled in (False, True):
+    for _kind in ("timed", "span"):
+        benchmark(f"metrics.{'on' if _enabled else 'off'}.{_kind}")(
+            bench_metrics(_enabled, _kind))
+
+
+def stand_in_command(env):
+    return [sys.executable, os.path.abspath(__file__), STAND_IN_FLAG,
+            env["notify_socket"]]
+
+
+def wait_for_stand_in(server):
+    conn, _ = server.accept()
+    conn.close()
+
+
+def launch_server(env):
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(env["notify_socket"])
+    server.listen(4)
+    server.settimeout(30)
+    return server
+
+
+@benchmark("ipc.dashboard_launch.cold")
+def bench_launch_cold(env, opts):
+    server = launch_server(env)
+
+    def launch():
+        started = time.perf_counter()
+        process = subprocess.Popen(stand_in_command(env) + ["--dashboard"])
+        wait_for_stand_in(server)
+        elapsed = time.perf_counter() - started
+        process.wait()
+        return elapsed
+    try:
+        return measure_once(launch, repeat=opts["repeat"])
+    finally:
+        server.close()
+        os.unlink(env["notify_socket"])
+
+
+@benchmark("ipc.dashboard_launch.warm")
+def bench_launch_warm(env, opts):
+    from core.ipc import DashboardLauncher
+    server = launch_server(env)
+    launcher = DashboardLauncher(command=stand_in_command(env),
+                                 socket_dir=os.path.join(env["tmp"], "workers"))
+    os.makedirs(launcher.socket_dir, exist_ok=True)
+
+    def launch():
+        launcher.start()
+        time.sleep(1.0)  # the idle time a real worker gets between clicks
+        started = time.perf_counter()
+        launcher.launch()
+        wait_for_stand_in(server)
+        return time.perf_counter() - started
+    try:
+        return measure_once(launch, repeat=opts["repeat"])
+    finally:
+        time.sleep(0.2)
+        launcher.stop()
+        server.close()
+        os.unlink(env["notify_socket"])
+
+
+@benchmark("ipc.single_instance.activate")
+def bench_single_instance(env, opts):
+    from core.ipc import SingleInstance
+    lock = os.path.join(env["tmp"], "bench.lock")
+    path = os.path.join(env["tmp"], "bench-instance.sock")
+    holder = SingleInstance(lock, path, {"activate": lambda: None})
+    if not holder.acquire():
+        raise Skip("could not take the benchmark lock")
+    second = SingleInstance(lock, path)
+    try:
+        return measure(lambda: second.claim("activate"), **opts)
+    finally:
+        holder.release()
+
+
+def run_stand_in(argv):
+    """Entry point of the stand-in dashboard process.
+
+    It imports what a headless dashboard would (the core package) and then
+    connects to the benchmark's socket in place of opening a window.
+    """
+    notify_socket = argv[0]
+    import core.images  # noqa: F401
+    import core.state  # noqa: F401
+    import core.todo  # noqa: F401
+
+    def opened():
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.connect(notify_socket)
+
+    if "--dashboard-worker" in argv:
+        from core.ipc import serve_dashboard_worker
+        socket_path = argv[argv.index("--dashboard-worker") + 1]
+        serve_dashboard_worker(socket_path, opened, os.getppid())
+    else:
+        opened()
+
+
+def bench_dashboard_build(browser):
+    """Time the dashboard window build on the GUI stubs, in a fresh process.
+
+    lazy is the build as it ships: the guide browser is made on first use,
+    so the time is the first paint. eager builds the browser straight after
+    the window, as before the lazy WKWebView change, and adds its time.
+    Only the Python side is measured; the stubs make the Cocoa calls free.
+    """
+    def run(env, opts):
+        probes = []
+
+        def probe():
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), DASHBOARD_PROBE_FLAG, browser],
+                check=True, capture_output=True, text=True).stdout
+            probes.append(json.loads(out))
+            return probes[-1]["build"]
+        result = measure_once(probe, repeat=opts["repeat"])
+        result["phases"] = probes[-1]["phases"]
+        return result
+    return run
+
+
+benchmark("dashboard.build.lazy_browser")(bench_dashboard_build("lazy"))
+benchmark("dashboard.build.eager_browser")(bench_dashboard_build("eager"))
+
+
+def run_dashboard_probe(argv):
+    """Build the dashboard once on the GUI stubs and print its phase times."""
+    browser = argv[0]
+    sys.path.insert(0, ROOT)
+    from core import profiling
+    profiling.install_gui_stubs()
+
+    class RunLoop(profiling.Stub):
+        # Queued calls run at once: first paint is marked when the build
+        # returns, and an eager browser is built right after it
+        def callAfter(self, fn, *args):
+            fn(*args)
+
+        def callLater(self, delay, fn, *args):
+            fn(*args)
+    sys.modules["PyObjCTools"].AppHelper = RunLoop()
+    from core.net import connectivity
+    from core.state import state_repository
+    connectivity.refresh = lambda: None  # no probes; assumed online
+    if browser == "eager":
+        config = state_repository.config
+        state_repository.config = lambda: dict(config(), prefetch_guide=True)
+    import dashboard
+    dashboard.run_dashboard()
+    phases = dashboard.dashboard_timings
+    build = phases["first_paint"] + phases.get("browser_init", 0.0)
+    print(json.dumps({"build": build, "phases": phases}))
+
+
+# --- Running and comparing ---
+def make_env():
+    """Point the core package at a scratch copy of data/ and return paths."""
+    tmp = tempfile.mkdtemp(prefix="psn-bench-")
+    data_dir = os.path.join(tmp, "data")
+    shutil.copytree(os.path.join(ROOT, "data"), data_dir,
+                    ignore=shutil.ignore_patterns("*.journal", "*.lock"))
+    os.environ["PSN_AGENT_DATA_DIR"] = data_dir
+    sys.path.insert(0, ROOT)
+    from core.storage import ensure_data_files
+    ensure_data_files()
+    return {"tmp": tmp, "notify_socket": os.path.join(tmp, "notify.sock")}
+
+
+def run(selected, opts):
+    env = make_env()
+    results = {}
+    try:
+        for name, fn in selected:
+            try:
+                result = fn(env, opts)
+            except Skip as e:
+                result = {"skipped": str(e)}
+            except AssertionError as e:
+                result = {"failed": str(e)}
+            except Exception as e:
+                # One broken benchmark is reported, not the end of the run
+                result = {"failed": f"{type(e).__name__}: {e}"}
+            results[name] = result
+            if "skipped" in result:
+                print(f"{name:<40} skipped: {result['skipped']}")
+            elif "failed" in result:
+                print(f"{name:<40} FAILED: {result['failed']}")
+            else:
+                print(f"{name:<40} {format_seconds(result['median']):>10}"
+                      f"  (best {format_seconds(result['best'])})"
+                      + format_rss(result) + format_writes(result))
+    finally:
+        from core.storage import write_behind
+        if "trophy_db" in env:
+            env["trophy_db"].close()
+        # Deferred writes land in the scratch dir, so flush before removing it
+        write_behind.flush()
+        shutil.rmtree(env["tmp"], ignore_errors=True)
+    return results
+
+
+def format_seconds(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def format_rss(result):
+    if "peak_alloc" in result:
+        return f"  peak alloc {result['peak_alloc'] / 2 ** 20:.1f} MiB"
+    if "peak_rss_delta" not in result:
+        return ""
+    refused = ", refused" if result.get("refused") else ""
+    return f"  peak RSS +{result['peak_rss_delta'] / 2 ** 20:.1f} MiB{refused}"
+
+
+def format_writes(result):
+    if "writes" in result:
+        return f"  {result['writes']} file writes"
+    if "parsed" in result:
+        return (f"  {result['requests']} requests: {result['full']} full, "
+                f"{result['not_modified']} not modified; {result['parsed']} parsed")
+    if "requests" in result:
+        return (f"  {result['requests']} requests on {result['connections']} connections"
+                f", {result['throttled']} throttled, max {result['max_in_flight']} in flight")
+    return ""
+
+
+def compare(results, baseline, threshold):
+    """Print changes against baseline; return the names that regressed."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get("results", {}).get(name)
+        if old is None or "median" not in old or "median" not in result:
+            continue
+        ratio = result["median"] / old["median"] if old["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+        elif any(result.get(key, 0) > old.get(key, float("inf")) * (1 + threshold) + 2 ** 20
+                 for key in ("peak_rss_delta", "peak_alloc")):
+            flag = "  MEMORY REGRESSION"
+        elif result.get("writes", 0) > old.get("writes", float("inf")):
+            flag = "  WRITE REGRESSION"
+        if flag:
+            regressions.append(name)
+        print(f"{name:<40} {format_seconds(old['median']):>10} -> "
+              f"{format_seconds(result['median']):>10}  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == [STAND_IN_FLAG]:
+        return run_stand_in(argv[1:])
+    if argv[:1] == [RSS_PROBE_FLAG]:
+        return run_rss_probe(argv[1:])
+    if argv[:1] == [DASHBOARD_PROBE_FLAG]:
+        return run_dashboard_probe(argv[1:])
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="flag regressions against a results JSON file")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown of the median (default 0.25 = 25%%)")
+    parser.add_argument("-k", dest="pattern", default="",
+                        help="only run benchmarks whose name contains this")
+    parser.add_argument("--quick", action="store_true",
+                        help="fewer, shorter runs for a smoke test")
+    args = parser.parse_args(argv)
+
+    opts = {"repeat": 3, "min_time": 0.05} if args.quick else {"repeat": 5, "min_time": 0.2}
+    selected = [(n, fn) for n, fn in BENCHMARKS if args.pattern in n]
+    results = run(selected, opts)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+    failed = [name for name, result in results.items() if "failed" in result]
+    if failed:
+        print(f"{len(failed)} benchmark(s) failed their bounds")
+        return 1
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than "
+                  f"{args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,7 @@
+"""Headless PSN-Agent logic: data files, levels, state, icons and IPC.
+
+Nothing in this package imports AppKit, rumps, objc or Pillow at import
+time, so it loads quickly and works on any platform. The GUI frontends
+(dashboard.py and menubar.py) build on top of it. Import the submodules
+directly; ``python -m core.importtime`` checks the import budget.
+"""
@@ -0,0 +1,195 @@
+"""Registry of the bundled data/*.png assets and the level icon table.
+
+The data directory is indexed once. Decoded images are memoized, can be
+decoded in parallel up front, and can come from a single atlas image so a
+whole window build costs one file read.
+"""
+import bisect
+import json
+import os
+import threading
+
+from core.paths import ASSET_ATLAS, ASSETS_DIR
+
+# (first level, icon) for each level tier, ascending
+LEVEL_ICONS = [
+    (1, "1-99.png"),
+    (100, "100-199.png"),
+    (200, "200-299.png"),
+    (300, "300-399.png"),
+    (400, "400-499.png"),
+    (500, "500-599.png"),
+    (600, "600-699.png"),
+    (700, "700-799.png"),
+    (800, "800-899.png"),
+    (900, "999.png"),
+]
+LEVEL_ICON_STARTS = [start for start, _ in LEVEL_ICONS]
+# Everything a dashboard build shows
+DASHBOARD_ASSETS = [
+    "bronze.png", "silver.png", "gold.png", "platinum.png",
+    "browser.png", "internet.png", "guide.png", "guide-no-internet.png",
+] + [name for _, name in LEVEL_ICONS]
+ATLAS_MAX_WIDTH = 2048
+
+
+def level_icon_name(level):
+    """Return the icon file name for a level."""
+    i = bisect.bisect_right(LEVEL_ICON_STARTS, level) - 1
+    return LEVEL_ICONS[max(i, 0)][1]
+
+
+class AssetRegistry:
+    """Index of a directory of PNGs with memoized decoding.
+
+    ``decode(path)`` turns a file into an image object (a CGImage in the
+    dashboard, a Pillow image headless). With an atlas, ``crop(image, rect)``
+    cuts one asset out of the decoded atlas instead, where rect is
+    (x, y, width, height) from the top-left corner.
+    """
+
+    def __init__(self, directory=ASSETS_DIR, decode=None, crop=None,
+                 atlas_path=None):
+        self.directory = directory
+        self.decode = decode
+        self.crop = crop
+        self.atlas_path = atlas_path
+        self._lock = threading.Lock()
+        self._images = {}
+        self._atlas = None
+        self._atlas_index = None
+        self._paths = {}
+        try:
+            for entry in os.scandir(directory):
+                if entry.name.endswith(".png"):
+                    self._paths[entry.name] = entry.path
+        except FileNotFoundError:
+            pass
+
+    def __contains__(self, name):
+        return name in self._paths
+
+    def path(self, name):
+        """Return the file path of an asset, or None if there is no such file."""
+        return self._paths.get(name)
+
+    def get(self, name):
+        """Return the decoded asset, or None if it is missing or undecodable."""
+        with self._lock:
+            if name in self._images:
+                return self._images[name]
+        image = self._load(name)
+        with self._lock:
+            return self._images.setdefault(name, image)
+
+    def level_icon(self, level):
+        return self.get(level_icon_name(level))
+
+    def ensure_atlas(self, names=DASHBOARD_ASSETS):
+        """Rebuild the atlas if it is missing, stale or lacks any of names."""
+        if not self.atlas_path:
+            return False
+        index = read_atlas_index(self.atlas_path, self._paths)
+        wanted = {n for n in names if n in self._paths}
+        if index is not None and wanted <= set(index):
+            return True
+        if build_atlas(sorted(wanted), self.directory, self.atlas_path) is None:
+            return False
+        with self._lock:
+            self._atlas = self._atlas_index = None
+        return True
+
+    def preload(self, names=DASHBOARD_ASSETS, workers=4):
+        """Decode names in a thread pool so later get() calls hit the memo."""
+        # Imported here: concurrent.futures pulls in logging, ~10 ms at startup
+        from concurrent.futures import ThreadPoolExecutor
+        if self.crop is not None and self._load_atlas():
+            names = [n for n in names if n not in self._atlas_index]
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(self.get, names))
+
+    def _load(self, name):
+        if self.crop is not None and self._load_atlas() and name in self._atlas_index:
+            return self.crop(self._atlas, self._atlas_index[name])
+        path = self._paths.get(name)
+        if path is None:
+            return None
+        return self.decode(path)
+
+    def _load_atlas(self):
+        with self._lock:
+            if self._atlas_index is None:
+                self._atlas_index = {}
+                if self.atlas_path:
+                    index = read_atlas_index(self.atlas_path, self._paths)
+                    if index:
+                        self._atlas = self.decode(self.atlas_path)
+                        if self._atlas is not None:
+                            self._atlas_index = index
+            return bool(self._atlas_index)
+
+
+def atlas_index_path(atlas_path):
+    return os.path.splitext(atlas_path)[0] + ".json"
+
+
+def read_atlas_index(atlas_path, sources):
+    """Return the atlas's {name: rect} index, or None if the atlas is stale.
+
+    sources maps asset names to their current paths; an atlas built from a
+    different set of files, or older than any of them, is stale.
+    """
+    try:
+        with open(atlas_index_path(atlas_path)) as f:
+            record = json.load(f)
+        built = os.stat(atlas_path).st_mtime
+    except (OSError, ValueError):
+        return None
+    index = record.get("rects", {})
+    for name in index:
+        path = sources.get(name)
+        if path is None or os.stat(path).st_mtime > built:
+            return None
+    return {name: tuple(rect) for name, rect in index.items()}
+
+
+def build_atlas(names=DASHBOARD_ASSETS, directory=ASSETS_DIR,
+                atlas_path=ASSET_ATLAS, max_width=ATLAS_MAX_WIDTH):
+    """Pack names into one PNG plus a JSON index of their rects.
+
+    Assets are shelf-packed tallest first. Needs Pillow; returns the index,
+    or None if Pillow is missing.
+    """
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    images = {}
+    for name in names:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            with Image.open(path) as im:
+                images[name] = im.convert("RGBA")
+    rects = {}
+    x = y = shelf_height = width = 0
+    for name in sorted(images, key=lambda n: -images[n].height):
+        w, h = images[name].size
+        if x and x + w > max_width:
+            x, y = 0, y + shelf_height
+            shelf_height = 0
+        rects[name] = (x, y, w, h)
+        x += w
+        width = max(width, x)
+        shelf_height = max(shelf_height, h)
+    atlas = Image.new("RGBA", (max(width, 1), max(y + shelf_height, 1)))
+    for name, (x, y, _, _) in rects.items():
+        atlas.paste(images[name], (x, y))
+    os.makedirs(os.path.dirname(atlas_path), exist_ok=True)
+    atlas.save(atlas_path + ".tmp.png")
+    index_path = atlas_index_path(atlas_path)
+    with open(index_path + ".tmp", "w") as f:
+        json.dump({"rects": rects}, f)
+    # Index last: read_atlas_index() requires the atlas to be no older
+    os.replace(atlas_path + ".tmp.png", atlas_path)
+    os.replace(index_path + ".tmp", index_path)
+    return rects
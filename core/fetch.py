@@ -0,0 +1,234 @@
+"""Polite concurrent HTTP fetching: keep-alive pool, rate limit, retries.
+
+Everything sits on the standard library's http.client. A Fetcher talks to
+one site through a bounded pool of keep-alive connections, takes a token
+from a shared bucket before every request and retries throttled (429) and
+failed requests with exponential backoff, honouring Retry-After. A 429 also
+drains the bucket, so every worker backs off, not only the one throttled.
+"""
+import functools
+import random
+import threading
+import time
+from collections import namedtuple
+
+USER_AGENT = "PSN-Agent/1.0"
+# Status codes worth another try
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# headers has lower-cased names
+Response = namedtuple("Response", ["status", "headers", "body", "url"])
+
+
+class FetchError(OSError):
+    """A request failed for good: retries ran out or the status is an error."""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """Thread-safe token bucket: rate tokens per second, up to burst at once.
+
+    acquire() reserves a token and sleeps until it is due, outside the lock,
+    so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hand out no tokens for the next seconds."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0) - seconds * self.rate
+
+
+@functools.lru_cache(maxsize=None)
+def _ssl_context():
+    import ssl
+    try:
+        # The bundle pinned in requirements.txt; python.org builds on macOS
+        # ship without system certificates
+        import certifi
+        return ssl.create_default_context(cafile=certifi.where())
+    except ImportError:
+        return ssl.create_default_context()
+
+
+class ConnectionPool:
+    """At most max_size keep-alive connections to one scheme://host:port."""
+
+    def __init__(self, url, max_size=4, timeout=15.0):
+        from urllib.parse import urlsplit
+        parts = urlsplit(url)
+        self.scheme = parts.scheme or "https"
+        self.host = parts.hostname
+        self.port = parts.port
+        self.timeout = timeout
+        self.opened = 0  # connections made so far, for keep-alive stats
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        import http.client
+        with self._lock:
+            self.opened += 1
+        if self.scheme == "https":
+            return http.client.HTTPSConnection(
+                self.host, self.port, timeout=self.timeout, context=_ssl_context())
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method, path, headers=None):
+        """Send one request and read the whole body; returns a Response."""
+        import http.client
+        with self._slots:
+            with self._lock:
+                conn = self._idle.pop() if self._idle else None
+            for _ in range(2):
+                reused = conn is not None
+                if conn is None:
+                    conn = self._connect()
+                try:
+                    conn.request(method, path, headers=headers or {})
+                    resp = conn.getresponse()
+                    body = resp.read()
+                    break
+                except (OSError, http.client.HTTPException):
+                    conn.close()
+                    conn = None
+                    if not reused:
+                        raise
+                    # The server dropped an idle keep-alive connection;
+                    # one more go on a fresh one
+            if resp.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+        return Response(resp.status, {k.lower(): v for k, v in resp.getheaders()},
+                        body, f"{self.scheme}://{self.host}{path}")
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+def retry_after(value, default):
+    """Seconds to wait from a Retry-After header (delta seconds or HTTP date)."""
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class Fetcher:
+    """Rate-limited, retrying GETs against one site.
+
+    Defaults are deliberately gentle on psnprofiles.com: four connections
+    and four requests a second after a burst of eight. get_many() runs one
+    worker per connection.
+    """
+
+    def __init__(self, base_url="https://psnprofiles.com", rate=4.0, burst=8,
+                 max_connections=4, retries=4, backoff=0.5, max_backoff=60.0,
+                 timeout=15.0, user_agent=USER_AGENT):
+        self.base_url = base_url.rstrip("/")
+        self.pool = ConnectionPool(base_url, max_connections, timeout)
+        self.bucket = TokenBucket(rate, burst)
+        self.max_connections = max_connections
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.headers = {"User-Agent": user_agent, "Accept-Encoding": "identity"}
+        self.stats = {"requests": 0, "retries": 0, "throttled": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def get(self, path, headers=None):
+        """GET path; returns the Response or raises FetchError.
+
+        Statuses below 400 (including 304) are returned, the rest raise once
+        the retries for them are used up.
+        """
+        import http.client
+        request_headers = dict(self.headers, **(headers or {}))
+        for attempt in range(self.retries + 1):
+            self.bucket.acquire()
+            self._count("requests")
+            delay = min(self.max_backoff, self.backoff * 2 ** attempt)
+            delay *= random.uniform(0.5, 1.0)
+            try:
+                response = self.pool.request("GET", path, request_headers)
+            except (OSError, http.client.HTTPException) as e:
+                error = FetchError(f"GET {path}: {e}")
+            else:
+                if response.status < 400:
+                    return response
+                error = FetchError(f"GET {path}: HTTP {response.status}",
+                                   response.status)
+                if response.status not in RETRY_STATUSES:
+                    raise error
+                if response.status in (429, 503):
+                    delay = min(self.max_backoff, retry_after(
+                        response.headers.get("retry-after"), delay))
+                if response.status == 429:
+                    self._count("throttled")
+                    self.bucket.pause(delay)
+            if attempt == self.retries:
+                raise error
+            self._count("retries")
+            time.sleep(delay)
+
+    def get_many(self, paths, headers=None):
+        """GET every path concurrently; yield (path, Response or FetchError).
+
+        Results come in completion order, so each body can be handled and
+        dropped while the rest are still in flight.
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+
+        def fetch(path):
+            try:
+                return path, self.get(path, headers)
+            except FetchError as e:
+                return path, e
+        with ThreadPoolExecutor(max_workers=self.max_connections) as pool:
+            futures = [pool.submit(fetch, path) for path in paths]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def close(self):
+        self.pool.close()
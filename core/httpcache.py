@@ -0,0 +1,325 @@
+"""On-disk HTTP cache for psnprofiles.com pages, with conditional revalidation.
+
+Bodies are stored zlib-compressed, one file per URL, next to a JSON index
+holding each page's ETag/Last-Modified and when it was last validated. The
+cache is an LRU bounded by the compressed size; processes sharing it merge
+their changes into the index under a file lock. CachingFetcher puts it in
+front of a Fetcher: fresh pages cost nothing, stale ones one conditional
+request, and an unchanged page comes back from a 304 marked not_modified
+so callers can skip parsing it again. A caller that must know the page is
+current sends Cache-Control: no-cache and checks revalidated.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+from core.fetch import Fetcher, Response
+from core.paths import HTTP_CACHE_DIR
+from core.storage import write_behind
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+# A Response plus where it came from. not_modified: the body is the one this
+# cache already handed out for the URL (a fresh hit, a 304 or a stale copy).
+# revalidated: the server confirmed the body with a 304 just now; a fresh or
+# stale copy served without asking is not_modified but not revalidated.
+CachedResponse = namedtuple("CachedResponse", Response._fields
+                            + ("not_modified", "stale", "revalidated"))
+
+
+def cache_control(headers):
+    """Parse a Cache-Control header into {directive: value or True}."""
+    directives = {}
+    for part in headers.get("cache-control", "").split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else True
+    return directives
+
+
+def _seconds(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+class HttpCache:
+    """Compressed page store with an LRU index bounded to max_bytes on disk."""
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self._lock = threading.Lock()
+        self._entries = self._read_index()  # key -> entry, least recently used first
+        self._size = sum(entry["size"] for entry in self._entries.values())
+        # key -> entry, or None if removed: this process's changes since its
+        # last index write, merged into the index on disk by _write_index()
+        self._changed = {}
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            entries = []
+        return OrderedDict((entry["key"], entry) for entry in entries)
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha1(url.encode()).hexdigest()[:20]
+
+    def _body_path(self, key):
+        return os.path.join(self.directory, key + ".z")
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Compressed bytes on disk."""
+        return self._size
+
+    def lookup(self, url):
+        """Return a copy of the index entry for url, or None."""
+        key = self.key(url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return dict(entry)
+
+    def body(self, entry):
+        """Return the decompressed body of an entry, or None if it is gone."""
+        try:
+            with open(self._body_path(entry["key"]), "rb") as f:
+                return zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            self.remove(entry["url"])
+            return None
+
+    def store(self, url, response, unseen=False):
+        """Cache a 200 response; returns the new entry, or None if uncacheable."""
+        directives = cache_control(response.headers)
+        if "no-store" in directives:
+            self.remove(url)
+            return None
+        key = self.key(url)
+        data = zlib.compress(response.body, 6)
+        if len(data) > self.max_bytes:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._body_path(key) + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self._body_path(key))
+        entry = {
+            "key": key, "url": url, "size": len(data),
+            "headers": {name: response.headers[name]
+                        for name in ("content-type", "cache-control")
+                        if name in response.headers},
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "validated": time.time(), "unseen": unseen,
+        }
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old["size"]
+            self._entries[key] = self._changed[key] = entry
+            self._size += entry["size"]
+            evicted = self._evict()
+        for old_key in evicted:
+            self._unlink(old_key)
+        self._save()
+        return dict(entry)
+
+    def revalidated(self, url, response):
+        """Record a 304 for url: the stored body is current again."""
+        with self._lock:
+            entry = self._entries.get(self.key(url))
+            if entry is None:
+                return
+            self._changed[entry["key"]] = entry
+            entry["validated"] = time.time()
+            for name in ("etag", "last-modified"):
+                if name in response.headers:
+                    entry[name.replace("-", "_")] = response.headers[name]
+            if "cache-control" in response.headers:
+                entry["headers"]["cache-control"] = response.headers["cache-control"]
+        self._save()
+
+    def mark_seen(self, url):
+        with self._lock:
+            entry = self._entries.get(self.key(url))
+            if entry is None or not entry.get("unseen"):
+                return
+            self._changed[entry["key"]] = entry
+            entry["unseen"] = False
+        self._save()
+
+    def remove(self, url):
+        key = self.key(url)
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return
+            self._changed[key] = None
+            self._size -= entry["size"]
+        self._unlink(key)
+        self._save()
+
+    def clear(self):
+        with self._lock:
+            keys = list(self._entries)
+            self._changed.update(dict.fromkeys(keys))
+            self._entries.clear()
+            self._size = 0
+        for key in keys:
+            self._unlink(key)
+        self._save()
+
+    def _evict(self):
+        evicted = []
+        while self._size > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            self._changed[key] = None
+            self._size -= entry["size"]
+            evicted.append(key)
+        return evicted
+
+    def _unlink(self, key):
+        try:
+            os.remove(self._body_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _save(self):
+        # Serialized when the write-behind store flushes, so a burst of
+        # stores writes the index once
+        write_behind.defer(self.index_path, None, self._write_index)
+
+    def _write_index(self, _):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self.index_path + ".lock", "a") as lock:
+            # Other processes write the index too: apply this one's changes
+            # to what is on disk now, not to what was there at startup
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = self._read_index()
+            with self._lock:
+                for key, entry in self._changed.items():
+                    entries.pop(key, None)
+                    if entry is not None:
+                        entries[key] = entry
+                self._entries = entries
+                self._size = sum(entry["size"] for entry in entries.values())
+                evicted = self._evict()
+                self._changed.clear()
+                data = json.dumps(list(entries.values()))
+            tmp_path = self.index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                f.write(data)
+            os.replace(tmp_path, self.index_path)
+        for key in evicted:
+            self._unlink(key)
+
+
+class CachingFetcher(Fetcher):
+    """A Fetcher that answers from an HttpCache and revalidates conditionally.
+
+    A page validated less than fresh_for seconds ago (or within the
+    server's max-age) is served without a request. Up to stale_for seconds
+    past that it is still served at once while a background request
+    revalidates it. Anything older is revalidated before returning, and so
+    is every page requested with Cache-Control: no-cache.
+    """
+
+    def __init__(self, base_url="https://psnprofiles.com", cache=None,
+                 fresh_for=0.0, stale_for=0.0, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.cache = HttpCache() if cache is None else cache
+        self.fresh_for = fresh_for
+        self.stale_for = stale_for
+        self.stats.update(hits=0, stale=0, not_modified=0, full=0)
+        self._revalidating = set()
+
+    def _lifetimes(self, entry):
+        directives = cache_control(entry["headers"])
+        if "no-cache" in directives:
+            return 0.0, 0.0
+        fresh = _seconds(directives.get("max-age"))
+        stale = _seconds(directives.get("stale-while-revalidate"))
+        return (self.fresh_for if fresh is None else fresh,
+                self.stale_for if stale is None else stale)
+
+    def _from_cache(self, entry, body, stale=False, revalidated=False):
+        not_modified = not entry.get("unseen")
+        if not not_modified:
+            self.cache.mark_seen(entry["url"])
+        return CachedResponse(200, dict(entry["headers"]), body, entry["url"],
+                              not_modified, stale, revalidated)
+
+    def get(self, path, headers=None):
+        url = self.base_url + path
+        entry = self.cache.lookup(url)
+        body = self.cache.body(entry) if entry is not None else None
+        no_cache = "no-cache" in cache_control(
+            {name.lower(): value for name, value in (headers or {}).items()})
+        if body is not None and not no_cache:
+            age = time.time() - entry["validated"]
+            fresh, stale = self._lifetimes(entry)
+            if age < fresh:
+                self._count("hits")
+                return self._from_cache(entry, body)
+            if age < fresh + stale:
+                self._count("stale")
+                self._revalidate_later(path, headers)
+                return self._from_cache(entry, body, stale=True)
+        return self._fetch(path, headers, entry if body is not None else None, body)
+
+    def _fetch(self, path, headers, entry, body, background=False):
+        url = self.base_url + path
+        conditional = dict(headers or {})
+        if entry is not None:
+            if entry.get("etag"):
+                conditional["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                conditional["If-Modified-Since"] = entry["last_modified"]
+        response = super().get(path, conditional)
+        if response.status == 304 and entry is not None:
+            self._count("not_modified")
+            self.cache.revalidated(url, response)
+            if background:
+                return None
+            return self._from_cache(entry, body, revalidated=True)
+        self._count("full")
+        if response.status == 200:
+            self.cache.store(url, response, unseen=background)
+        return CachedResponse(*response, not_modified=False, stale=False,
+                              revalidated=False)
+
+    def _revalidate_later(self, path, headers):
+        with self._stats_lock:
+            if path in self._revalidating:
+                return
+            self._revalidating.add(path)
+
+        def revalidate():
+            try:
+                entry = self.cache.lookup(self.base_url + path)
+                body = self.cache.body(entry) if entry is not None else None
+                self._fetch(path, headers, entry if body is not None else None,
+                            body, background=True)
+            except OSError:
+                pass  # Served stale already; the next get() tries again
+            finally:
+                with self._stats_lock:
+                    self._revalidating.discard(path)
+        threading.Thread(target=revalidate, daemon=True).start()
@@ -0,0 +1,240 @@
+"""Images rendered with Pillow: menu bar icons and dashboard derivatives.
+
+Pillow is imported on first render, so importing this module stays cheap.
+"""
+import hashlib
+import io
+import os
+import resource
+import sys
+from collections import OrderedDict
+
+from core.metrics import metrics
+from core.paths import DATA_DIR, DERIVATIVES_DIR
+from core.watch import file_fingerprint
+
+
+# --- Bounded decoding ---
+# Ceilings for decoding a user-picked picture. Checked before decoding:
+# the pixel count from the file header, and the memory the decode needs
+# once a JPEG has been scaled down by draft().
+MAX_SOURCE_PIXELS = 120_000_000
+MAX_DECODE_BYTES = 128 * 1024 * 1024
+# Modes Image.reduce() handles directly; others are converted to RGBA first
+REDUCIBLE_MODES = {"L", "LA", "RGB", "RGBA", "I", "F"}
+
+
+class ImageTooLarge(ValueError):
+    """A picture is over the pixel or decode-memory ceiling."""
+
+
+def peak_rss():
+    """Return the peak resident set size of this process so far, in bytes."""
+    try:
+        # Linux carries ru_maxrss over from the parent across fork and exec;
+        # VmHWM belongs to this process image only
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS but kilobytes on Linux
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def open_downscaled(path, size, max_pixels=MAX_SOURCE_PIXELS,
+                    max_bytes=MAX_DECODE_BYTES):
+    """Decode path to RGBA at no less than size (w, h), but not much more.
+
+    JPEGs are decoded directly at 1/2, 1/4 or 1/8 scale through draft();
+    other formats are decoded at full size and reduce()d straight away.
+    Raises ImageTooLarge, before decoding anything, if the picture has more
+    than max_pixels or the decode would need more than max_bytes.
+    """
+    from PIL import Image, ImageOps
+    try:
+        im = Image.open(path)
+    except Image.DecompressionBombError as e:
+        raise ImageTooLarge(str(e))
+    with im:
+        if im.width * im.height > max_pixels:
+            raise ImageTooLarge(
+                f"{path}: {im.width}x{im.height} is over {max_pixels} pixels")
+        # Square target: EXIF may still rotate the picture by 90 degrees
+        target = max(size)
+        im.draft(None, (target, target))
+        needed = im.width * im.height * len(im.getbands())
+        if im.mode not in REDUCIBLE_MODES:
+            needed += im.width * im.height * 4
+        if needed > max_bytes:
+            raise ImageTooLarge(
+                f"{path}: decoding {im.width}x{im.height} {im.mode} needs "
+                f"{needed >> 20} MiB, over {max_bytes >> 20} MiB")
+        im.load()
+        if im.mode not in REDUCIBLE_MODES:
+            im = im.convert("RGBA")
+        factor = min(im.width, im.height) // target
+        if factor >= 2:
+            im = im.reduce(factor)
+        return ImageOps.exif_transpose(im).convert("RGBA")
+
+
+@metrics.timed()
+def render_circle_icon(image_path, size=64):
+    """Return image_path as a circular size x size PNG, in memory.
+
+    Returns None if the picture cannot be decoded (or Pillow is missing).
+    """
+    try:
+        from PIL import Image, ImageDraw
+        im = open_downscaled(image_path, (size, size))
+        # Crop to square
+        min_side = min(im.size)
+        left = (im.width - min_side) // 2
+        top = (im.height - min_side) // 2
+        im = im.crop((left, top, left + min_side, top + min_side))
+        im = im.resize((size, size), Image.LANCZOS)
+        # Create circular mask
+        mask = Image.new('L', (size, size), 0)
+        draw = ImageDraw.Draw(mask)
+        draw.ellipse((0, 0, size, size), fill=255)
+        im.putalpha(mask)
+        buffer = io.BytesIO()
+        im.save(buffer, "PNG")
+        return buffer.getvalue()
+    except Exception:
+        return None
+
+
+@metrics.timed()
+def make_circle_icon(image_path, output_path, size=64):
+    """Export the circular icon of image_path to output_path.
+
+    Returns output_path, or the default menu icon if rendering failed.
+    """
+    png = render_circle_icon(image_path, size)
+    if png is None:
+        return os.path.join(DATA_DIR, "menu_icon.png")
+    with open(output_path, "wb") as f:
+        f.write(png)
+    return output_path
+
+
+class IconCache:
+    """Bounded in-memory LRU of icons rendered by render_circle_icon.
+
+    Entries are keyed on the source path, its mtime and size, and the target
+    pixel size, so only a changed source photo triggers a re-render. Nothing
+    is written to disk; export() does that on request.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (path, mtime_ns, size, px) -> PNG bytes
+
+    def get(self, image_path, size=64):
+        """Return the circular icon PNG for image_path, or None if it can't be rendered."""
+        image_path = os.path.abspath(image_path)
+        try:
+            st = os.stat(image_path)
+        except OSError:
+            return None
+        key = (image_path, st.st_mtime_ns, st.st_size, size)
+        png = self._entries.get(key)
+        if png is not None:
+            metrics.incr("images.icon_cache.hit")
+            self._entries.move_to_end(key)
+            return png
+        metrics.incr("images.icon_cache.miss")
+        png = render_circle_icon(image_path, size)
+        if png is None:
+            return None
+        # A changed photo replaces its old renders rather than aging them out
+        self.invalidate(image_path)
+        self._entries[key] = png
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return png
+
+    def export(self, image_path, output_path, size=64):
+        """Write the icon for image_path to output_path; return False if it can't be rendered."""
+        png = self.get(image_path, size)
+        if png is None:
+            return False
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(png)
+        os.replace(tmp_path, output_path)
+        return True
+
+    def invalidate(self, image_path=None):
+        """Drop cached icons for image_path, or every cached icon if None."""
+        if image_path is None:
+            self._entries.clear()
+            return
+        image_path = os.path.abspath(image_path)
+        for key in [k for k in self._entries if k[0] == image_path]:
+            del self._entries[key]
+
+
+# --- Avatar and banner derivatives ---
+# Point size of each derivative kind; every kind is rendered at 1x and 2x
+DERIVATIVE_SIZES = {"avatar": (100, 100), "banner": (420, 110)}
+DERIVATIVE_SCALES = (2, 1)  # largest first, each scale is made from the last
+
+
+def file_digest(path):
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:16]
+
+
+def render_derivatives(source_path, kind, out_dir=DERIVATIVES_DIR):
+    """Render the 1x and 2x derivatives of source_path for kind.
+
+    Returns the record to keep in config.json (source path, its fingerprint
+    and {"1x": path, "2x": path}), or None if the source cannot be decoded.
+    Raises ImageTooLarge for pictures over the decode ceilings.
+    Files are named after the source's content hash, so picking the same
+    picture again, even from another path, reuses them.
+    """
+    fingerprint = file_fingerprint(source_path)
+    if fingerprint is None:
+        return None
+    width, height = DERIVATIVE_SIZES[kind]
+    digest = file_digest(source_path)
+    paths = {f"{scale}x": os.path.join(
+        out_dir, f"{kind}-{width}x{height}-{digest}@{scale}x.png")
+        for scale in DERIVATIVE_SCALES}
+    if not all(os.path.exists(p) for p in paths.values()):
+        try:
+            from PIL import Image, ImageOps
+            os.makedirs(out_dir, exist_ok=True)
+            im = open_downscaled(source_path, (width * max(DERIVATIVE_SCALES),
+                                               height * max(DERIVATIVE_SCALES)))
+            for scale in DERIVATIVE_SCALES:
+                # Centre-crop to the target aspect and scale to fill it
+                im = ImageOps.fit(im, (width * scale, height * scale),
+                                  Image.LANCZOS)
+                path = paths[f"{scale}x"]
+                im.save(path + ".tmp.png")
+                os.replace(path + ".tmp.png", path)
+        except ImageTooLarge:
+            raise
+        except Exception:
+            return None
+    return {"source": source_path, "fingerprint": list(fingerprint),
+            "paths": paths}
+
+
+def derivatives_match(record, source_path):
+    """True if record was rendered from source_path as it is now on disk."""
+    if not record or record.get("source") != source_path:
+        return False
+    fingerprint = file_fingerprint(source_path)
+    return fingerprint is not None and record.get("fingerprint") == list(fingerprint) \
+        and all(os.path.exists(p) for p in record.get("paths", {}).values())
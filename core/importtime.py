@@ -0,0 +1,81 @@
+"""Import-time regression check for the core package.
+
+    python -m core.importtime [--budget-ms 100] [--repeat 5]
+
+Imports every core module in a fresh ``python -X importtime`` interpreter
+and exits non-zero if the best of --repeat runs exceeds the budget, or if
+any GUI framework or heavy optional dependency gets imported on the way.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+CORE_MODULES = [
+    "core.paths", "core.storage", "core.todo", "core.levels", "core.state",
+    "core.net", "core.watch", "core.ipc", "core.leaderboard", "core.images",
+    "core.assets", "core.psnprofiles", "core.fetch", "core.httpcache",
+    "core.sync", "core.trophydb", "core.metrics",
+]
+# Frameworks that must only ever be imported by the GUI frontends, or lazily
+FORBIDDEN_MODULES = {
+    "rumps", "AppKit", "Foundation", "Cocoa", "WebKit", "objc", "PyObjCTools",
+    "PIL", "numpy",
+}
+DEFAULT_BUDGET_MS = 100.0
+
+
+def measure(modules=CORE_MODULES):
+    """Import modules in a fresh interpreter; return (ms, imported names).
+
+    The time is the summed cumulative cost of the top-level imports, so
+    interpreter startup and site.py are not counted.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+        cwd=root, capture_output=True, text=True, check=True)
+    total_us = 0
+    imported = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue  # the column header
+        name = fields[2].rstrip()
+        imported.add(name.strip())
+        if name.startswith(" core") and not name.startswith("  "):
+            total_us += int(fields[1])
+    return total_us / 1000, imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs to take the best of (the first warms pyc files)")
+    args = parser.parse_args(argv)
+
+    timings = []
+    forbidden = set()
+    for _ in range(max(1, args.repeat)):
+        ms, imported = measure()
+        timings.append(ms)
+        forbidden |= {name for name in imported
+                      if name.split(".")[0] in FORBIDDEN_MODULES}
+    best = min(timings)
+    print(f"core import: best {best:.1f} ms of {len(timings)} runs "
+          f"(budget {args.budget_ms:.0f} ms)")
+    failed = False
+    if forbidden:
+        print("forbidden imports: " + ", ".join(sorted(forbidden)))
+        failed = True
+    if best > args.budget_ms:
+        print(f"over budget by {best - args.budget_ms:.1f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
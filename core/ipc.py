@@ -0,0 +1,217 @@
+"""Process plumbing for the dashboard: pre-warmed workers and a single-instance guard."""
+import fcntl
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+# --- Pre-warmed dashboard worker ---
+class DashboardLauncher:
+    """Keep one idle, pre-imported dashboard process ready to show.
+
+    start() spawns ``main.py --dashboard-worker <socket>``, which imports the
+    GUI frameworks and then waits on a Unix socket. launch() returns at once:
+    a background thread tells that worker to open the dashboard (falling
+    back to a cold ``--dashboard`` start if it never answers) and then
+    spawns the next one. Without an idle worker the cold start is immediate.
+    """
+
+    def __init__(self, command=None, socket_dir=None, connect_timeout=10.0):
+        self.command = command or [sys.executable, sys.argv[0]]
+        self.socket_dir = socket_dir or tempfile.mkdtemp(prefix="psn-agent-")
+        self.connect_timeout = connect_timeout
+        self._lock = threading.Lock()
+        self._worker = None
+        self._socket_path = None
+        self._spawned = 0
+
+    def start(self):
+        with self._lock:
+            if self._worker is not None:
+                return
+            self._spawned += 1
+            path = os.path.join(self.socket_dir, f"worker-{self._spawned}.sock")
+            self._worker = subprocess.Popen(
+                self.command + ["--dashboard-worker", path])
+            self._socket_path = path
+
+    def launch(self):
+        """Show the dashboard without blocking; returns the handoff thread."""
+        with self._lock:
+            worker, path = self._worker, self._socket_path
+            self._worker = self._socket_path = None
+        if worker is None:
+            subprocess.Popen(self.command + ["--dashboard"])
+        # The worker may still be importing; wait for it off the caller's
+        # (usually the menu bar's main) thread
+        thread = threading.Thread(target=self._hand_off, args=(worker, path),
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def _hand_off(self, worker, path):
+        if worker is not None and not self._signal(worker, path):
+            worker.kill()
+            subprocess.Popen(self.command + ["--dashboard"])
+        # Have the next worker warming up before the next click
+        self.start()
+
+    def _signal(self, worker, path):
+        deadline = time.monotonic() + self.connect_timeout
+        while worker.poll() is None and time.monotonic() < deadline:
+            try:
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                    conn.settimeout(self.connect_timeout)
+                    conn.connect(path)
+                    conn.sendall(b"open\n")
+                    return conn.recv(16).strip() == b"ok"
+            except (FileNotFoundError, ConnectionRefusedError):
+                # Still importing; the socket appears once it is ready
+                time.sleep(0.02)
+            except OSError:
+                return False
+        return False
+
+    def stop(self):
+        with self._lock:
+            worker, self._worker = self._worker, None
+        if worker is not None:
+            worker.kill()
+            worker.wait()
+        shutil.rmtree(self.socket_dir, ignore_errors=True)
+
+
+def serve_dashboard_worker(socket_path, entry, parent_pid):
+    """Wait for an "open" request on socket_path, then run entry().
+
+    Returns without running entry() if the parent process goes away first.
+    """
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(1)
+    server.settimeout(1.0)
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                if os.getppid() != parent_pid:
+                    return
+                continue
+            with conn:
+                try:
+                    # A client that connects and says nothing must not keep
+                    # us from noticing that the parent has gone
+                    conn.settimeout(1.0)
+                    if conn.recv(16).strip() != b"open":
+                        continue
+                    conn.sendall(b"ok\n")
+                except OSError:
+                    continue
+                break
+    finally:
+        server.close()
+        os.unlink(socket_path)
+    entry()
+
+
+# --- Single-instance guard ---
+class SingleInstance:
+    """Let one process own lock_path and take messages from later launches.
+
+    acquire() takes an fcntl advisory lock and, if it gets it, serves
+    socket_path; each message is looked up in handlers and the handler is
+    called on the listener thread. When another process holds the lock,
+    acquire() returns False and notify() can hand that process a message.
+    """
+
+    def __init__(self, lock_path, socket_path, handlers=None):
+        self.lock_path = lock_path
+        self.socket_path = socket_path
+        self.handlers = dict(handlers or {})
+        self._fd = None
+        self._server = None
+
+    def acquire(self):
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        # flock dies with its holder, so whatever pid or socket is still
+        # lying around belongs to a crashed instance and can be replaced
+        os.ftruncate(fd, 0)
+        os.write(fd, f"{os.getpid()}\n".encode())
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.socket_path)
+        server.listen(4)
+        self._fd, self._server = fd, server
+        threading.Thread(target=self._serve, args=(server,), daemon=True).start()
+        return True
+
+    def _serve(self, server):
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # released
+            with conn:
+                try:
+                    conn.settimeout(1.0)
+                    message = conn.recv(64).strip().decode("ascii", "replace")
+                    handler = self.handlers.get(message)
+                    conn.sendall(b"ok\n" if handler else b"unknown\n")
+                except OSError:
+                    continue
+            if handler:
+                handler()
+
+    def notify(self, message, timeout=1.0):
+        """Send message to the lock holder; True once it has accepted it."""
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+                conn.settimeout(timeout)
+                conn.connect(self.socket_path)
+                conn.sendall(message.encode("ascii") + b"\n")
+                return conn.recv(16).strip() == b"ok"
+        except OSError:
+            return False
+
+    def claim(self, message, timeout=2.0):
+        """Take the lock, or pass message to the holder.
+
+        Returns True if this process is now the instance. If the holder never
+        answers (it is exiting, or hung) within timeout, this process gives up
+        waiting and runs unguarded rather than showing nothing.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.acquire():
+                return True
+            if self.notify(message):
+                return False
+            if time.monotonic() >= deadline:
+                return True
+            time.sleep(0.05)
+
+    def release(self):
+        server, self._server = self._server, None
+        if server is None:
+            return
+        server.close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+        os.close(self._fd)
+        self._fd = None
@@ -0,0 +1,84 @@
+"""Ranking of several local profiles by trophy points."""
+import bisect
+import json
+import os
+
+from core.levels import calculate_level, calculate_levels, calculate_points
+from core.metrics import metrics
+from core.paths import DATA_DIR
+
+
+PROFILES_DIR = os.path.join(DATA_DIR, "profiles")
+
+
+@metrics.timed()
+def load_profiles(profiles_dir=PROFILES_DIR):
+    """Return {username: trophies} for every profile JSON in profiles_dir."""
+    profiles = {}
+    if not os.path.isdir(profiles_dir):
+        return profiles
+    for entry in os.scandir(profiles_dir):
+        if not entry.name.endswith(".json"):
+            continue
+        with open(entry.path, 'r') as f:
+            record = json.load(f)
+        username = record.pop("username", entry.name[:-len(".json")])
+        profiles[username] = record
+    return profiles
+
+
+@metrics.timed()
+def save_profile(username, trophies, profiles_dir=PROFILES_DIR):
+    if not username or os.sep in username or username.startswith("."):
+        raise ValueError(f"invalid username: {username!r}")
+    os.makedirs(profiles_dir, exist_ok=True)
+    record = {"username": username}
+    record.update({t: int(trophies.get(t, 0))
+                   for t in ["bronze", "silver", "gold", "platinum"]})
+    with open(os.path.join(profiles_dir, f"{username}.json"), 'w') as f:
+        json.dump(record, f)
+
+
+class Leaderboard:
+    """Profiles ranked by trophy points, kept sorted as single profiles change."""
+
+    def __init__(self, profiles):
+        names = list(profiles)
+        points = [calculate_points(profiles[name]) for name in names]
+        levels = calculate_levels(points)
+        self._entries = {name: (p, level)
+                         for name, p, level in zip(names, points, levels)}
+        # (-points, username) keeps the highest score first and ties stable
+        self._order = sorted((-p, name) for name, p in zip(names, points))
+
+    def __len__(self):
+        return len(self._order)
+
+    def update(self, username, trophies):
+        """Re-rank one profile without touching the others."""
+        self.remove(username)
+        points = calculate_points(trophies)
+        self._entries[username] = (points, calculate_level(points)[0])
+        bisect.insort(self._order, (-points, username))
+
+    def remove(self, username):
+        entry = self._entries.pop(username, None)
+        if entry is not None:
+            del self._order[bisect.bisect_left(self._order, (-entry[0], username))]
+
+    def rank_of(self, username):
+        entry = self._entries[username]
+        return bisect.bisect_left(self._order, (-entry[0], username)) + 1
+
+    def ranking(self, limit=None):
+        """Return [(rank, username, points, level)], best first."""
+        rows = []
+        for rank, (_, name) in enumerate(self._order[:limit], start=1):
+            points, level = self._entries[name]
+            rows.append((rank, name, points, level))
+        return rows
+
+
+def print_leaderboard(limit=None):
+    for rank, name, points, level in Leaderboard(load_profiles()).ranking(limit):
+        print(f"{rank:>5}. {name:<24} Lv. {level:<4} {points} pts")
@@ -0,0 +1,70 @@
+"""Trophy points and the PSN level curve."""
+import bisect
+
+
+def calculate_points(trophies):
+    TROPHY_VALUES = {"bronze": 15, "silver": 30, "gold": 90, "platinum": 300}
+    return sum(int(trophies[t]) * TROPHY_VALUES[t] for t in TROPHY_VALUES)
+
+
+# (first level, last level, points needed per level) for each tier
+LEVEL_THRESHOLDS = [
+    (1, 99, 60),
+    (100, 199, 90),
+    (200, 299, 450),
+    (300, 399, 900),
+    (400, 499, 1350),
+    (500, 599, 1800),
+    (600, 699, 2250),
+    (700, 799, 2700),
+    (800, 899, 3150),
+    (900, 999, 3600)
+]
+MAX_LEVEL = 999
+
+
+def build_level_table(thresholds):
+    """Return the cumulative points at the start and end of every level."""
+    starts, ends, increments = [], [], []
+    total = 0
+    for start, end, inc in thresholds:
+        for _ in range(start, end + 1):
+            starts.append(total)
+            total += inc
+            ends.append(total)
+            increments.append(inc)
+    return starts, ends, increments
+
+
+LEVEL_STARTS, LEVEL_ENDS, LEVEL_INCREMENTS = build_level_table(LEVEL_THRESHOLDS)
+_level_ends_array = None  # NumPy copy of LEVEL_ENDS, built on first use
+
+
+def calculate_level(points):
+    """Return (level, current, required, percent) for a point total."""
+    i = bisect.bisect_right(LEVEL_ENDS, points)
+    if i == len(LEVEL_ENDS):
+        return MAX_LEVEL, points, 1, 100
+    current = points - LEVEL_STARTS[i]
+    required = LEVEL_INCREMENTS[i]
+    return i + 1, current, required, int((current / required) * 100)
+
+
+def calculate_levels(points):
+    """Map a sequence or NumPy array of point totals to levels in one call."""
+    global _level_ends_array
+    try:
+        # Imported here rather than at the top: NumPy alone would blow the
+        # core import budget, and only batch callers benefit from it
+        import numpy as np
+    except ImportError:
+        np = None
+    if np is None:
+        return [min(bisect.bisect_right(LEVEL_ENDS, p) + 1, MAX_LEVEL)
+                for p in points]
+    if _level_ends_array is None:
+        _level_ends_array = np.array(LEVEL_ENDS)
+    levels = np.minimum(
+        np.searchsorted(_level_ends_array, np.asarray(points), side="right") + 1,
+        MAX_LEVEL)
+    return levels if isinstance(points, np.ndarray) else levels.tolist()
@@ -0,0 +1,203 @@
+"""Latency histograms and counters for the hot paths, off unless asked for.
+
+Set PSN_AGENT_METRICS=1 before launching to turn them on. Timings go into
+per-name histograms with power-of-two microsecond buckets and into a
+fixed-size ring of the most recent events; counters are plain integers.
+dump() writes it all as JSON, as does SIGUSR1 (install_signal_handler())
+and exiting the process.
+
+Off, @timed hands back the undecorated function and span() a shared
+do-nothing context manager, so instrumented code pays nothing for the
+decorator and about a method call for a span or a counter.
+"""
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from core.paths import METRICS_DIR
+
+# Most recent timings kept for the dump, oldest dropped first
+EVENT_CAPACITY = 4096
+
+
+class Histogram:
+    """Durations bucketed by powers of two of microseconds.
+
+    Bucket k counts durations of under 2**k us (and at least 2**(k-1) us).
+    """
+
+    __slots__ = ("buckets", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = 0.0
+
+    def record(self, seconds):
+        bucket = int(seconds * 1e6).bit_length()
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p):
+        """Upper bound in seconds of the bucket holding the p-th percentile."""
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, 2 ** bucket / 1e6)
+        return self.max
+
+    def as_dict(self):
+        ms = 1e3
+        return {
+            "count": self.count,
+            "total_ms": self.total * ms,
+            "mean_ms": self.total / self.count * ms if self.count else 0.0,
+            "min_ms": (self.min or 0.0) * ms, "max_ms": self.max * ms,
+            "p50_ms": self.percentile(50) * ms,
+            "p90_ms": self.percentile(90) * ms,
+            "p99_ms": self.percentile(99) * ms,
+            # "<N us" -> count
+            "buckets": {f"<{2 ** b}us": n for b, n in sorted(self.buckets.items())},
+        }
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("metrics", "name", "started")
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """Histograms, counters and a ring of recent events for one process."""
+
+    def __init__(self, enabled=False, capacity=EVENT_CAPACITY):
+        self.enabled = enabled
+        self.histograms = {}
+        self.counters = {}
+        self.events = deque(maxlen=capacity)  # (wall time, name, seconds)
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds):
+        """Add one duration to name's histogram and the event ring."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram()
+            histogram.record(seconds)
+            self.events.append((time.time(), name, seconds))
+
+    def incr(self, name, n=1):
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def span(self, name):
+        """Context manager timing its block into name's histogram."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def timed(self, name=None):
+        """Decorator timing every call; named after the function by default.
+
+        Decided when the function is decorated: off, the function itself is
+        returned, so the switch has to be set before the module is imported.
+        """
+        def decorate(fn):
+            if not self.enabled:
+                return fn
+            label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                finally:
+                    self.record(label, time.perf_counter() - started)
+            return wrapper
+        return decorate
+
+    def snapshot(self):
+        """Return everything recorded so far as a JSON-ready dict."""
+        with self._lock:
+            histograms = {name: h.as_dict() for name, h in sorted(self.histograms.items())}
+            counters = dict(sorted(self.counters.items()))
+            events = [[t, name, seconds * 1e3] for t, name, seconds in self.events]
+        return {"pid": os.getpid(), "started": self.started, "time": time.time(),
+                "histograms": histograms, "counters": counters,
+                "events": events}  # [wall time, name, ms], oldest first
+
+    def dump(self, path=None):
+        """Write snapshot() as JSON to path (a per-process file by default)."""
+        if path is None:
+            path = os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp_path, path)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
+            self.events.clear()
+
+    def install_signal_handler(self, signum=None):
+        """Dump on SIGUSR1 (or signum); only from the main thread.
+
+        Python runs the handler the next time the main thread runs Python
+        code, e.g. the next menu callback, not while AppKit sits idle.
+        """
+        if not self.enabled:
+            return
+        import signal
+        signal.signal(signal.SIGUSR1 if signum is None else signum,
+                      lambda *_: self.dump())
+
+
+def _enabled_from_env():
+    return os.environ.get("PSN_AGENT_METRICS", "") not in ("", "0")
+
+
+metrics = Metrics(enabled=_enabled_from_env())
+if metrics.enabled:
+    atexit.register(metrics.dump)
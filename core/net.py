@@ -0,0 +1,109 @@
+"""Non-blocking internet connectivity checks."""
+import queue
+import socket
+import threading
+import time
+
+from core.metrics import metrics
+
+
+CONNECTIVITY_ENDPOINTS = [
+    ("8.8.8.8", 53),
+    ("1.1.1.1", 53),
+    ("208.67.222.222", 53),
+]
+
+
+class ConnectivityMonitor:
+    """Cached internet check that never blocks the caller.
+
+    A probe opens TCP connections to every endpoint in parallel and reports
+    online as soon as one succeeds. The result is cached for ``ttl`` seconds;
+    reading a stale or unknown state returns immediately and only starts a
+    background probe. Callbacks registered with on_change() are called from
+    the probe thread with the new state whenever it flips.
+    """
+
+    def __init__(self, endpoints=CONNECTIVITY_ENDPOINTS, timeout=2.0, ttl=30.0,
+                 assume_online=True):
+        self.endpoints = list(endpoints)
+        self.timeout = timeout
+        self.ttl = ttl
+        self.assume_online = assume_online
+        self._lock = threading.Lock()
+        self._state = None
+        self._checked_at = None
+        self._probing = False
+        self._probed = threading.Event()
+        self._callbacks = []
+
+    def on_change(self, callback):
+        self._callbacks.append(callback)
+
+    def is_online(self):
+        """Return the cached state, or assume_online while it is unknown."""
+        with self._lock:
+            state = self._state
+            stale = self._checked_at is None or \
+                time.monotonic() - self._checked_at > self.ttl
+        if stale:
+            self.refresh()
+        return self.assume_online if state is None else state
+
+    def refresh(self):
+        """Start a background probe unless one is already running."""
+        with self._lock:
+            if self._probing:
+                return
+            self._probing = True
+            self._probed.clear()
+        threading.Thread(target=self._probe_all, daemon=True).start()
+
+    def wait(self, timeout=None):
+        """Block until the running probe finishes; for scripts, not the UI."""
+        return self._probed.wait(timeout)
+
+    def _probe_all(self):
+        results = queue.Queue()
+        for endpoint in self.endpoints:
+            threading.Thread(target=self._probe, args=(endpoint, results),
+                             daemon=True).start()
+        online = False
+        deadline = time.monotonic() + self.timeout
+        for _ in self.endpoints:
+            try:
+                if results.get(timeout=max(0, deadline - time.monotonic())):
+                    online = True
+                    break
+            except queue.Empty:
+                break
+        self._set_state(online)
+
+    def _probe(self, endpoint, results):
+        try:
+            # create_connection sets a per-socket timeout and the with block
+            # closes it, unlike socket.setdefaulttimeout()
+            with socket.create_connection(endpoint, timeout=self.timeout):
+                results.put(True)
+        except OSError:
+            results.put(False)
+
+    def _set_state(self, online):
+        with self._lock:
+            previous = self.assume_online if self._state is None else self._state
+            self._state = online
+            self._checked_at = time.monotonic()
+            self._probing = False
+            self._probed.set()
+        if online != previous:
+            for callback in list(self._callbacks):
+                callback(online)
+
+
+connectivity = ConnectivityMonitor()
+
+
+@metrics.timed()
+def has_internet():
+    """Return the cached connectivity state without blocking."""
+    return connectivity.is_online()
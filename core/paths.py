@@ -0,0 +1,41 @@
+"""Locations of the bundled resources and the user's data files."""
+import os
+import sys
+
+
+def resource_path(relative_path):
+    """ Get absolute path to resource, works for dev and for PyInstaller/py2app bundle """
+    if hasattr(sys, '_MEIPASS'):
+        # PyInstaller
+        base_path = sys._MEIPASS
+    elif getattr(sys, 'frozen', False):
+        # py2app or other frozen
+        base_path = os.path.dirname(sys.executable)
+    else:
+        # Normal script; resources live next to main.py, one level up
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_path, relative_path)
+
+
+# PSN_AGENT_DATA_DIR points everything at another data directory (bench.py
+# uses it to work on a scratch copy)
+DATA_DIR = os.environ.get("PSN_AGENT_DATA_DIR") or resource_path("data")
+# Bundled, read-only images; DATA_DIR holds the user's files
+ASSETS_DIR = resource_path("data")
+TROPHY_CSV = os.path.join(DATA_DIR, "trophies.csv")
+TROPHY_LOG = os.path.join(DATA_DIR, "trophies.log")
+TROPHY_FIELDS = ["bronze", "silver", "gold", "platinum"]
+TROPHY_DB = os.path.join(DATA_DIR, "trophies.db")
+CONFIG_JSON = os.path.join(DATA_DIR, "config.json")
+TODO_JSON = os.path.join(DATA_DIR, "todo.json")
+TODO_JOURNAL = os.path.join(DATA_DIR, "todo.journal")
+DERIVATIVES_DIR = os.path.join(DATA_DIR, "derivatives")
+ASSET_ATLAS = os.path.join(DATA_DIR, "asset_atlas.png")
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
+METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+PROFILING_DIR = os.path.join(DATA_DIR, "profiling")
+DASHBOARD_LOCK = os.path.join(DATA_DIR, "dashboard.lock")
+# Unix socket paths are capped at ~104 bytes, so keep it out of the bundle.
+# $TMPDIR is per-user on macOS; tempfile.gettempdir() would cost ~15 ms here
+DASHBOARD_SOCKET = os.path.join(
+    os.environ.get("TMPDIR") or "/tmp", f"psn-dashboard-{os.getuid()}.sock")
@@ -0,0 +1,293 @@
+"""Profile menu ticks or the dashboard build: cProfile, tracemalloc, stack samples.
+
+    python main.py --profile [menu|dashboard] [--ticks N] [--headless]
+
+Three files are written to data/profiling (or --out), named after the
+target and the time:
+
+* ``.pstats``: the cProfile stats, for ``python -m pstats`` or snakeviz;
+* ``.alloc.txt``: the allocation sites that grew most between the first
+  and the last menu tick (for the dashboard, before and after the build);
+* ``.collapsed``: stacks sampled from the profiled thread, one
+  ``frame;frame;frame count`` line per stack, as flamegraph.pl and
+  speedscope read them.
+
+With --headless (the default where PyObjC is missing) AppKit, rumps and
+the other GUI frameworks are replaced by stubs, so the Python side of a
+tick or a window build can be profiled without a display.
+"""
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+import types
+
+from core.paths import PROFILING_DIR
+
+# Replaced by stubs in headless runs
+GUI_MODULES = [
+    "AppKit", "Foundation", "Cocoa", "WebKit", "Quartz", "objc",
+    "ScriptingBridge", "rumps", "PyObjCTools", "PyObjCTools.AppHelper",
+]
+# The main thread only lets the sampler in every sys.getswitchinterval()
+# (5 ms) while it is busy, so sampling faster buys nothing
+SAMPLE_INTERVAL = 0.005
+
+
+# --- GUI stubs ---
+class Stub:
+    """Any GUI object: attributes, calls and arithmetic all give more stubs.
+
+    A class statement with a stub base (class View(AppKit.NSView)) makes a
+    real StubObject subclass, so the app's own methods still run.
+    """
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return Stub()
+
+    def __call__(self, *args, **kwargs):
+        return Stub()
+
+    def __mro_entries__(self, bases):
+        return (StubObject,)
+
+    def __bool__(self):
+        return True
+
+    def __iter__(self):
+        return iter(())
+
+    def __len__(self):
+        return 0
+
+    def __getitem__(self, key):
+        return Stub()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __int__(self):
+        return 0
+
+    __index__ = __int__
+
+    def __float__(self):
+        return 0.0
+
+    def __format__(self, spec):
+        return format(0, spec)
+
+    def _stub(self, *other):
+        return Stub()
+
+    __add__ = __radd__ = __sub__ = __rsub__ = __mul__ = __rmul__ = _stub
+    __truediv__ = __rtruediv__ = __floordiv__ = __rfloordiv__ = __neg__ = _stub
+    __or__ = __ror__ = __and__ = __rand__ = _stub
+
+    def __lt__(self, other):
+        return False
+
+    __le__ = __gt__ = __ge__ = __lt__
+
+
+class _StubClass(type):
+    def __getattr__(cls, name):
+        # Class methods (alloc, new, sharedApplication, ...) hand out
+        # instances, so methods defined on a subclass run
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return lambda *args, **kwargs: cls.__new__(cls)
+
+
+class StubObject(Stub, metaclass=_StubClass):
+    """Base class of the app's classes that subclass a stubbed one."""
+
+
+def _stub_attribute(name):
+    if name.startswith("__"):
+        raise AttributeError(name)
+    return Stub()
+
+
+def install_gui_stubs():
+    """Put stub modules in sys.modules in place of the GUI frameworks."""
+    for name in GUI_MODULES:
+        module = types.ModuleType(name)
+        module.__getattr__ = _stub_attribute
+        sys.modules[name] = module
+
+
+def stop_app_after(seconds):
+    """Stop NSApp.run() seconds from now, so a profiled dashboard returns."""
+    import AppKit
+    from PyObjCTools import AppHelper
+
+    def stop():
+        AppKit.NSApp.stop_(None)
+        # stop_() only takes effect once the run loop handles another event
+        AppKit.NSApp.postEvent_atStart_(
+            AppKit.NSEvent.otherEventWithType_location_modifierFlags_timestamp_windowNumber_context_subtype_data1_data2_(
+                AppKit.NSEventTypeApplicationDefined, (0, 0), 0, 0, 0, None, 0, 0, 0),
+            True)
+    AppHelper.callLater(seconds, stop)
+
+
+# --- Stack sampling ---
+class StackSampler:
+    """Count one thread's stacks every interval seconds, for a flame graph."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = {}  # "outer;...;inner" -> samples
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}"
+                             f":{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                key = ";".join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write(self, path):
+        with open(path, "w") as f:
+            for stack, samples in sorted(self.counts.items()):
+                f.write(f"{stack} {samples}\n")
+
+
+# --- Targets ---
+def menu_work(ticks, mark):
+    """refresh_menu() ticks of a menu app; mark() after the first one."""
+    import menubar
+    app = menubar.PSNTrophyMenuApp(prewarm=False)
+    app.watcher.stop()
+
+    def work():
+        for tick in range(ticks):
+            app.refresh_menu(None)
+            if tick == 0:
+                mark()
+    return work
+
+
+def dashboard_work(seconds, mark):
+    """The dashboard's startup and window build, stopped after seconds."""
+    import AppKit
+    import dashboard
+
+    def work():
+        mark()
+        dashboard.preload_assets()
+        AppKit.NSApplication.sharedApplication().setActivationPolicy_(
+            AppKit.NSApplicationActivationPolicyRegular)
+        stop_app_after(seconds)
+        dashboard.run_dashboard()
+    return work
+
+
+def write_alloc_diff(path, first, last, top):
+    ignore = [tracemalloc.Filter(False, tracemalloc.__file__),
+              tracemalloc.Filter(False, __file__)]
+    stats = last.filter_traces(ignore).compare_to(first.filter_traces(ignore), "lineno")
+    grown = sorted((s for s in stats if s.size_diff > 0),
+                   key=lambda s: s.size_diff, reverse=True)
+    with open(path, "w") as f:
+        f.write(f"{sum(s.size_diff for s in grown)} B more held by {len(grown)} "
+                f"allocation sites from the first to the last tick; top {top}:\n\n")
+        for stat in grown[:top]:
+            f.write(f"{stat}\n")
+
+
+def run_profile(target="menu", ticks=100, seconds=3.0, headless=None,
+                out_dir=PROFILING_DIR, top=25):
+    """Profile target; returns the paths of the three files written."""
+    if headless is None:
+        import importlib.util
+        headless = importlib.util.find_spec("AppKit") is None
+    if headless:
+        install_gui_stubs()
+    from core.storage import ensure_data_files
+    ensure_data_files()
+
+    profiler = cProfile.Profile()
+    snapshots = []
+
+    def mark():
+        # Taking a snapshot is slow; keep it out of the stats
+        profiler.disable()
+        snapshots.append(tracemalloc.take_snapshot())
+        profiler.enable()
+    tracemalloc.start()
+    if target == "dashboard":
+        work = dashboard_work(seconds, mark)
+    else:
+        work = menu_work(ticks, mark)
+    sampler = StackSampler(threading.get_ident())
+    sampler.start()
+    profiler.enable()
+    try:
+        work()
+    finally:
+        profiler.disable()
+        sampler.stop()
+        snapshots.append(tracemalloc.take_snapshot())
+        tracemalloc.stop()
+
+    os.makedirs(out_dir, exist_ok=True)
+    base = os.path.join(out_dir, f"{target}-{time.strftime('%Y%m%d-%H%M%S')}")
+    paths = [base + ".pstats", base + ".alloc.txt", base + ".collapsed"]
+    profiler.dump_stats(paths[0])
+    write_alloc_diff(paths[1], snapshots[0], snapshots[-1], top)
+    sampler.write(paths[2])
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="main.py --profile",
+                                     description=__doc__.splitlines()[0])
+    parser.add_argument("target", nargs="?", choices=("menu", "dashboard"), default="menu")
+    parser.add_argument("--ticks", type=int, default=100,
+                        help="refresh_menu() calls to profile (menu)")
+    parser.add_argument("--seconds", type=float, default=3.0,
+                        help="how long the dashboard runs before it is stopped")
+    parser.add_argument("--headless", action="store_true", default=None,
+                        help="stub the GUI frameworks (the default without PyObjC)")
+    parser.add_argument("--top", type=int, default=25,
+                        help="allocation sites and functions to list")
+    parser.add_argument("--out", default=PROFILING_DIR)
+    args = parser.parse_args(argv)
+
+    paths = run_profile(args.target, max(1, args.ticks), args.seconds,
+                        args.headless, args.out, args.top)
+    pstats.Stats(paths[0], stream=sys.stdout).sort_stats("cumulative").print_stats(args.top)
+    for path in paths:
+        print(f"wrote {path}")
+    return 0
@@ -0,0 +1,368 @@
+"""Parse psnprofiles.com pages: a profile's counts and games, a game's trophies.
+
+The page is the one the dashboard's web view loads,
+``https://psnprofiles.com/<username>``. Two parts of it are read:
+
+* the header counts, ``div.trophy-count`` with one ``li`` per grade
+  (``li.platinum``, ``li.gold``, ...) holding the number;
+* the games table, ``table#gamesTable``, one ``tr`` per game with an
+  ``a.title`` link to the game's trophy list, a ``.small-info`` line such as
+  "12 of 50 Trophies • 300 points • Last played 5th Mar 2024" (or "All 50
+  Trophies"), a ``.progress-bar`` with the completion percentage and a
+  ``.platinum`` icon once the platinum is earned.
+
+parse_profile() builds a BeautifulSoup tree of the whole page. For large
+pages stream_profile() reads the file in chunks through the standard
+library's incremental HTMLParser and hands over each game as its row
+closes, so memory stays flat however many games the profile has. The
+per-game trophy lists (see read_trophy_list()) are always streamed.
+"""
+import codecs
+import os
+import re
+import time
+from collections import namedtuple
+from html.parser import HTMLParser
+
+from core.paths import TROPHY_FIELDS
+from core.state import state_repository
+from core.storage import ensure_data_files, write_behind
+from core.trophydb import TrophyDatabase
+
+BASE_URL = "https://psnprofiles.com"
+CHUNK_SIZE = 64 * 1024
+# Pages bigger than this are streamed by read_profile()
+STREAM_THRESHOLD = 1024 * 1024
+
+# last_played is an epoch time, or None if the row does not show it
+Game = namedtuple("Game", [
+    "game_id", "slug", "title", "url", "earned", "total", "completion", "platinum",
+    "last_played",
+])
+ProfilePage = namedtuple("ProfilePage", ["counts", "games"])
+# earned_at is an epoch time (None if not earned), rarity a percentage
+Trophy = namedtuple("Trophy", [
+    "game_id", "trophy_id", "title", "grade", "earned", "earned_at", "rarity",
+])
+
+_NUMBER = re.compile(r"\d[\d,]*")
+_TROPHY_LINK = re.compile(r"/trophies/((\d+)[^/?#]*)")
+_PERCENT = re.compile(r"(\d+)\s*%")
+_OF = re.compile(r"(\d[\d,]*)\s+of\s+(\d[\d,]*)")
+_ALL = re.compile(r"All\s+(\d[\d,]*)")
+_RARITY = re.compile(r"(\d+(?:\.\d+)?)\s*%")
+_LAST_PLAYED = re.compile(r"Last played\s+(\d+(?:st|nd|rd|th)?\s+\w+\s+\d{4})")
+_ORDINAL = re.compile(r"(\d+)(?:st|nd|rd|th)\b")
+
+
+class ProfileParseError(ValueError):
+    """The page is not a psnprofiles.com profile (no trophy counts found)."""
+
+
+def _number(text):
+    match = _NUMBER.search(text)
+    return int(match.group().replace(",", "")) if match else 0
+
+
+def parse_date(text, fmt):
+    """Return the epoch time of a date as the site shows it, or None."""
+    text = _ORDINAL.sub(r"\1", " ".join(text.split()))
+    try:
+        return time.mktime(time.strptime(text, fmt))
+    except ValueError:
+        return None
+
+
+def make_game(href, title, info, progress, platinum):
+    """Build a Game from the raw strings of one games-table row."""
+    match = _TROPHY_LINK.search(href or "")
+    if match is None:
+        return None
+    counted = _OF.search(info)
+    if counted:
+        earned, total = (_number(n) for n in counted.groups())
+    else:
+        complete = _ALL.search(info)
+        earned = total = _number(complete.group(1)) if complete else 0
+    percent = _PERCENT.search(progress)
+    if percent:
+        completion = int(percent.group(1))
+    else:
+        completion = earned * 100 // total if total else 0
+    played = _LAST_PLAYED.search(info)
+    url = href if href.startswith("http") else BASE_URL + href
+    return Game(int(match.group(2)), match.group(1), " ".join(title.split()),
+                url, earned, total, completion, platinum,
+                parse_date(played.group(1), "%d %b %Y") if played else None)
+
+
+def parse_profile(html):
+    """Parse a whole page (str or bytes) with BeautifulSoup into a ProfilePage."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
+    counts = {}
+    for li in soup.select("div.trophy-count li"):
+        for grade in TROPHY_FIELDS:
+            if grade in li.get("class", ()):
+                counts[grade] = _number(li.get_text())
+    if not counts:
+        raise ProfileParseError("no trophy counts on the page")
+    games = []
+    for row in soup.select("table#gamesTable tr"):
+        link = row.select_one("a.title")
+        if link is None:
+            continue
+        info = row.select_one(".small-info")
+        progress = row.select_one(".progress-bar")
+        game = make_game(
+            link.get("href"), link.get_text(),
+            info.get_text() if info else "",
+            progress.get_text() if progress else "",
+            row.select_one(".platinum") is not None)
+        if game is not None:
+            games.append(game)
+    return ProfilePage(counts, games)
+
+
+# Elements that never get an end tag, so they are not pushed on the stack
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input",
+             "link", "meta", "source", "track", "wbr"}
+
+
+class RoleParser(HTMLParser):
+    """Incremental parser that only tracks the elements it cares about.
+
+    Subclasses map start tags to a role (or None) in role_for(). Text inside
+    elements whose role is in text_roles is collected in self.text, and
+    closed(role) is called when the last open element with a role ends.
+    """
+
+    text_roles = frozenset()
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.roles = {}   # role -> number of open elements with it
+        self.text = {}    # role -> text pieces collected so far
+        self._stack = []  # (tag, role) for every open element
+
+    def role_for(self, tag, attrs, classes):
+        return None
+
+    def closed(self, role):
+        pass
+
+    def collected(self, role):
+        return "".join(self.text.pop(role, ()))
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        role = self.role_for(tag, attrs, (attrs.get("class") or "").split())
+        if tag in VOID_TAGS:
+            return
+        self._stack.append((tag, role))
+        if role is not None:
+            self.roles[role] = self.roles.get(role, 0) + 1
+
+    def handle_startendtag(self, tag, attrs):
+        attrs = dict(attrs)
+        self.role_for(tag, attrs, (attrs.get("class") or "").split())
+
+    def handle_endtag(self, tag):
+        # Close everything up to the matching element; stray end tags are ignored
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                break
+        else:
+            return
+        while len(self._stack) > i:
+            _, role = self._stack.pop()
+            if role is not None:
+                self.roles[role] -= 1
+                if not self.roles[role]:
+                    del self.roles[role]
+                    self.closed(role)
+
+    def handle_data(self, data):
+        for role in self.roles:
+            if role in self.text_roles:
+                self.text.setdefault(role, []).append(data)
+
+
+def feed_file(parser, fileobj, chunk_size=CHUNK_SIZE):
+    """Feed a binary or text file through parser in chunks."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    while True:
+        chunk = fileobj.read(chunk_size)
+        if not chunk:
+            break
+        parser.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+    parser.feed(decoder.decode(b"", final=True))
+    parser.close()
+    return parser
+
+
+class ProfileStreamParser(RoleParser):
+    """Incremental parser for the same markup parse_profile() reads.
+
+    Only the open elements and the text of the current row are kept;
+    on_game(game) is called as each games-table row closes.
+    """
+
+    text_roles = frozenset(TROPHY_FIELDS) | {"title", "info", "progress"}
+
+    def __init__(self, on_game):
+        super().__init__()
+        self.on_game = on_game
+        self.counts = {}
+        self._row = None
+
+    def role_for(self, tag, attrs, classes):
+        roles = self.roles
+        if "row" in roles:
+            if tag == "a" and "title" in classes:
+                self._row["href"] = attrs.get("href")
+                return "title"
+            if "platinum" in classes:
+                self._row["platinum"] = True
+            if "small-info" in classes:
+                return "info"
+            if "progress-bar" in classes:
+                return "progress"
+        elif "games" in roles:
+            if tag == "tr":
+                self._row = {"href": None, "platinum": False}
+                return "row"
+        elif "counts" in roles:
+            if tag == "li":
+                for grade in TROPHY_FIELDS:
+                    if grade in classes:
+                        return grade
+        elif tag == "div" and "trophy-count" in classes:
+            return "counts"
+        elif tag == "table" and attrs.get("id") == "gamesTable":
+            return "games"
+        return None
+
+    def closed(self, role):
+        if role in TROPHY_FIELDS:
+            self.counts[role] = _number(self.collected(role))
+        elif role == "row":
+            game = make_game(self._row["href"], self.collected("title"),
+                             self.collected("info"), self.collected("progress"),
+                             self._row["platinum"])
+            self._row = None
+            if game is not None:
+                self.on_game(game)
+
+
+def stream_profile(fileobj, on_game, chunk_size=CHUNK_SIZE):
+    """Feed a binary or text file through ProfileStreamParser; return the counts."""
+    parser = feed_file(ProfileStreamParser(on_game), fileobj, chunk_size)
+    if not parser.counts:
+        raise ProfileParseError("no trophy counts on the page")
+    return parser.counts
+
+
+# --- Per-game trophy lists ---
+# A game's page (the link in the profile's games table) lists one trophy
+# per table row: an a.title link to /trophy/<game id>-<slug>/<n>-<name>, the
+# grade as an img titled "Bronze", "Silver", "Gold" or "Platinum", the
+# rarity in .typo-top ("12.34%") and, on earned rows (tr.completed), the
+# date in .typo-top-date ("5th Mar 2024 8:12:45 PM").
+_TROPHY_ID = re.compile(r"/trophy/(\d+)[^/]*/(\d+)")
+_EARNED_FORMAT = "%d %b %Y %I:%M:%S %p"
+
+
+class TrophyListParser(RoleParser):
+    """Incremental parser for a game's trophy list; on_trophy(t) per row."""
+
+    text_roles = frozenset({"title", "date", "rarity"})
+
+    def __init__(self, on_trophy):
+        super().__init__()
+        self.on_trophy = on_trophy
+        self._row = None
+
+    def role_for(self, tag, attrs, classes):
+        if "row" not in self.roles:
+            if tag == "tr":
+                self._row = {"href": None, "grade": None,
+                             "earned": "completed" in classes}
+                return "row"
+            return None
+        if tag == "a" and "title" in classes:
+            self._row["href"] = attrs.get("href")
+            return "title"
+        if tag == "img" and (attrs.get("title") or "").lower() in TROPHY_FIELDS:
+            self._row["grade"] = attrs["title"].lower()
+        if "typo-top-date" in classes:
+            return "date"
+        if "typo-top" in classes:
+            return "rarity"
+        return None
+
+    def closed(self, role):
+        if role != "row":
+            return
+        row, self._row = self._row, None
+        title, date, rarity = (self.collected(r) for r in ("title", "date", "rarity"))
+        match = _TROPHY_ID.search(row["href"] or "")
+        if match is None or row["grade"] is None:
+            return
+        percent = _RARITY.search(rarity)
+        self.on_trophy(Trophy(
+            int(match.group(1)), int(match.group(2)), " ".join(title.split()),
+            row["grade"], row["earned"],
+            parse_date(date, _EARNED_FORMAT) if row["earned"] else None,
+            float(percent.group(1)) if percent else None))
+
+
+def read_trophy_list(fileobj, chunk_size=CHUNK_SIZE):
+    """Return the Trophy rows of a game page read from fileobj."""
+    trophies = []
+    feed_file(TrophyListParser(trophies.append), fileobj, chunk_size)
+    return trophies
+
+
+def read_profile(path, stream=None):
+    """Parse the saved page at path into a ProfilePage.
+
+    stream=None streams pages over STREAM_THRESHOLD, or any page if
+    BeautifulSoup is not installed.
+    """
+    if stream is None:
+        try:
+            import bs4  # noqa: F401
+            stream = os.path.getsize(path) > STREAM_THRESHOLD
+        except ImportError:
+            stream = True
+    with open(path, "rb") as f:
+        if not stream:
+            return parse_profile(f.read())
+        games = []
+        counts = stream_profile(f, games.append)
+    return ProfilePage(counts, games)
+
+
+def import_profile(path, stream=None):
+    """Read a saved profile page and store its trophy counts and game list.
+
+    The page has no per-trophy data, so the menu counts come from its header.
+    """
+    page = read_profile(path, stream)
+    state_repository.update_trophies(
+        {grade: page.counts.get(grade, 0) for grade in TROPHY_FIELDS})
+    db = TrophyDatabase()
+    try:
+        db.upsert_games(page.games)
+    finally:
+        db.close()
+    return page
+
+
+def print_import(path):
+    ensure_data_files()
+    page = import_profile(path)
+    write_behind.flush()
+    counts = ", ".join(f"{page.counts.get(g, 0)} {g}" for g in TROPHY_FIELDS)
+    print(f"Imported {counts} and {len(page.games)} games from {path}")
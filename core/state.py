@@ -0,0 +1,130 @@
+"""Process-wide, in-memory view of the profile config and trophy counts."""
+import threading
+from collections import namedtuple
+
+from core.levels import calculate_level, calculate_points
+from core.paths import CONFIG_JSON, TROPHY_FIELDS, TROPHY_LOG
+from core.storage import load_config, load_trophies, save_config, save_trophies
+from core.watch import file_fingerprint
+
+
+ProfileSnapshot = namedtuple("ProfileSnapshot", [
+    "username", "profile_path", "banner_path",
+    "bronze", "silver", "gold", "platinum",
+    "points", "level", "current", "required", "percent",
+])
+
+
+class StateRepository:
+    """Load config and trophies once and hand out immutable snapshots.
+
+    Edits go through update_config/update_trophies, which persist through the
+    write-behind store. refresh() picks up external edits by comparing file
+    fingerprints, so reading a snapshot never touches the disk. Every update
+    refreshes first, so it never writes stale fields back over those edits.
+    Subscribers are called with (snapshot, changed_fields) whenever a field
+    changes.
+    """
+
+    def __init__(self, config_path=CONFIG_JSON, trophy_path=TROPHY_LOG):
+        self.config_path = config_path
+        self.trophy_path = trophy_path
+        self._lock = threading.RLock()
+        self._config = None
+        self._trophies = None
+        self._fingerprints = {}
+        self._snapshot = None
+        self._subscribers = []
+
+    def snapshot(self):
+        with self._lock:
+            if self._snapshot is None:
+                self.refresh()
+            return self._snapshot
+
+    def config(self):
+        """Return a copy of the full config dict."""
+        with self._lock:
+            self.snapshot()
+            return dict(self._config)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def update_config(self, **changes):
+        with self._lock:
+            self.refresh()
+            self._config.update(changes)
+            save_config(dict(self._config))
+            return self._publish()
+
+    def update_trophies(self, trophies):
+        with self._lock:
+            self.refresh()
+            for t in TROPHY_FIELDS:
+                if t in trophies:
+                    value = str(trophies[t])
+                    self._trophies[t] = value if value.isdigit() else "0"
+            save_trophies(self._trophies)
+            return self._publish()
+
+    def add_trophies(self, deltas):
+        """Add {grade: delta} to the counts, keeping any edits made by hand."""
+        with self._lock:
+            self.refresh()
+            counts = {t: max(0, int(self._trophies.get(t, 0)) + deltas[t])
+                      for t in TROPHY_FIELDS if deltas.get(t)}
+            # Nothing earned, nothing written to the history
+            return self.update_trophies(counts) if counts else set()
+
+    def refresh(self):
+        """Reload files that changed on disk; return the changed fields."""
+        with self._lock:
+            fingerprints = {path: file_fingerprint(path)
+                            for path in (self.config_path, self.trophy_path)}
+            first = self._snapshot is None
+            if not first and fingerprints == self._fingerprints:
+                return set()
+            # A missing file fingerprints as None every time, so the first
+            # load can't rely on the fingerprint changing
+            if first or fingerprints[self.config_path] != self._fingerprints.get(self.config_path):
+                self._config = load_config()
+            if first or fingerprints[self.trophy_path] != self._fingerprints.get(self.trophy_path):
+                self._trophies = load_trophies()
+            self._fingerprints = fingerprints
+            return self._publish()
+
+    def _publish(self):
+        trophies = {t: int(self._trophies.get(t, 0)) for t in TROPHY_FIELDS}
+        points = calculate_points(trophies)
+        level, current, required, percent = calculate_level(points)
+        snapshot = ProfileSnapshot(
+            username=self._config.get("username", ""),
+            profile_path=self._config.get("profile_path", ""),
+            banner_path=self._config.get("banner_path", ""),
+            points=points, level=level, current=current,
+            required=required, percent=percent, **trophies)
+        old = self._snapshot
+        self._snapshot = snapshot
+        if old is None:
+            changed = set(snapshot._fields)
+        else:
+            changed = {f for f in snapshot._fields
+                       if getattr(old, f) != getattr(snapshot, f)}
+        if changed:
+            for callback in list(self._subscribers):
+                callback(snapshot, changed)
+        return changed
+
+
+state_repository = StateRepository()
+
+
+def menu_subtitle(snapshot):
+    """Return the menu bar subtitle line for a snapshot."""
+    trophy_total = snapshot.bronze + snapshot.silver + \
+        snapshot.gold + snapshot.platinum
+    return f"{snapshot.username} | Lv. {snapshot.level} | {snapshot.percent}% | {trophy_total} trophies"
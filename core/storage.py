@@ -0,0 +1,252 @@
+"""Trophy history log, write-behind persistence and the config/trophy files."""
+import atexit
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+
+from core.metrics import metrics
+from core.paths import CONFIG_JSON, DATA_DIR, TROPHY_CSV, TROPHY_FIELDS, TROPHY_LOG
+
+
+# --- Trophy history log ---
+class TrophyHistory:
+    """Append-only log of trophy snapshots.
+
+    Every record is a fixed-width (timestamp, bronze, silver, gold, platinum)
+    struct, so the latest snapshot is simply the last record and time ranges
+    are bisected through an mmap of the file instead of parsing it.
+    """
+
+    RECORD = struct.Struct("<dIIII")
+
+    def __init__(self, path):
+        self.path = path
+
+    def __len__(self):
+        try:
+            return os.path.getsize(self.path) // self.RECORD.size
+        except FileNotFoundError:
+            return 0
+
+    def append(self, trophies, timestamp=None):
+        counts = [int(trophies.get(t, 0) or 0) for t in TROPHY_FIELDS]
+        timestamp = time.time() if timestamp is None else timestamp
+        fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size % self.RECORD.size:
+                # Drop a record torn by a crash mid-write
+                size -= size % self.RECORD.size
+                os.ftruncate(fd, size)
+            if size:
+                # Keep timestamps non-decreasing so ranges stay bisectable
+                last = self.RECORD.unpack(
+                    os.pread(fd, self.RECORD.size, size - self.RECORD.size))
+                timestamp = max(timestamp, last[0])
+            os.write(fd, self.RECORD.pack(timestamp, *counts))
+        finally:
+            os.close(fd)
+
+    def latest(self):
+        """Return the newest (timestamp, bronze, silver, gold, platinum) record."""
+        try:
+            with open(self.path, 'rb') as f:
+                count = f.seek(0, os.SEEK_END) // self.RECORD.size
+                if not count:
+                    return None
+                f.seek((count - 1) * self.RECORD.size)
+                return self.RECORD.unpack(f.read(self.RECORD.size))
+        except FileNotFoundError:
+            return None
+
+    def query(self, start=None, end=None):
+        """Return every record with start <= timestamp < end."""
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            return []
+        with f:
+            count = os.fstat(f.fileno()).st_size // self.RECORD.size
+            if not count:
+                return []
+            with mmap.mmap(f.fileno(), count * self.RECORD.size,
+                           access=mmap.ACCESS_READ) as mm:
+                index = RecordTimestamps(mm, count, self.RECORD.size)
+                lo = 0 if start is None else bisect.bisect_left(index, start)
+                hi = count if end is None else bisect.bisect_left(index, end)
+                return [self.RECORD.unpack_from(mm, i * self.RECORD.size)
+                        for i in range(lo, hi)]
+
+
+class RecordTimestamps:
+    """Sequence view of the timestamps in an mmapped history log, for bisect."""
+
+    TIMESTAMP = struct.Struct("<d")
+
+    def __init__(self, buf, count, record_size):
+        self.buf = buf
+        self.count = count
+        self.record_size = record_size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        return self.TIMESTAMP.unpack_from(self.buf, i * self.record_size)[0]
+
+
+trophy_history = TrophyHistory(TROPHY_LOG)
+
+
+
+# --- Write-behind persistence ---
+class WriteBehindStore:
+    """Coalesce bursts of writes and persist them atomically.
+
+    Each key holds only its newest pending value. Once no write has arrived
+    for ``delay`` seconds (or ``max_delay`` has passed since the first one)
+    everything pending is flushed: files go through a temp file and
+    os.replace so readers never see a truncated file, and their fsyncs are
+    batched ahead of the renames.
+    """
+
+    def __init__(self, delay=0.25, max_delay=2.0):
+        self.delay = delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending = {}  # key -> (value, action or None for a file write)
+        self._first_pending = None
+        self._timer = None
+        self._due = None
+        self._generation = 0
+
+    def write(self, path, data):
+        """Schedule an atomic replace of path with data (bytes)."""
+        self.defer(path, data, None)
+
+    def defer(self, key, value, action):
+        """Schedule action(value), replacing any pending value for key."""
+        with self._lock:
+            self._pending[key] = (value, action)
+            now = time.monotonic()
+            if self._first_pending is None:
+                self._first_pending = now
+            due = min(now + self.delay, self._first_pending + self.max_delay)
+            if self._timer is not None and due <= self._due:
+                # Already due by max_delay; keep that timer
+                return
+            if self._timer is not None:
+                self._timer.cancel()
+            self._generation += 1
+            self._due = due
+            self._timer = threading.Timer(max(0, due - now), self._on_timer,
+                                          args=(self._generation,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _on_timer(self, generation):
+        with self._lock:
+            # A timer cancelled after it started firing must not flush too
+            if generation != self._generation:
+                return
+        self.flush()
+
+    def pending(self, key):
+        """Return the value waiting to be written under key, or None."""
+        with self._lock:
+            entry = self._pending.get(key)
+        return None if entry is None else entry[0]
+
+    @metrics.timed()
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch = dict(self._pending)
+                self._first_pending = None
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                    self._generation += 1
+            renames = []
+            for key, (value, action) in batch.items():
+                if action is None:
+                    tmp_path = f"{key}.{os.getpid()}.tmp"
+                    with open(tmp_path, 'wb') as f:
+                        f.write(value)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    renames.append((tmp_path, key))
+            for tmp_path, path in renames:
+                os.replace(tmp_path, path)
+            for directory in {os.path.dirname(path) for _, path in renames}:
+                fd = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+            for key, (value, action) in batch.items():
+                if action is not None:
+                    action(value)
+            with self._lock:
+                # Keep anything that was re-written while we were flushing
+                for key, entry in batch.items():
+                    if self._pending.get(key) is entry:
+                        del self._pending[key]
+
+
+write_behind = WriteBehindStore()
+atexit.register(write_behind.flush)
+
+
+@metrics.timed()
+def load_config():
+    pending = write_behind.pending(CONFIG_JSON)
+    if pending is not None:
+        return json.loads(pending)
+    with open(CONFIG_JSON, 'r') as f:
+        return json.load(f)
+
+
+@metrics.timed()
+def save_config(config):
+    write_behind.write(CONFIG_JSON, json.dumps(config).encode())
+
+
+@metrics.timed()
+def load_trophies():
+    """Return the latest snapshot without scanning the history log."""
+    pending = write_behind.pending(TROPHY_LOG)
+    if pending is not None:
+        return dict(pending)
+    record = trophy_history.latest()
+    if record is None:
+        return {t: "0" for t in TROPHY_FIELDS}
+    return {t: str(count) for t, count in zip(TROPHY_FIELDS, record[1:])}
+
+
+@metrics.timed()
+def save_trophies(trophies):
+    snapshot = {t: str(trophies.get(t, 0)) for t in TROPHY_FIELDS}
+    write_behind.defer(TROPHY_LOG, snapshot, trophy_history.append)
+
+
+def ensure_data_files():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    if not os.path.exists(CONFIG_JSON):
+        default_config = {"username": "",
+                          "profile_path": "", "banner_path": ""}
+        with open(CONFIG_JSON, 'w') as f:
+            json.dump(default_config, f)
+    if not len(trophy_history):
+        # Seed the history from the legacy single-row CSV if there is one
+        default_trophies = {"bronze": 0, "silver": 0, "gold": 0, "platinum": 0}
+        if os.path.exists(TROPHY_CSV):
+            with open(TROPHY_CSV, newline='') as csvfile:
+                default_trophies = next(csv.DictReader(csvfile), default_trophies)
+        trophy_history.append(default_trophies)
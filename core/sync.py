@@ -0,0 +1,142 @@
+"""Trophy sync: the psnprofiles.com profile plus every game's trophy list.
+
+Syncs are incremental: the profile is always fetched, but a game's page
+only when its fingerprint on the profile (last played time and trophy
+counts) differs from the one recorded when its trophies were last stored,
+and then from the server, never a cached copy that predates the change.
+The menu counts then move by how much the database summary moved.
+"""
+import io
+import itertools
+from collections import namedtuple
+
+from core.fetch import FetchError
+from core.httpcache import CachingFetcher
+from core.psnprofiles import ProfileParseError, read_trophy_list, stream_profile
+from core.state import state_repository
+from core.storage import ensure_data_files, write_behind
+from core.trophydb import TrophyDatabase, fingerprint
+
+# trophies maps game_id -> [Trophy] for every game page that was parsed;
+# unchanged holds the game_ids whose page was not parsed because db already
+# has it as it is: same fingerprint (not fetched at all, or from the cache
+# under full) or confirmed by a 304 to a CachingFetcher; errors maps a page
+# path -> FetchError
+SyncResult = namedtuple("SyncResult", ["counts", "games", "trophies", "unchanged", "errors"])
+
+# Asks a CachingFetcher to revalidate rather than serve a fresh cached copy
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+def profile_path(username):
+    from urllib.parse import quote
+    return "/" + quote(username)
+
+
+def game_path(game):
+    from urllib.parse import urlsplit
+    return urlsplit(game.url).path
+
+
+def fetch_profile(fetcher, username):
+    """Fetch and parse the profile page; returns (counts, games)."""
+    response = fetcher.get(profile_path(username))
+    games = []
+    counts = stream_profile(io.BytesIO(response.body), games.append)
+    return counts, games
+
+
+def sync_profile(username, fetcher=None, db=None, store=True, full=False):
+    """Fetch the profile and the changed games' trophy lists; returns a SyncResult.
+
+    Game pages are fetched concurrently through fetcher (a CachingFetcher
+    for psnprofiles.com if None) and parsed as they arrive, unless the
+    fetcher reports them unchanged and db already holds their trophies.
+    Pages of games whose fingerprint changed are always revalidated.
+    full fetches every game's page, whatever its fingerprint. With store,
+    the result is written to db (the default TrophyDatabase if None) and
+    the menu's counts updated by the change in its summary.
+    """
+    own_fetcher = fetcher is None
+    if own_fetcher:
+        fetcher = CachingFetcher()
+    own_db = store and db is None
+    if own_db:
+        db = TrophyDatabase()
+    try:
+        known = db.fingerprints() if db is not None else {}
+        counts, games = fetch_profile(fetcher, username)
+        trophies = {}
+        unchanged = set()
+        errors = {}
+        by_path = {}
+        changed, same = [], []
+        for game in games:
+            current = known.get(game.game_id) == fingerprint(game)
+            if current and not full:
+                unchanged.add(game.game_id)
+                continue
+            by_path[game_path(game)] = game
+            (same if current else changed).append(game_path(game))
+        # A cached copy of a changed game's page can predate the change
+        responses = itertools.chain(fetcher.get_many(changed, NO_CACHE),
+                                    fetcher.get_many(same))
+        for path, response in responses:
+            game = by_path[path]
+            if isinstance(response, FetchError):
+                errors[path] = response
+            elif game.game_id in known and getattr(response, "not_modified", False) \
+                    and (known[game.game_id] == fingerprint(game)
+                         or getattr(response, "revalidated", False)):
+                unchanged.add(game.game_id)
+            else:
+                trophies[game.game_id] = read_trophy_list(io.BytesIO(response.body))
+        result = SyncResult(counts, games, trophies, unchanged, errors)
+        if store:
+            store_sync(result, db)
+        return result
+    finally:
+        if own_fetcher:
+            fetcher.close()
+        if own_db:
+            db.close()
+
+
+def store_sync(result, db):
+    """Write a SyncResult to db and apply the change in its summary to the menu.
+
+    Into an empty database the summary is taken as the counts outright.
+    """
+    before = db.summary()
+    db.upsert_games(result.games)
+    for game_id, trophies in result.trophies.items():
+        db.replace_trophies(game_id, trophies)
+    # Only games stored or confirmed current get their new fingerprint;
+    # failed pages keep the old one, so the next sync retries them
+    db.record_fingerprints([game for game in result.games
+                            if game.game_id in result.trophies
+                            or game.game_id in result.unchanged])
+    after = db.summary()
+    if any(before.values()):
+        state_repository.add_trophies({t: after[t] - before[t] for t in after})
+    else:
+        state_repository.update_trophies(after)
+
+
+def print_sync(username=None, full=False):
+    ensure_data_files()
+    username = username or state_repository.snapshot().username
+    if not username:
+        print("No PSN username set; pass one after --sync")
+        return 1
+    try:
+        result = sync_profile(username, full=full)
+    except (FetchError, ProfileParseError) as e:
+        print(f"Sync failed: {e}")
+        return 1
+    write_behind.flush()
+    synced = sum(len(t) for t in result.trophies.values())
+    print(f"Synced {len(result.games)} games and {synced} trophies for {username}"
+          + (f", {len(result.unchanged)} games unchanged" if result.unchanged else "")
+          + (f"; {len(result.errors)} game pages failed" if result.errors else ""))
+    return 0
@@ -0,0 +1,200 @@
+"""Todo list stored as an append-only journal."""
+import json
+import os
+import threading
+
+from core.paths import TODO_JOURNAL, TODO_JSON
+
+
+class TodoJournal:
+    """Todo list persisted as an append-only journal.
+
+    Each line is one JSON record: [id, text] adds an item, [-id] removes
+    it and [] clears the list, so every edit is a single O(1) append. Items
+    keep stable integer ids that are never reused, even after a removal,
+    a clear or a compaction. Once the journal holds more than
+    ``compact_threshold`` records, and at least twice as many as there are
+    live items, it is rewritten in the background.
+    """
+
+    def __init__(self, path, legacy_path=None, compact_threshold=1000):
+        self.path = path
+        self.legacy_path = legacy_path
+        self.compact_threshold = compact_threshold
+        self._lock = threading.Lock()
+        self._items = None  # id -> text, in insertion order; loaded lazily
+        self._next_id = 1
+        self._records = 0
+        self._file = None
+        self._tail = None  # records appended while a compaction runs
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._items)
+
+    def items(self):
+        """Return [(id, text)] in the order the items were added."""
+        with self._lock:
+            self._load()
+            return list(self._items.items())
+
+    def add(self, text):
+        with self._lock:
+            self._load()
+            item_id = self._next_id
+            self._next_id += 1
+            self._items[item_id] = text
+            self._append(self._add_record(item_id, text))
+            return item_id
+
+    def remove(self, item_id):
+        with self._lock:
+            self._load()
+            if self._items.pop(item_id, None) is None:
+                return False
+            self._append(f"[-{item_id}]\n")
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._load()
+            self._items.clear()
+            self._append("[]\n")
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    @staticmethod
+    def _add_record(item_id, text):
+        return json.dumps([item_id, text]) + "\n"
+
+    def _load(self):
+        if self._items is not None:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = f.read()
+        except FileNotFoundError:
+            self._migrate()
+            return
+        torn = len(data) - (data.rfind("\n") + 1)
+        if torn:
+            # Drop a record torn by a crash mid-append
+            data = data[:len(data) - torn]
+            with open(self.path, 'r+', encoding='utf-8') as f:
+                f.truncate(len(data.encode('utf-8')))
+        flat = self._parse(data)
+        tokens = iter(flat)
+        items = {}
+        last_id = 0
+        others = 0  # removals and clears
+        for token in tokens:
+            if token > 0:
+                items[token] = next(tokens)
+                continue
+            others += 1
+            if token:
+                items.pop(-token, None)
+                last_id = max(last_id, -token)
+            else:
+                last_id = max(last_id, max(items, default=0))
+                items.clear()
+        self._items = items
+        self._next_id = max(last_id, max(items, default=0)) + 1
+        # An add is two tokens, the rest one each
+        self._records = others + (len(flat) - others) // 2
+
+    @staticmethod
+    def _parse(data):
+        """Parse the journal into one flat list of its records' fields.
+
+        [1, "a"]\n[-1]\n[]\n reads as [1, "a", -1, 0]. JSON escapes newlines, so the whole journal parses in one call, and
+        a flat array is far cheaper than an array of 100k little lists. A
+        clear leaves an empty slot that makes the fast parse fail; it is
+        then written as id 0, which is never handed out.
+        """
+        if not data:
+            return []
+        try:
+            return json.loads(data[:-1].replace("]\n[", ","))
+        except ValueError:
+            if "[]\n" not in data:
+                raise
+        return json.loads(data[:-1].replace("[]\n", "[0]\n").replace("]\n[", ","))
+
+    def _migrate(self):
+        """Start the journal from the legacy todo.json list if there is one."""
+        todos = []
+        if self.legacy_path and os.path.exists(self.legacy_path):
+            with open(self.legacy_path, "r") as f:
+                todos = json.load(f)
+        self._items = {}
+        for text in todos:
+            self._items[self._next_id] = text
+            self._next_id += 1
+        self._records = self._write_compacted(self.path, list(self._items.items()))
+
+    def _append(self, record):
+        if self._file is None:
+            self._file = open(self.path, 'a', encoding='utf-8')
+        self._file.write(record)
+        self._file.flush()
+        self._records += 1
+        if self._tail is not None:
+            self._tail.append(record)
+        elif self._records > max(self.compact_threshold, 2 * len(self._items)):
+            self._tail = []
+            threading.Thread(target=self._compact,
+                             args=(list(self._items.items()), self._next_id - 1),
+                             daemon=True).start()
+
+    def _write_compacted(self, path, items, last_id=0):
+        records = [self._add_record(i, t) for i, t in items]
+        if last_id > max((i for i, _ in items), default=0):
+            # Keep the highest id handed out, so a reload doesn't reuse it
+            records.append(f"[-{last_id}]\n")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("".join(records))
+            f.flush()
+            os.fsync(f.fileno())
+        return len(records)
+
+    def compact(self):
+        """Rewrite the journal so it holds one record per live item."""
+        with self._lock:
+            self._load()
+            if self._tail is not None:
+                return  # a background compaction is already running
+            self._tail = []
+            items = list(self._items.items())
+            last_id = self._next_id - 1
+        self._compact(items, last_id)
+
+    def _compact(self, items, last_id):
+        tmp_path = self.path + ".compact"
+        try:
+            written = self._write_compacted(tmp_path, items, last_id)
+            with self._lock:
+                with open(tmp_path, 'a', encoding='utf-8') as f:
+                    f.write("".join(self._tail))
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                os.replace(tmp_path, self.path)
+                self._records = written + len(self._tail)
+        finally:
+            # If anything failed the journal itself is intact; stop
+            # collecting a tail so the next compaction can run
+            with self._lock:
+                self._tail = None
+            try:
+                os.remove(tmp_path)
+            except FileNotFoundError:
+                pass
+
+
+todo_store = TodoJournal(TODO_JOURNAL, legacy_path=TODO_JSON)
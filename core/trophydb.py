@@ -0,0 +1,229 @@
+"""Per-game, per-trophy database (SQLite in WAL mode).
+
+games holds one row per game from the profile; trophies one row per trophy
+with its grade, earned time and rarity. Triggers keep each game's trophy
+counts and a single summary row of earned trophies per grade up to date on
+every insert, update and delete, so the four counts the menu shows are a
+one-row read however many trophies there are.
+
+Each game also records the fingerprint (last played time and trophy
+counts from the profile) it had when its trophy list was last stored, so
+a sync can tell from the profile alone which games need fetching again.
+"""
+import os
+import threading
+from collections import namedtuple
+
+from core.paths import TROPHY_DB, TROPHY_FIELDS
+
+# MIGRATIONS[n] takes a database from user_version n to n + 1
+MIGRATIONS = ["""
+CREATE TABLE games (
+    game_id INTEGER PRIMARY KEY,
+    slug TEXT NOT NULL,
+    title TEXT NOT NULL,
+    url TEXT NOT NULL,
+    completion INTEGER NOT NULL DEFAULT 0,
+    -- Maintained by the trophies triggers
+    trophies INTEGER NOT NULL DEFAULT 0,
+    earned INTEGER NOT NULL DEFAULT 0,
+    platinum_total INTEGER NOT NULL DEFAULT 0,
+    platinum_earned INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE trophies (
+    game_id INTEGER NOT NULL REFERENCES games(game_id) ON DELETE CASCADE,
+    trophy_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    grade TEXT NOT NULL CHECK (grade IN ('bronze', 'silver', 'gold', 'platinum')),
+    earned INTEGER NOT NULL DEFAULT 0,
+    earned_at REAL,
+    rarity REAL,
+    PRIMARY KEY (game_id, trophy_id)
+) WITHOUT ROWID;
+CREATE TABLE summary (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    bronze INTEGER NOT NULL DEFAULT 0,
+    silver INTEGER NOT NULL DEFAULT 0,
+    gold INTEGER NOT NULL DEFAULT 0,
+    platinum INTEGER NOT NULL DEFAULT 0
+);
+INSERT INTO summary (id) VALUES (1);
+
+-- Earned per month, and the rarest earned trophies
+CREATE INDEX trophies_earned_at ON trophies (earned_at) WHERE earned = 1;
+CREATE INDEX trophies_rarity ON trophies (rarity) WHERE earned = 1;
+-- Games closest to their platinum
+CREATE INDEX games_platinum_progress ON games ((CAST(earned AS REAL) / trophies) DESC)
+    WHERE platinum_total > 0 AND platinum_earned = 0;
+
+CREATE TRIGGER trophies_insert AFTER INSERT ON trophies BEGIN
+    UPDATE games SET
+        trophies = trophies + 1,
+        earned = earned + NEW.earned,
+        platinum_total = platinum_total + (NEW.grade = 'platinum'),
+        platinum_earned = platinum_earned + (NEW.grade = 'platinum' AND NEW.earned)
+    WHERE game_id = NEW.game_id;
+    UPDATE summary SET
+        bronze = bronze + (NEW.earned AND NEW.grade = 'bronze'),
+        silver = silver + (NEW.earned AND NEW.grade = 'silver'),
+        gold = gold + (NEW.earned AND NEW.grade = 'gold'),
+        platinum = platinum + (NEW.earned AND NEW.grade = 'platinum')
+    WHERE NEW.earned AND id = 1;
+END;
+CREATE TRIGGER trophies_delete AFTER DELETE ON trophies BEGIN
+    UPDATE games SET
+        trophies = trophies - 1,
+        earned = earned - OLD.earned,
+        platinum_total = platinum_total - (OLD.grade = 'platinum'),
+        platinum_earned = platinum_earned - (OLD.grade = 'platinum' AND OLD.earned)
+    WHERE game_id = OLD.game_id;
+    UPDATE summary SET
+        bronze = bronze - (OLD.earned AND OLD.grade = 'bronze'),
+        silver = silver - (OLD.earned AND OLD.grade = 'silver'),
+        gold = gold - (OLD.earned AND OLD.grade = 'gold'),
+        platinum = platinum - (OLD.earned AND OLD.grade = 'platinum')
+    WHERE OLD.earned AND id = 1;
+END;
+CREATE TRIGGER trophies_update AFTER UPDATE OF earned, grade ON trophies
+WHEN OLD.earned != NEW.earned OR OLD.grade != NEW.grade BEGIN
+    UPDATE games SET
+        earned = earned - OLD.earned + NEW.earned,
+        platinum_total = platinum_total - (OLD.grade = 'platinum') + (NEW.grade = 'platinum'),
+        platinum_earned = platinum_earned - (OLD.grade = 'platinum' AND OLD.earned)
+                                          + (NEW.grade = 'platinum' AND NEW.earned)
+    WHERE game_id = NEW.game_id;
+    UPDATE summary SET
+        bronze = bronze - (OLD.earned AND OLD.grade = 'bronze') + (NEW.earned AND NEW.grade = 'bronze'),
+        silver = silver - (OLD.earned AND OLD.grade = 'silver') + (NEW.earned AND NEW.grade = 'silver'),
+        gold = gold - (OLD.earned AND OLD.grade = 'gold') + (NEW.earned AND NEW.grade = 'gold'),
+        platinum = platinum - (OLD.earned AND OLD.grade = 'platinum') + (NEW.earned AND NEW.grade = 'platinum')
+    WHERE id = 1;
+END;
+""", """
+ALTER TABLE games ADD COLUMN last_played REAL;
+-- fingerprint() of the game when its trophies were last stored
+ALTER TABLE games ADD COLUMN fingerprint TEXT;
+"""]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+GameProgress = namedtuple("GameProgress", ["game_id", "title", "earned", "trophies"])
+EarnedTrophy = namedtuple("EarnedTrophy", [
+    "game_id", "trophy_id", "game_title", "title", "grade", "earned_at", "rarity",
+])
+
+
+def fingerprint(game):
+    """What has to change on the profile for a game's trophy list to change."""
+    return f"{game.last_played or ''}:{game.earned}/{game.total}"
+
+
+class TrophyDatabase:
+    """The trophy database at path, created on first use."""
+
+    def __init__(self, path=TROPHY_DB):
+        # Imported here: sqlite3 costs ~7 ms and most launches never sync
+        import sqlite3
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        # Safe in WAL mode: a crash can lose the last commits, not corrupt
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        for version, script in enumerate(MIGRATIONS[version:], version + 1):
+            # One transaction each, so a half-applied step is never left behind
+            self.conn.executescript(
+                f"BEGIN; {script} PRAGMA user_version = {version}; COMMIT;")
+
+    def close(self):
+        self.conn.close()
+
+    def upsert_games(self, games):
+        """Insert or update games (psnprofiles.Game rows) from the profile."""
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO games (game_id, slug, title, url, completion, last_played)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (game_id) DO UPDATE SET
+                    slug = excluded.slug, title = excluded.title,
+                    url = excluded.url, completion = excluded.completion,
+                    last_played = excluded.last_played
+            """, [(g.game_id, g.slug, g.title, g.url, g.completion, g.last_played)
+                  for g in games])
+
+    def replace_trophies(self, game_id, trophies):
+        """Make trophies (psnprofiles.Trophy rows) the game's whole trophy list.
+
+        Unchanged rows are left alone, so the triggers only run for the
+        trophies that were earned, added or removed since the last call.
+        """
+        with self._lock, self.conn:
+            self.conn.executemany("""
+                INSERT INTO trophies (game_id, trophy_id, title, grade, earned, earned_at, rarity)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (game_id, trophy_id) DO UPDATE SET
+                    title = excluded.title, grade = excluded.grade,
+                    earned = excluded.earned, earned_at = excluded.earned_at,
+                    rarity = excluded.rarity
+                WHERE (title, grade, earned, earned_at, rarity) IS NOT
+                      (excluded.title, excluded.grade, excluded.earned,
+                       excluded.earned_at, excluded.rarity)
+            """, [(game_id, t.trophy_id, t.title, t.grade, int(t.earned), t.earned_at,
+                   t.rarity) for t in trophies])
+            ids = [t.trophy_id for t in trophies]
+            self.conn.execute(
+                f"DELETE FROM trophies WHERE game_id = ? AND trophy_id NOT IN "
+                f"({','.join('?' * len(ids))})", [game_id] + ids)
+
+    def record_fingerprints(self, games):
+        """Mark games (psnprofiles.Game rows) as stored as the profile shows them."""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "UPDATE games SET fingerprint = ? WHERE game_id = ?",
+                [(fingerprint(g), g.game_id) for g in games])
+
+    def _query(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def summary(self):
+        """Return {grade: earned count} from the maintained summary row."""
+        row, = self._query("SELECT bronze, silver, gold, platinum FROM summary WHERE id = 1")
+        return dict(zip(TROPHY_FIELDS, row))
+
+    def fingerprints(self):
+        """Return {game_id: fingerprint} of the games whose trophies are stored."""
+        return dict(self._query(
+            "SELECT game_id, fingerprint FROM games WHERE fingerprint IS NOT NULL"))
+
+    def closest_to_platinum(self, limit=10):
+        """Games with an unearned platinum, highest share of trophies earned first."""
+        return [GameProgress(*row) for row in self._query("""
+            SELECT game_id, title, earned, trophies FROM games
+            WHERE platinum_total > 0 AND platinum_earned = 0
+            ORDER BY CAST(earned AS REAL) / trophies DESC LIMIT ?
+        """, (limit,))]
+
+    def rarest_earned(self, limit=10):
+        """Earned trophies with the lowest rarity percentage first."""
+        return [EarnedTrophy(*row) for row in self._query("""
+            SELECT t.game_id, t.trophy_id, g.title, t.title, t.grade, t.earned_at, t.rarity
+            FROM trophies AS t JOIN games AS g USING (game_id)
+            WHERE t.earned = 1 AND t.rarity IS NOT NULL
+            ORDER BY t.rarity LIMIT ?
+        """, (limit,))]
+
+    def earned_per_month(self):
+        """Return [("YYYY-MM", count)] of trophies earned, oldest month first."""
+        return self._query("""
+            SELECT strftime('%Y-%m', earned_at, 'unixepoch', 'localtime') AS month,
+                   COUNT(*)
+            FROM trophies WHERE earned = 1 AND earned_at IS NOT NULL
+            GROUP BY month ORDER BY month
+        """)
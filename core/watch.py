@@ -0,0 +1,147 @@
+"""File change watcher (inotify on Linux, stat fingerprints elsewhere)."""
+import ctypes
+import os
+import select
+import struct
+import sys
+import threading
+
+
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+INOTIFY_MASK = IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def load_inotify():
+    """Return libc if it exposes inotify, otherwise None."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+def file_fingerprint(path):
+    """Cheap identity of a file's contents; stats the file, never opens it."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+
+class FileWatcher:
+    """Report changes to a set of files without reading them.
+
+    On Linux the parent directories are watched with inotify, so an idle
+    watcher costs nothing. Elsewhere the files are stat()ed every
+    ``interval`` seconds and compared by fingerprint.
+    """
+
+    def __init__(self, paths, interval=1.0):
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._paths = set()
+        self._fingerprints = {}
+        self._watched_dirs = {}
+        self._stop = threading.Event()
+        self._thread = None
+        self._fd = None
+        self._libc = load_inotify()
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._fd = fd
+                self._wake_r, self._wake_w = os.pipe()
+        self.set_paths(paths)
+
+    def set_paths(self, paths):
+        """Replace the set of watched files."""
+        paths = {os.path.abspath(p) for p in paths if p}
+        with self._lock:
+            self._paths = paths
+            self._fingerprints = {p: file_fingerprint(p) for p in paths}
+            if self._fd is None:
+                return
+            for directory in {os.path.dirname(p) for p in paths}:
+                if directory in self._watched_dirs.values():
+                    continue
+                wd = self._libc.inotify_add_watch(
+                    self._fd, os.fsencode(directory), INOTIFY_MASK)
+                if wd >= 0:
+                    self._watched_dirs[wd] = directory
+
+    def poll(self):
+        """Return the set of watched files that changed since the last poll."""
+        with self._lock:
+            if self._fd is not None:
+                return self._drain_events()
+            changed = set()
+            for path in self._paths:
+                fingerprint = file_fingerprint(path)
+                if fingerprint != self._fingerprints.get(path):
+                    self._fingerprints[path] = fingerprint
+                    changed.add(path)
+            return changed
+
+    def _drain_events(self):
+        changed = set()
+        while True:
+            try:
+                buf = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                return changed
+            offset = 0
+            while offset < len(buf):
+                wd, _mask, _cookie, length = INOTIFY_EVENT.unpack_from(
+                    buf, offset)
+                offset += INOTIFY_EVENT.size
+                name = buf[offset:offset + length].rstrip(b"\0")
+                offset += length
+                directory = self._watched_dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if path in self._paths:
+                    changed.add(path)
+
+    def start(self, callback):
+        """Call ``callback(changed_paths)`` from a background thread on change."""
+        self._thread = threading.Thread(
+            target=self._run, args=(callback,), daemon=True)
+        self._thread.start()
+
+    def _run(self, callback):
+        while not self._stop.is_set():
+            if self._fd is not None:
+                select.select([self._fd, self._wake_r], [], [])
+                # Let a burst of writes to the same file settle
+                self._stop.wait(0.05)
+            else:
+                self._stop.wait(self.interval)
+            if self._stop.is_set():
+                break
+            changed = self.poll()
+            if changed:
+                callback(changed)
+
+    def stop(self):
+        self._stop.set()
+        if self._fd is not None:
+            os.write(self._wake_w, b"x")
+        if self._thread is not None:
+            self._thread.join()
+        if self._fd is not None:
+            for fd in (self._fd, self._wake_r, self._wake_w):
+                os.close(fd)
+            self._fd = None
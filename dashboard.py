@@ -0,0 +1,1372 @@
+import atexit
+import threading
+import time
+
+import AppKit
+import Foundation
+import objc
+import Quartz
+from PyObjCTools import AppHelper
+
+from core.assets import AssetRegistry, level_icon_name
+from core.fetch import FetchError
+from core.httpcache import CachingFetcher
+from core.images import DERIVATIVE_SIZES, ImageTooLarge, derivatives_match, render_derivatives
+from core.ipc import SingleInstance
+from core.metrics import metrics
+from core.net import connectivity, has_internet
+from core.paths import ASSET_ATLAS, DASHBOARD_LOCK, DASHBOARD_SOCKET, TROPHY_FIELDS
+from core.state import state_repository
+from core.storage import ensure_data_files, load_config, write_behind
+from core.sync import profile_path
+from core.todo import todo_store
+
+
+# --- Draggable area class (move to top of file) ---
+class DraggableTopView(AppKit.NSView):
+    def initWithWindow_(self, window):
+        self = objc.super(DraggableTopView, self).init()
+        self.window = window
+        self.drag_start = None
+        return self
+
+    def mouseDown_(self, event):
+        self.drag_start = event.locationInWindow()
+
+    def mouseDragged_(self, event):
+        if self.drag_start is not None:
+            curr_pos = event.locationInWindow()
+            dx = curr_pos.x - self.drag_start.x
+            dy = curr_pos.y - self.drag_start.y
+            frame = self.window.frame()
+            new_origin = AppKit.NSPoint(
+                frame.origin.x + dx, frame.origin.y + dy)
+            self.window.setFrameOrigin_(new_origin)
+
+
+dashboard_window_instance = None  # <-- Add this here
+# Seconds spent in each dashboard startup phase, filled in as they complete
+dashboard_timings = {}
+GUIDE_PREFETCH_DELAY = 2.0  # idle seconds before an opted-in guide prefetch
+
+
+def mark_phase(name, seconds):
+    """Note how long a startup phase took, in dashboard_timings and the metrics."""
+    dashboard_timings[name] = seconds
+    metrics.record(f"dashboard.{name}", seconds)
+
+
+# --- Bundled images ---
+def decode_asset(path):
+    """Decode a PNG into a CGImage right away; safe off the main thread."""
+    source = Quartz.CGImageSourceCreateWithURL(
+        Foundation.NSURL.fileURLWithPath_(path), None)
+    if source is None:
+        return None
+    return Quartz.CGImageSourceCreateImageAtIndex(
+        source, 0, {Quartz.kCGImageSourceShouldCacheImmediately: True})
+
+
+def crop_asset(atlas, rect):
+    x, y, width, height = rect
+    return Quartz.CGImageCreateWithImageInRect(
+        atlas, Quartz.CGRectMake(x, y, width, height))
+
+
+assets = AssetRegistry(decode=decode_asset, crop=crop_asset)
+
+
+def preload_assets():
+    """Decode every dashboard image ahead of the first window build.
+
+    Files are decoded in parallel by default. With "asset_atlas" set in
+    config.json they come from one packed atlas instead: a single file read,
+    but one serial decode.
+
+    A pre-warmed worker runs this long before its window opens, so the flag
+    is read straight from the file rather than through state_repository,
+    which would then hold the config as it was at spawn time.
+    """
+    ensure_data_files()
+    if load_config().get("asset_atlas") and assets.atlas_path is None:
+        assets.atlas_path = ASSET_ATLAS
+        assets.ensure_atlas()
+    assets.preload()
+
+
+def asset_image(name, fallback="NSCaution"):
+    """NSImage for a bundled asset; wrapping the memoized CGImage costs no I/O."""
+    image = assets.get(name)
+    if image is None:
+        return AppKit.NSImage.imageNamed_(fallback)
+    return AppKit.NSImage.alloc().initWithCGImage_size_(image, AppKit.NSZeroSize)
+
+
+# --- Cached profile page ---
+profile_pages = None  # CachingFetcher, made on first use
+
+
+def load_profile_page(browser, username):
+    """Show the cached psnprofiles.com profile at once, then revalidate it.
+
+    The cached copy (shared with --sync) is loaded straight away; a
+    conditional request then checks it in the background and the page is
+    only reloaded if it changed. Links followed from it load live.
+    """
+    global profile_pages
+    if profile_pages is None:
+        profile_pages = CachingFetcher(max_connections=1)
+    path = profile_path(username)
+    url = AppKit.NSURL.URLWithString_(profile_pages.base_url + path)
+    entry = profile_pages.cache.lookup(profile_pages.base_url + path)
+    body = profile_pages.cache.body(entry) if entry is not None else None
+    if body is not None:
+        browser.loadHTMLString_baseURL_(body.decode("utf-8", "replace"), url)
+
+    def revalidate():
+        try:
+            response = profile_pages.get(path)
+        except FetchError:
+            if body is None:
+                AppHelper.callAfter(browser.loadRequest_,
+                                    AppKit.NSURLRequest.requestWithURL_(url))
+            return
+        if body is None or not response.not_modified:
+            AppHelper.callAfter(browser.loadHTMLString_baseURL_,
+                                response.body.decode("utf-8", "replace"), url)
+    threading.Thread(target=revalidate, daemon=True).start()
+
+
+def activate_dashboard():
+    """Bring the running dashboard window to the front."""
+    AppKit.NSApp.activateIgnoringOtherApps_(True)
+    if dashboard_window_instance is not None:
+        dashboard_window_instance.makeKeyAndOrderFront_(None)
+
+
+def run_dashboard():
+    import json
+    import csv
+    import os
+    import sys
+    from Cocoa import NSWindow, NSApp, NSImageView, NSImage, NSTextField, NSButton, NSVisualEffectView, NSVisualEffectMaterialHUDWindow, NSOpenPanel, NSBackingStoreBuffered, NSWindowStyleMaskTitled, NSWindowStyleMaskClosable, NSWindowStyleMaskFullSizeContentView
+    from Foundation import NSObject, NSMakeRect
+    import AppKit
+    import objc
+    from WebKit import WKWebView, WKWebViewConfiguration
+    from Cocoa import NSFloatingWindowLevel, NSBorderlessWindowMask
+    import threading
+
+    try:
+        from ScriptingBridge import SBApplication
+    except ImportError:
+        # ScriptingBridge only available if pyobjc-framework-ScriptingBridge is installed
+        SBApplication = None
+
+    class ButtonHelper(NSObject):
+        def initWithConfig_(self, config):
+            self = objc.super(ButtonHelper, self).init()
+            self.config = config
+            return self
+
+        def choosePic_(self, sender):
+            panel = NSOpenPanel.openPanel()
+            panel.setCanChooseFiles_(True)
+            panel.setCanChooseDirectories_(False)
+            panel.setAllowedFileTypes_(["png", "jpg", "jpeg"])
+            if panel.runModal():
+                url = panel.URLs()[0] if panel.URLs() else None
+                if url:
+                    set_picked_image("avatar", "profile", url.path())
+
+    class SaveHelper(NSObject):
+        def init(self):
+            self = objc.super(SaveHelper, self).init()
+            self.config = None
+            self.fields = None
+            self.trophies = None
+            self.window = None
+            return self
+
+        def setAll_(self, args):
+            self.config, self.fields, self.trophies, self.window = args
+
+        def saveChanges_(self, sender):
+            state_repository.update_config(
+                username=str(self.fields["username"].stringValue()))
+            state_repository.update_trophies({
+                t: str(self.fields[t].stringValue())
+                for t in ["platinum", "gold", "silver", "bronze"]})
+            self.window.orderOut_(None)  # Hide window
+
+    class WindowDelegate(NSObject):
+        def windowShouldClose_(self, sender):
+            AppKit.NSApp().stop_(None)  # Stop the event loop
+            return True
+
+    class ClickableImageView(NSImageView):
+        def initWithConfig_(self, config):
+            self = objc.super(ClickableImageView, self).init()
+            self.config = config
+            return self
+
+        def mouseDown_(self, event):
+            panel = NSOpenPanel.openPanel()
+            panel.setCanChooseFiles_(True)
+            panel.setCanChooseDirectories_(False)
+            panel.setAllowedFileTypes_(["png", "jpg", "jpeg"])
+            if panel.runModal():
+                url = panel.URLs()[0] if panel.URLs() else None
+                if url:
+                    new_img = set_picked_image("avatar", "profile", url.path())
+                    if new_img is False:
+                        return
+                    if new_img is None:
+                        new_img = NSImage.alloc().initWithContentsOfFile_(url.path())
+                        new_img = crop_to_square(new_img)
+                    self.setImage_(new_img)
+
+    class ClickableLabel(NSTextField):
+        def init(self):
+            self = objc.super(ClickableLabel, self).init()
+            self.edit_field = None
+            self.config = None
+            return self
+
+        def set_field_and_config(self, field, config):
+            self.edit_field = field
+            self.config = config
+
+        def mouseDown_(self, event):
+            self.setHidden_(True)
+            self.edit_field.setHidden_(False)
+            self.edit_field.becomeFirstResponder()
+
+    class UsernameEditField(NSTextField):
+        def init(self):
+            self = objc.super(UsernameEditField, self).init()
+            self.label = None
+            self.config = None
+            self.trophy_name = None  # Add this line
+            return self
+
+        def set_label_and_config(self, label, config):
+            self.label = label
+            self.config = config
+
+        def textDidEndEditing_(self, notification):
+            new_val = self.stringValue()
+            if self.label:
+                self.label.setStringValue_(new_val)
+                self.label.setHidden_(False)
+            self.setHidden_(True)
+            # Save logic for username or trophy
+            if self.trophy_name:
+                # It's a trophy field
+                state_repository.update_trophies({self.trophy_name: new_val})
+            elif self.config is not None:
+                # It's the username field
+                state_repository.update_config(username=str(new_val))
+
+    class TodoAddHelper(NSObject):
+        def initWithTodoPanel_(self, todo_panel):
+            self = objc.super(TodoAddHelper, self).init()
+            self.todo_panel = todo_panel
+            return self
+
+        def addTodo_(self, sender):
+            field = self.todo_panel["input"]
+            item = field.stringValue().strip()
+            if item:
+                todo_store.add(item)
+                field.setStringValue_("")
+                self.todo_panel["refresh"]()
+
+    class TodoRemoveHelper(NSObject):
+        def initWithTodoPanel_andItemId_(self, todo_panel, item_id):
+            self = objc.super(TodoRemoveHelper, self).init()
+            self.todo_panel = todo_panel
+            self.item_id = item_id
+            return self
+
+        def removeTodo_(self, sender):
+            if todo_store.remove(self.item_id):
+                self.todo_panel["refresh"]()
+
+    class TodoClearHelper(NSObject):
+        def initWithTodoPanel_(self, todo_panel):
+            self = objc.super(TodoClearHelper, self).init()
+            self.todo_panel = todo_panel
+            return self
+
+        def clearTodos_(self, sender):
+            todo_store.clear()
+            self.todo_panel["refresh"]()
+
+    class ShowTodoHelper(NSObject):
+        def initWithWindow_andTodoVisual_(self, window, todo_visual):
+            self = objc.super(ShowTodoHelper, self).init()
+            self.window = window
+            self.todo_visual = todo_visual
+            return self
+
+        def showTodo_(self, sender):
+            self.todo_visual.setHidden_(False)
+            frame = self.window.frame()
+            new_frame = NSMakeRect(
+                frame.origin.x,
+                frame.origin.y,
+                840,  # window_width_expanded
+                500   # window_height
+            )
+            self.window.setFrame_display_animate_(new_frame, True)
+            # Update content view and visual_effect frame after animation
+            self.window.contentView().setFrame_(NSMakeRect(0, 0, 840, 470))
+            self.window.contentView().superview().setFrame_(NSMakeRect(0, 0, 840, 470))
+            self.window.contentView().subviews()[0].setFrame_(
+                NSMakeRect(0, 0, 840, 470))  # visual_effect
+            self.todo_visual.setFrame_(NSMakeRect(420, 0, 420, 470))
+            sender.setHidden_(True)
+
+    main_window = None
+    air_widget_window = None  # <-- Add this line at the top-level
+    dashboard_window_instance = None  # <-- Add this line at the top-level
+
+    def get_current_media_info():
+        """Try to get currently playing media info from Music.app (macOS)."""
+        if SBApplication is None:
+            return None
+        music = SBApplication.applicationWithBundleIdentifier_(
+            "com.apple.Music")
+        if not music or not music.isRunning():
+            return None
+        track = music.currentTrack()
+        if not track:
+            return None
+        # Try to get artwork as NSImage
+        artwork = None
+        if track.artworks() and track.artworks().count() > 0:
+            art = track.artworks().objectAtIndex_(0)
+            if hasattr(art, 'data'):
+                data = art.data()
+                if data:
+                    artwork = NSImage.alloc().initWithData_(data)
+        return {
+            "name": str(track.name() or ""),
+            "artist": str(track.artist() or ""),
+            "album": str(track.album() or ""),
+            "artwork": artwork
+        }
+
+    def show_air_widget():
+        global air_widget_window
+        with metrics.span("dashboard.air_widget.media_info"):
+            info = get_current_media_info()
+        if not info:
+            metrics.incr("dashboard.air_widget.no_media")
+            return  # No media playing
+        metrics.incr("dashboard.air_widget.shown")
+
+        # Make the widget big and centered
+        widget_width = 600
+        widget_height = 220
+        screen_frame = AppKit.NSScreen.mainScreen().frame()
+        x = (screen_frame.size.width - widget_width) / 2
+        y = (screen_frame.size.height - widget_height) / 2
+
+        air_window = NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
+            NSMakeRect(x, y, widget_width, widget_height),
+            NSBorderlessWindowMask,
+            NSBackingStoreBuffered,
+            False
+        )
+        air_window.setLevel_(NSFloatingWindowLevel)
+        air_window.setOpaque_(False)
+        air_window.setBackgroundColor_(AppKit.NSColor.clearColor())
+        air_window.setIgnoresMouseEvents_(False)
+        air_window.setMovableByWindowBackground_(True)
+
+        # Visual effect background
+        effect = NSVisualEffectView.alloc().initWithFrame_(
+            NSMakeRect(0, 0, widget_width, widget_height))
+        effect.setMaterial_(NSVisualEffectMaterialHUDWindow)
+        effect.setBlendingMode_(0)
+        effect.setState_(1)
+        air_window.setContentView_(effect)
+
+        # Artwork (large)
+        img_size = 180
+        img_view = NSImageView.alloc().initWithFrame_(
+            NSMakeRect(30, (widget_height - img_size) // 2, img_size, img_size))
+        if info["artwork"]:
+            img_view.setImage_(info["artwork"])
+        else:
+            img_view.setImage_(NSImage.imageNamed_("NSUser"))
+        img_view.setImageScaling_(AppKit.NSImageScaleProportionallyUpOrDown)
+        effect.addSubview_(img_view)
+
+        # Song name (large font)
+        name_field = NSTextField.labelWithString_(info["name"])
+        name_field.setFont_(AppKit.NSFont.boldSystemFontOfSize_(28))
+        name_field.setTextColor_(AppKit.NSColor.whiteColor())
+        name_field.setBackgroundColor_(AppKit.NSColor.clearColor())
+        name_field.setFrame_(NSMakeRect(230, 120, widget_width-250, 48))
+        effect.addSubview_(name_field)
+
+        # Artist/album (large font)
+        artist_field = NSTextField.labelWithString_(
+            f"{info['artist']} — {info['album']}")
+        artist_field.setFont_(AppKit.NSFont.systemFontOfSize_(22))
+        artist_field.setTextColor_(AppKit.NSColor.whiteColor())
+        artist_field.setBackgroundColor_(AppKit.NSColor.clearColor())
+        artist_field.setFrame_(NSMakeRect(230, 70, widget_width-250, 38))
+        effect.addSubview_(artist_field)
+
+        air_window.orderFrontRegardless_()
+        air_widget_window = air_window
+
+    def open_native_window():
+        global dashboard_window_instance
+        if dashboard_window_instance is not None:
+            # Window already exists, bring it to front
+            metrics.incr("dashboard.window.reopened")
+            dashboard_window_instance.makeKeyAndOrderFront_(None)
+            return
+
+        global main_window
+        build_started = time.perf_counter()
+        # Probe connectivity in the background while the window is built.
+        # Registered first so a flip during the build is not missed; the
+        # callback runs on the main thread, after the build has finished
+        connectivity.on_change(
+            lambda online: AppHelper.callAfter(apply_connectivity, online))
+        connectivity.refresh()
+        ensure_data_files()
+        # Pick up edits made by the menu bar since the last build
+        state_repository.refresh()
+        snapshot = state_repository.snapshot()
+        config = state_repository.config()
+        trophies = {t: str(getattr(snapshot, t)) for t in TROPHY_FIELDS}
+        mark_phase("data", time.perf_counter() - build_started)
+
+        # Points and percent for progress bar
+        level, percent = snapshot.level, snapshot.percent
+
+        AppKit.NSApplication.sharedApplication()
+        NSApp.activateIgnoringOtherApps_(True)
+        NSApp.setPresentationOptions_(
+            AppKit.NSApplicationPresentationHideMenuBar | AppKit.NSApplicationPresentationHideDock
+        )
+        window_width = 1240
+        window_height = 500
+        left_panel_width = 420
+        collapsed_width = left_panel_width
+        expanded_width = window_width
+
+        screen_frame = AppKit.NSScreen.mainScreen().frame()
+        # Center for collapsed and expanded
+        collapsed_x = (screen_frame.size.width - collapsed_width) / 2
+        expanded_x = (screen_frame.size.width - expanded_width) / 2
+        y = (screen_frame.size.height - window_height) / 2
+
+        # Create the window here
+        window = NSWindow.alloc().initWithContentRect_styleMask_backing_defer_(
+            NSMakeRect(collapsed_x, y, collapsed_width, window_height),
+            AppKit.NSWindowStyleMaskFullSizeContentView | AppKit.NSWindowStyleMaskResizable | AppKit.NSWindowStyleMaskBorderless,
+            NSBackingStoreBuffered,
+            False
+        )
+        dashboard_window_instance = window  # Track the window
+
+        # Make window float above others
+        # window.setLevel_(AppKit.NSFloatingWindowLevel)
+        window.setStyleMask_(AppKit.NSWindowStyleMaskTitled |
+                             AppKit.NSWindowStyleMaskClosable)
+        window.setFrame_display_animate_(
+            AppKit.NSMakeRect(100, 100, 420, window_height), True, False
+        )
+
+        # Hide the menu bar
+        NSApp.setPresentationOptions_(
+            AppKit.NSApplicationPresentationHideMenuBar | AppKit.NSApplicationPresentationHideDock
+        )
+
+        # Start window in collapsed (profile only) mode, centered
+        window.setTitleVisibility_(AppKit.NSWindowTitleHidden)
+        window.setTitlebarAppearsTransparent_(True)
+        window.setOpaque_(False)
+        window.setBackgroundColor_(AppKit.NSColor.clearColor())
+        window.setHasShadow_(True)
+
+        window_delegate = WindowDelegate.alloc().init()
+        window.setDelegate_(window_delegate)
+        # --- Add visual effect view as content view ---
+        visual_effect = NSVisualEffectView.alloc().initWithFrame_(
+            NSMakeRect(0, 0, collapsed_width, window_height)
+        )
+        window.setContentView_(visual_effect)
+
+        # --- Rounded corners ---
+        window.contentView().setWantsLayer_(True)
+        window.contentView().layer().setCornerRadius_(26)
+        window.contentView().layer().setMasksToBounds_(True)
+        visual_effect.setWantsLayer_(True)
+        visual_effect.layer().setCornerRadius_(26)
+        visual_effect.layer().setMasksToBounds_(True)
+
+        username = config.get("username", "").strip()
+        if username:
+            window.setTitle_(f"{username}'s Profile")
+        else:
+            window.setTitle_("Profile")
+
+        window.setOpaque_(False)
+        window.setBackgroundColor_(AppKit.NSColor.clearColor())
+
+        # Now you can safely set layer properties
+        visual_effect.setWantsLayer_(True)
+        visual_effect.layer().setCornerRadius_(26)
+        visual_effect.layer().setMasksToBounds_(True)
+        visual_effect.layer().setBackgroundColor_(
+            AppKit.NSColor.clearColor().CGColor()
+        )
+        visual_effect.setMaterial_(AppKit.NSVisualEffectMaterialPopover)
+        visual_effect.setBlendingMode_(
+            AppKit.NSVisualEffectBlendingModeBehindWindow)
+        visual_effect.setState_(AppKit.NSVisualEffectStateActive)
+
+        # --- Add left panel view (move this up here!) ---
+        left_panel = AppKit.NSView.alloc().initWithFrame_(
+            NSMakeRect(0, 0, left_panel_width, window_height)
+        )
+        left_panel.setAutoresizingMask_(AppKit.NSViewHeightSizable)
+        visual_effect.addSubview_(left_panel)
+
+        # --- Make right half background a bit dark ---
+        right_overlay = AppKit.NSView.alloc().initWithFrame_(
+            NSMakeRect(left_panel_width, 0, window_width -
+                       left_panel_width, window_height)
+        )
+        right_overlay.setWantsLayer_(True)
+        right_overlay.layer().setBackgroundColor_(
+            AppKit.NSColor.blackColor().colorWithAlphaComponent_(0.35).CGColor()
+        )
+        visual_effect.addSubview_positioned_relativeTo_(
+            right_overlay, AppKit.NSWindowBelow, None
+        )
+
+        fields = {}
+        profile_pic_path = config.get("profile_path", "")
+        # Pre-rendered 1x/2x derivative; the original is only decoded if
+        # Pillow could not render one
+        profile_img = derived_image("avatar", "profile")
+        if profile_img is None:
+            if os.path.exists(profile_pic_path):
+                profile_img = NSImage.alloc().initWithContentsOfFile_(profile_pic_path)
+            else:
+                profile_img = NSImage.imageNamed_("NSUser")
+            profile_img = crop_to_square(profile_img)
+        img_width = 100
+        # Centered in left panel
+        profile_img_view = ClickableImageView.alloc().initWithConfig_(config).initWithFrame_(
+            NSMakeRect((left_panel_width - img_width) //
+                       2, 320, img_width, img_width)
+        )
+        profile_img_view.setImage_(profile_img)
+        profile_img_view.setImageScaling_(
+            AppKit.NSImageScaleProportionallyUpOrDown)
+        profile_img_view.setWantsLayer_(True)
+        layer = profile_img_view.layer()
+        layer.setCornerRadius_(img_width / 2)
+        layer.setMasksToBounds_(True)
+        visual_effect.addSubview_(profile_img_view)
+
+        # Username edit field (hidden by default)
+        username_field = UsernameEditField.alloc().init()
+        username_field.setFrame_(NSMakeRect(
+            (left_panel_width - 200) // 2, 290, 200, 24))
+        username = config.get("username", "")
+        username_field.setStringValue_(username)
+        username_field.setHidden_(True)
+        visual_effect.addSubview_(username_field)
+        fields["username"] = username_field
+
+        # Username label (shown by default)
+        username_label = ClickableLabel.labelWithString_(username)
+        username_label.setFrame_(NSMakeRect(
+            (left_panel_width - 200) // 2, 290, 200, 24))
+        username_label.setAlignment_(AppKit.NSCenterTextAlignment)
+        username_label.setFont_(AppKit.NSFont.systemFontOfSize_(16))
+        username_label.set_field_and_config(username_field, config)
+        visual_effect.addSubview_(username_label)
+        username_field.set_label_and_config(username_label, config)
+
+        # Progress bar just above trophies row
+        progress_bar = AppKit.NSProgressIndicator.alloc().initWithFrame_(
+            NSMakeRect(30, 200, left_panel_width - 100, 16)
+        )
+        progress_bar.setIndeterminate_(False)
+        progress_bar.setMinValue_(0)
+        progress_bar.setMaxValue_(100)
+        progress_bar.setDoubleValue_(percent)
+        progress_bar.setStyle_(AppKit.NSProgressIndicatorBarStyle)
+        visual_effect.addSubview_(progress_bar)
+
+        percent_label = NSTextField.labelWithString_(f"{percent}%")
+        percent_label.setTextColor_(AppKit.NSColor.whiteColor())
+        percent_label.setBackgroundColor_(AppKit.NSColor.clearColor())
+        percent_label.setAlignment_(AppKit.NSCenterTextAlignment)
+        percent_label.setFrame_(NSMakeRect(left_panel_width - 60, 193, 50, 24))
+        percent_label.setFont_(AppKit.NSFont.boldSystemFontOfSize_(13))
+        visual_effect.addSubview_(percent_label)
+
+        # Trophies row
+        y_img = 140
+        y_field = 110
+        trophy_types = ["platinum", "gold", "silver", "bronze"]
+        num_trophies = len(trophy_types)
+        img_size = 48
+        margin = 30
+        available_width = left_panel_width - 2 * margin
+        spacing = (available_width - num_trophies *
+                   img_size) // (num_trophies - 1)
+        x_offset = margin
+
+        for name in trophy_types:
+            nsimg = asset_image(f"{name}.png")
+            img_view = NSImageView.alloc().initWithFrame_(
+                NSMakeRect(x_offset, y_img, img_size, img_size))
+            img_view.setImage_(nsimg)
+            visual_effect.addSubview_(img_view)
+
+            trophy_field = UsernameEditField.alloc().init()
+            trophy_field.setFrame_(NSMakeRect(x_offset, y_field, img_size, 24))
+            trophy_field.setStringValue_(trophies.get(name, "0"))
+            trophy_field.setHidden_(True)
+            visual_effect.addSubview_(trophy_field)
+            fields[name] = trophy_field
+
+            trophy_label = ClickableLabel.labelWithString_(
+                trophies.get(name, "0"))
+            trophy_label.setFrame_(NSMakeRect(x_offset, y_field, img_size, 24))
+            trophy_label.setAlignment_(AppKit.NSCenterTextAlignment)
+            trophy_label.setFont_(AppKit.NSFont.systemFontOfSize_(13))
+            trophy_label.set_field_and_config(trophy_field, trophies)
+            visual_effect.addSubview_(trophy_label)
+            trophy_field.set_label_and_config(trophy_label, trophies)
+            trophy_field.trophy_name = name
+
+            label = NSTextField.labelWithString_(name.title())
+            label.setAlignment_(AppKit.NSCenterTextAlignment)
+            label.setFrame_(NSMakeRect(
+                x_offset - 10, y_field - 20, img_size + 20, 20))
+            visual_effect.addSubview_(label)
+
+            x_offset += img_size + spacing
+
+        # User level icon and label
+        level_icon = asset_image(level_icon_name(level), "NSUser")
+
+        icon_size = 40
+        icon_x = 120
+        icon_y = 240
+        level_icon_view = NSImageView.alloc().initWithFrame_(
+            NSMakeRect(icon_x, icon_y, icon_size, icon_size)
+        )
+        level_icon_view.setImage_(level_icon)
+        level_icon_view.setImageScaling_(
+            AppKit.NSImageScaleProportionallyUpOrDown)
+        visual_effect.addSubview_(level_icon_view)
+
+        level_label = NSTextField.labelWithString_(f"Level {level}")
+        level_label.setFont_(AppKit.NSFont.boldSystemFontOfSize_(18))
+        level_label.setTextColor_(AppKit.NSColor.whiteColor())
+        level_label.setBackgroundColor_(AppKit.NSColor.clearColor())
+        level_label.setAlignment_(AppKit.NSLeftTextAlignment)
+        level_label.setFrame_(NSMakeRect(
+            icon_x + icon_size + 10, icon_y + 8, 120, 24))
+        visual_effect.addSubview_(level_label)
+
+        # Re-render only the parts of the profile panel whose data changed
+        def on_state_changed(snapshot, changed):
+            if "percent" in changed:
+                progress_bar.setDoubleValue_(snapshot.percent)
+                percent_label.setStringValue_(f"{snapshot.percent}%")
+            if "level" in changed:
+                level_label.setStringValue_(f"Level {snapshot.level}")
+                level_icon_view.setImage_(
+                    asset_image(level_icon_name(snapshot.level), "NSUser"))
+            if "username" in changed:
+                name = snapshot.username.strip()
+                window.setTitle_(f"{name}'s Profile" if name else "Profile")
+
+        state_repository.subscribe(on_state_changed)
+
+        # Banner view for profile (background)
+        banner_height = 110  # Half the profile image height (img_width // 2)
+        banner_width = 420
+        banner_y = 370  # Start at the very top
+
+        banner_path = config.get("banner_path", "")
+        banner_img = derived_image("banner", "banner")
+        if not banner_img and banner_path and os.path.exists(banner_path):
+            banner_img = NSImage.alloc().initWithContentsOfFile_(banner_path)
+            banner_img = crop_to_banner(
+                banner_img, banner_width, banner_height)
+        if not banner_img:
+            banner_img = NSImage.imageNamed_("NSColorPanel")
+            banner_img = crop_to_banner(
+                banner_img, banner_width, banner_height)
+
+        banner_view = ClickableBannerView.alloc().initWithConfig_(config).initWithFrame_(
+            NSMakeRect(0, banner_y, banner_width, banner_height)
+        )
+        banner_view.setImage_(banner_img)
+        banner_view.setImageScaling_(AppKit.NSImageScaleAxesIndependently)
+        visual_effect.addSubview_positioned_relativeTo_(
+            banner_view, AppKit.NSWindowBelow, None
+        )
+
+        # Add a transparent drag handle ("__") on the banner near the top
+        handle_width = 60
+        handle_height = 18
+        handle_x = (banner_width - handle_width) // 2
+        handle_y = banner_y + banner_height - \
+            handle_height - 20  # 8pt from top of banner
+
+        class BannerDragHandle(DraggableTopView):
+            def drawRect_(self, rect):
+                handle_width = self.frame().size.width
+                handle_height = self.frame().size.height
+                # Draw a single connected rounded line ("__" with rounded ends)
+                path = AppKit.NSBezierPath.bezierPathWithRoundedRect_xRadius_yRadius_(
+                    AppKit.NSMakeRect(8, handle_height // 2 -
+                                      4, handle_width - 16, 8),
+                    4, 4
+                )
+                AppKit.NSColor.whiteColor().colorWithAlphaComponent_(0.12).set()
+                path.fill()
+
+        banner_drag_handle = BannerDragHandle.alloc().initWithWindow_(window).initWithFrame_(
+            AppKit.NSMakeRect(handle_x, handle_y, handle_width, handle_height)
+        )
+        banner_drag_handle.setWantsLayer_(True)
+        banner_drag_handle.layer().setBackgroundColor_(
+            AppKit.NSColor.clearColor().CGColor())
+        visual_effect.addSubview_(banner_drag_handle)
+
+        # Username from config
+        username = config.get("username", "").strip()
+        if username:
+            profile_url = f"https://psnprofiles.com/{username}"
+        else:
+            profile_url = "https://psnprofiles.com"
+
+        # --- Button actions ---
+        class BrowserBarHelper(NSObject):
+            def initWithBrowser_andAddrField_(self, browser, addr_field):
+                self = objc.super(BrowserBarHelper, self).init()
+                self.browser = browser
+                self.addr_field = addr_field
+                return self
+
+            def goBack_(self, sender):
+                if self.browser.canGoBack():
+                    self.browser.goBack()
+
+            def goForward_(self, sender):
+                if self.browser.canGoForward():
+                    self.browser.goForward()
+
+            def refresh_(self, sender):
+                # A live load: reload() would repeat a page shown from the cache
+                url = self.browser.URL()
+                if url is not None:
+                    self.browser.loadRequest_(AppKit.NSURLRequest.requestWithURL_(url))
+
+        # --- Update address field on navigation ---
+        class BrowserDelegate(NSObject):
+            def initWithBrowser_andAddrField_(self, browser, addr_field):
+                self = objc.super(BrowserDelegate, self).init()
+                self._browser = browser
+                self.addr_field = addr_field
+                return self
+
+            def webView_didFinishNavigation_(self, webview, nav):
+                js = "document.body.style.zoom='0.7';"
+                self._browser.evaluateJavaScript_completionHandler_(js, None)
+                # Update address field
+                url = str(webview.URL().absoluteString())
+                self.addr_field.setStringValue_(url)
+
+        class GuideBrowser:
+            """The right-hand web view and browser bar, built on first use.
+
+            Most dashboard opens never expand the guide panel, so the
+            WKWebView, its web process and the network request are only
+            created by ensure() (on the first show(), or by prefetch_after()).
+            """
+
+            def __init__(self, parent, below, url):
+                self.parent = parent
+                self.below = below
+                self.url = url
+                self.browser = None
+                self.browser_bar = None
+
+            def ensure(self):
+                if self.browser is not None:
+                    return
+                started = time.perf_counter()
+                # --- Modern browser bar (right side, above browser) ---
+                bar_height = 60
+                bar_y = window_height - bar_height
+                bar_x = left_panel_width
+                bar_width = window_width - left_panel_width  # now 820
+
+                browser_bar = NSVisualEffectView.alloc().initWithFrame_(
+                    NSMakeRect(bar_x, bar_y, bar_width, bar_height)
+                )
+                browser_bar.setMaterial_(NSVisualEffectMaterialHUDWindow)
+                browser_bar.setBlendingMode_(0)
+                browser_bar.setState_(1)
+                browser_bar.setHidden_(True)
+                browser_bar.setAutoresizingMask_(AppKit.NSViewWidthSizable)
+
+                # --- Add browser to the right side, initially hidden ---
+                webview_config = WKWebViewConfiguration.alloc().init()
+                browser = WKWebView.alloc().initWithFrame_configuration_(
+                    NSMakeRect(
+                        left_panel_width,
+                        0,
+                        window_width - left_panel_width,  # now 820
+                        window_height - bar_height
+                    ),
+                    webview_config
+                )
+                browser.setAutoresizingMask_(
+                    AppKit.NSViewWidthSizable | AppKit.NSViewHeightSizable)
+                if username:
+                    load_profile_page(browser, username)
+                else:
+                    url = AppKit.NSURL.URLWithString_(self.url)
+                    browser.loadRequest_(AppKit.NSURLRequest.requestWithURL_(url))
+                browser.setHidden_(True)
+
+                # Keep the original stacking: under the guide artwork and buttons
+                self.parent.addSubview_positioned_relativeTo_(
+                    browser_bar, AppKit.NSWindowBelow, self.below)
+                self.parent.addSubview_positioned_relativeTo_(
+                    browser, AppKit.NSWindowBelow, browser_bar)
+
+                # Back button
+                back_btn = NSButton.alloc().initWithFrame_(NSMakeRect(8, 4, 28, 28))
+                back_btn.setTitle_("⟨")
+                back_btn.setFont_(AppKit.NSFont.systemFontOfSize_(18))
+                browser_bar.addSubview_(back_btn)
+
+                # Forward button
+                fwd_btn = NSButton.alloc().initWithFrame_(NSMakeRect(40, 4, 28, 28))
+                fwd_btn.setTitle_("⟩")
+                fwd_btn.setFont_(AppKit.NSFont.systemFontOfSize_(18))
+                browser_bar.addSubview_(fwd_btn)
+
+                # Refresh button
+                refresh_btn = NSButton.alloc().initWithFrame_(NSMakeRect(72, 4, 28, 28))
+                refresh_btn.setTitle_("⟳")
+                refresh_btn.setFont_(AppKit.NSFont.systemFontOfSize_(16))
+                browser_bar.addSubview_(refresh_btn)
+
+                # Address field (read-only)
+                addr_field = NSTextField.alloc().initWithFrame_(
+                    NSMakeRect(108, 6, bar_width - 116, 24)  # bar_width is now 820
+                )
+                addr_field.setEditable_(False)
+                addr_field.setBezeled_(True)
+                addr_field.setDrawsBackground_(True)
+                addr_field.setFont_(AppKit.NSFont.systemFontOfSize_(13))
+                addr_field.setStringValue_(self.url)
+                browser_bar.addSubview_(addr_field)
+
+                self.bar_helper = BrowserBarHelper.alloc(
+                ).initWithBrowser_andAddrField_(browser, addr_field)
+                back_btn.setTarget_(self.bar_helper)
+                back_btn.setAction_("goBack:")
+                fwd_btn.setTarget_(self.bar_helper)
+                fwd_btn.setAction_("goForward:")
+                refresh_btn.setTarget_(self.bar_helper)
+                refresh_btn.setAction_("refresh:")
+
+                self.delegate = BrowserDelegate.alloc(
+                ).initWithBrowser_andAddrField_(browser, addr_field)
+                browser.setNavigationDelegate_(self.delegate)
+
+                self.browser = browser
+                self.browser_bar = browser_bar
+                mark_phase("browser_init", time.perf_counter() - started)
+
+            def show(self):
+                self.ensure()
+                self.browser.setHidden_(False)
+                self.browser_bar.setHidden_(False)
+
+            def hide(self):
+                if self.browser is not None:
+                    self.browser.setHidden_(True)
+                    self.browser_bar.setHidden_(True)
+
+            def set_frames(self, width, height):
+                if self.browser is not None:
+                    self.browser.setFrame_(AppKit.NSMakeRect(
+                        420, 0, width - 420, height - 60))
+                    self.browser_bar.setFrame_(AppKit.NSMakeRect(
+                        420, height - 60, width - 420, 60))
+
+            def prefetch_after(self, delay):
+                """Build the browser once the window has been idle for delay seconds."""
+                AppHelper.callLater(delay, self.ensure)
+
+        # --- Add "Open Guide" button centered in the right half ---
+        btn_width = 160
+        btn_height = 40
+        btn_x = left_panel_width + \
+            ((window_width - left_panel_width) - btn_width) // 2
+        btn_y = (window_height - btn_height) // 2
+
+        # --- Add browser.png or internet.png above the button ---
+        img_width = 64
+        img_height = 64
+        img_x = left_panel_width + \
+            ((window_width - left_panel_width) - img_width) // 2
+        img_y = btn_y + btn_height + 20  # 20px above the button
+
+        if has_internet():
+            img_name, guide_img_name = "browser.png", "guide.png"
+        else:
+            img_name, guide_img_name = "internet.png", "guide-no-internet.png"
+
+        browser_img = asset_image(img_name)
+        browser_img_view = NSImageView.alloc().initWithFrame_(
+            NSMakeRect(img_x, img_y, img_width, img_height)
+        )
+        browser_img_view.setImage_(browser_img)
+        browser_img_view.setImageScaling_(
+            AppKit.NSImageScaleProportionallyUpOrDown)
+        visual_effect.addSubview_(browser_img_view)
+
+        guide_browser = GuideBrowser(visual_effect, browser_img_view, profile_url)
+
+        open_guide_btn = NSButton.alloc().initWithFrame_(
+            NSMakeRect(btn_x, btn_y, btn_width, btn_height)
+        )
+        open_guide_btn.setTitle_("Open Guide")
+        open_guide_btn.setBezelStyle_(AppKit.NSBezelStyleRounded)
+        open_guide_btn.setFont_(AppKit.NSFont.systemFontOfSize_(12))
+        visual_effect.addSubview_(open_guide_btn)
+
+        # Add toggle button to left panel (as a circular image button)
+        guide_btn_size = 30  # Make the button a bit larger
+        guide_btn_x = (left_panel_width - guide_btn_size) // 2
+        guide_btn_y = 30
+
+        def small_guide_image(guide_img_name):
+            # Scale the image down to fit nicely inside the button (e.g., 22x22)
+            guide_img = asset_image(guide_img_name)
+            icon_size = 22
+            small_guide_img = NSImage.alloc().initWithSize_((icon_size, icon_size))
+            small_guide_img.lockFocus()
+            guide_img.drawInRect_fromRect_operation_fraction_(
+                AppKit.NSMakeRect(0, 0, icon_size, icon_size),
+                AppKit.NSMakeRect(0, 0, guide_img.size().width,
+                                  guide_img.size().height),
+                AppKit.NSCompositingOperationSourceOver,
+                1.0
+            )
+            small_guide_img.unlockFocus()
+            return small_guide_img
+
+        toggle_guide_btn = NSButton.alloc().initWithFrame_(
+            NSMakeRect(guide_btn_x, guide_btn_y,
+                       guide_btn_size, guide_btn_size)
+        )
+        # Use the same guide image as above, so it matches internet status
+        toggle_guide_btn.setImage_(small_guide_image(guide_img_name))
+        toggle_guide_btn.setBezelStyle_(AppKit.NSBezelStyleCircular)
+        toggle_guide_btn.setTitle_("")  # No text
+        toggle_guide_btn.setImageScaling_(AppKit.NSImageScaleNone)
+        toggle_guide_btn.setBordered_(False)
+        toggle_guide_btn.setWantsLayer_(True)
+        toggle_guide_btn.layer().setCornerRadius_(guide_btn_size / 2)
+        toggle_guide_btn.layer().setMasksToBounds_(True)
+        left_panel.addSubview_(toggle_guide_btn)
+
+        # --- Button action to show browser and bar, and hide itself and image ---
+        class OpenGuideHelper(NSObject):
+            def initWithGuideBrowser_andButton_andImage_(self, guide_browser, button, img_view):
+                self = objc.super(OpenGuideHelper, self).init()
+                self.guide_browser = guide_browser
+                self.button = button
+                self.img_view = img_view
+                return self
+
+            def openGuide_(self, sender):
+                self.guide_browser.show()
+                self.button.setHidden_(True)
+                self.img_view.setHidden_(True)
+
+        open_guide_helper = OpenGuideHelper.alloc(
+        ).initWithGuideBrowser_andButton_andImage_(guide_browser, open_guide_btn, browser_img_view)
+        open_guide_btn.setTarget_(open_guide_helper)
+        open_guide_btn.setAction_("openGuide:")
+
+        def apply_connectivity(online):
+            if online:
+                img_name, guide_img_name = "browser.png", "guide.png"
+            else:
+                img_name, guide_img_name = "internet.png", "guide-no-internet.png"
+            browser_img_view.setImage_(asset_image(img_name))
+            toggle_guide_btn.setImage_(small_guide_image(guide_img_name))
+            open_guide_btn.setHidden_(not online)
+            toggle_guide_btn.setEnabled_(online)
+            if not online:
+                # Hide browser and browser bar while there is no internet
+                guide_browser.hide()
+
+        if not has_internet():
+            open_guide_btn.setHidden_(True)
+            toggle_guide_btn.setEnabled_(False)
+
+        # Set initial window size to collapsed (left panel only)
+        window.setFrame_display_animate_(
+            NSMakeRect(collapsed_x, y, collapsed_width,
+                       window_height), True, False
+        )
+
+        # Make window resizable with reasonable min/max
+        window.setMinSize_(AppKit.NSMakeSize(collapsed_width, window_height))
+        window.setMaxSize_(AppKit.NSMakeSize(expanded_width, window_height))
+
+        # Make overlays and browser autoresize
+        visual_effect.setAutoresizingMask_(
+            AppKit.NSViewWidthSizable | AppKit.NSViewHeightSizable)
+        right_overlay.setAutoresizingMask_(
+            AppKit.NSViewWidthSizable | AppKit.NSViewHeightSizable)
+
+        class GuideToggleHelper(NSObject):
+            def initWithWindow_andGuideBrowser_andBtn_andImg_andOpenBtn_(self, window, guide_browser, toggle_btn, img_view, open_guide_btn):
+                self = objc.super(GuideToggleHelper, self).init()
+                self.window = window
+                self.guide_browser = guide_browser
+                self.toggle_btn = toggle_btn
+                self.img_view = img_view
+                self.open_guide_btn = open_guide_btn
+                self.expanded = False
+                return self
+
+            @objc.typedSelector(b'v@:@')
+            def toggleGuide_(self, sender):
+                metrics.incr("dashboard.guide.toggled")
+                screen_frame = AppKit.NSScreen.mainScreen().frame()
+                full_width = 1240
+                collapsed_width = 420
+                expanded_x = (screen_frame.size.width - full_width) / 2
+                collapsed_x = (screen_frame.size.width - collapsed_width) / 2
+                y = self.window.frame().origin.y  # Keep current y
+
+                def update_browser_frames():
+                    frame = self.window.frame()
+                    self.guide_browser.set_frames(
+                        frame.size.width, frame.size.height)
+
+                AppKit.NSAnimationContext.beginGrouping()
+                context = AppKit.NSAnimationContext.currentContext()
+                context.setDuration_(0.35)  # Animation duration in seconds
+
+                if not self.expanded:
+                    # Expand window to show right half, centered
+                    context.setCompletionHandler_(update_browser_frames)
+                    self.window.animator().setFrame_display_(
+                        AppKit.NSMakeRect(expanded_x, y, full_width, 500), True
+                    )
+                    self.guide_browser.show()
+                    self.img_view.setHidden_(True)
+                    self.open_guide_btn.setHidden_(True)
+                    self.expanded = True
+                else:
+                    # Collapse window to left half only, centered
+                    context.setCompletionHandler_(update_browser_frames)
+                    self.window.animator().setFrame_display_(
+                        AppKit.NSMakeRect(
+                            collapsed_x, y, collapsed_width, 500), True
+                    )
+                    self.guide_browser.hide()
+                    self.img_view.setHidden_(False)
+                    self.open_guide_btn.setHidden_(False)
+                    self.expanded = False
+
+                AppKit.NSAnimationContext.endGrouping()
+
+        guide_toggle_helper = GuideToggleHelper.alloc().initWithWindow_andGuideBrowser_andBtn_andImg_andOpenBtn_(
+            window, guide_browser, toggle_guide_btn, browser_img_view, open_guide_btn)
+        toggle_guide_btn.setTarget_(guide_toggle_helper)
+        toggle_guide_btn.setAction_("toggleGuide:")
+
+        # --- Transparent "X" close button at top left ---
+        close_btn_size = 26
+        close_btn_x = 16  # 16pt from left edge
+        close_btn_y = window_height - close_btn_size - \
+            43  # 32pt from top edge (moves button down)
+        close_btn = AppKit.NSButton.alloc().initWithFrame_(
+            AppKit.NSMakeRect(close_btn_x, close_btn_y,
+                              close_btn_size, close_btn_size)
+        )
+        close_btn.setTitle_("✕")
+        close_btn.setFont_(AppKit.NSFont.boldSystemFontOfSize_(18))
+        close_btn.setBezelStyle_(AppKit.NSBezelStyleCircular)
+        close_btn.setBordered_(False)
+        close_btn.setWantsLayer_(True)
+        close_btn.layer().setCornerRadius_(close_btn_size / 2)
+        close_btn.layer().setBackgroundColor_(
+            AppKit.NSColor.whiteColor().colorWithAlphaComponent_(0.2).CGColor())
+        close_btn.layer().setMasksToBounds_(True)
+
+        class CloseHelper(objc.lookUpClass("NSObject")):
+            def initWithWindow_(self, window):
+                self = objc.super(CloseHelper, self).init()
+                self.window = window
+                return self
+
+            @objc.typedSelector(b'v@:@')
+            def close_(self, sender):
+                write_behind.flush()  # terminate_ exits without running atexit
+                AppKit.NSApp.terminate_(None)  # Fully quit the app
+
+        close_helper = CloseHelper.alloc().initWithWindow_(window)
+        close_btn.setTarget_(close_helper)
+        close_btn.setAction_("close:")
+
+        visual_effect.addSubview_(close_btn)
+
+        # --- Draggable area at top middle ---
+        drag_area_width = 180
+        drag_area_height = 36
+        drag_area_x = (window_width - drag_area_width) // 2
+        drag_area_y = window_height - drag_area_height - 8  # 8pt from top edge
+
+        draggable_top = DraggableTopView.alloc().initWithWindow_(window).initWithFrame_(
+            AppKit.NSMakeRect(drag_area_x, drag_area_y,
+                              drag_area_width, drag_area_height)
+        )
+        draggable_top.setAutoresizingMask_(AppKit.NSViewMinYMargin)
+        draggable_top.setWantsLayer_(True)
+        draggable_top.layer().setBackgroundColor_(
+            AppKit.NSColor.clearColor().CGColor())
+        visual_effect.addSubview_(draggable_top)
+
+        # Show the window at the end
+        window.makeKeyAndOrderFront_(None)
+        mark_phase("profile_panel", time.perf_counter() - build_started)
+
+        def mark_first_paint():
+            # Runs on the first run loop pass, after the window has drawn
+            mark_phase("first_paint", time.perf_counter() - build_started)
+        AppHelper.callAfter(mark_first_paint)
+
+        if config.get("prefetch_guide") and has_internet():
+            guide_browser.prefetch_after(GUIDE_PREFETCH_DELAY)
+
+        AppKit.NSApp.run()
+
+    def load_derivative(record, kind):
+        """NSImage carrying the 1x and 2x derivative reps at the point size."""
+        size = DERIVATIVE_SIZES[kind]
+        image = NSImage.alloc().initWithSize_(size)
+        for path in record["paths"].values():
+            rep = AppKit.NSBitmapImageRep.imageRepWithContentsOfFile_(path)
+            if rep is None:
+                return None
+            rep.setSize_(size)
+            image.addRepresentation_(rep)
+        return image
+
+    def derived_image(kind, key):
+        """Return the derivative image for config[key + "_path"], or None.
+
+        Pictures chosen before derivatives existed are rendered (once) here.
+        """
+        config = state_repository.config()
+        source = config.get(f"{key}_path", "")
+        if not (source and os.path.exists(source)):
+            return None
+        record = config.get(f"{key}_derivatives")
+        if not derivatives_match(record, source):
+            try:
+                record = render_derivatives(source, kind)
+            except ImageTooLarge:
+                # Never fall back to decoding the oversized original
+                return placeholder_image(kind)
+            if record is None:
+                return None
+            state_repository.update_config(**{f"{key}_derivatives": record})
+        return load_derivative(record, kind)
+
+    def placeholder_image(kind):
+        if kind == "avatar":
+            return crop_to_square(NSImage.imageNamed_("NSUser"))
+        return crop_to_banner(NSImage.imageNamed_("NSColorPanel"),
+                              *DERIVATIVE_SIZES[kind])
+
+    def set_picked_image(kind, key, path):
+        """Store a newly picked picture with its derivatives; return the image.
+
+        Returns False, after telling the user, if the picture is too large to
+        decode safely; the current picture is kept.
+        """
+        try:
+            record = render_derivatives(path, kind)
+        except ImageTooLarge as e:
+            alert = AppKit.NSAlert.alloc().init()
+            alert.setMessageText_("This picture is too large")
+            alert.setInformativeText_(str(e))
+            alert.runModal()
+            return False
+        state_repository.update_config(
+            **{f"{key}_path": path, f"{key}_derivatives": record})
+        return None if record is None else load_derivative(record, kind)
+
+    def crop_to_square(nsimage):
+        """Crop the NSImage to a centered square and return a new NSImage."""
+        size = min(nsimage.size().width, nsimage.size().height)
+        x = (nsimage.size().width - size) / 2
+        y = (nsimage.size().height - size) / 2
+        rect = AppKit.NSMakeRect(x, y, size, size)
+        cropped = AppKit.NSImage.alloc().initWithSize_((size, size))
+        cropped.lockFocus()
+        nsimage.drawInRect_fromRect_operation_fraction_(
+            AppKit.NSMakeRect(0, 0, size, size),
+            rect,
+            AppKit.NSCompositingOperationCopy,
+            1.0
+        )
+        cropped.unlockFocus()
+        return cropped
+
+    class ClickableBannerView(NSImageView):
+        def initWithConfig_(self, config):
+            self = objc.super(ClickableBannerView, self).init()
+            self.config = config
+            return self
+
+        def mouseDown_(self, event):
+            panel = NSOpenPanel.openPanel()
+            panel.setCanChooseFiles_(True)
+            panel.setCanChooseDirectories_(False)
+            panel.setAllowedFileTypes_(["png", "jpg", "jpeg"])
+            if panel.runModal():
+                url = panel.URLs()[0] if panel.URLs() else None
+                if url:
+                    new_img = set_picked_image("banner", "banner", url.path())
+                    if new_img is False:
+                        return
+                    if new_img is None:
+                        new_img = NSImage.alloc().initWithContentsOfFile_(url.path())
+                        frame = self.frame()
+                        new_img = crop_to_banner(new_img, int(
+                            frame.size.width), int(frame.size.height))
+                    self.setImage_(new_img)
+
+    def crop_to_banner(nsimage, target_width, target_height):
+        """Crop and scale NSImage to fill a banner rectangle."""
+        img_w = nsimage.size().width
+        img_h = nsimage.size().height
+        target_ratio = target_width / target_height
+        img_ratio = img_w / img_h
+
+        # Determine crop area
+        if img_ratio > target_ratio:
+            # Image is wider than target: crop sides
+            new_w = img_h * target_ratio
+            x = (img_w - new_w) / 2
+            rect = AppKit.NSMakeRect(x, 0, new_w, img_h)
+        else:
+            # Image is taller than target: crop top/bottom
+            new_h = img_w / target_ratio
+            y = (img_h - new_h) / 2
+            rect = AppKit.NSMakeRect(0, y, img_w, new_h)
+
+        cropped = AppKit.NSImage.alloc().initWithSize_((target_width, target_height))
+        cropped.lockFocus()
+        nsimage.drawInRect_fromRect_operation_fraction_(
+            AppKit.NSMakeRect(0, 0, target_width, target_height),
+            rect,
+            AppKit.NSCompositingOperationCopy,
+            1.0
+        )
+        cropped.unlockFocus()
+        return cropped
+
+    class ToggleTodoHelper(NSObject):
+        def initWithWindow_andTodoVisual_andButton_(self, window, todo_visual, toggle_btn):
+            self = objc.super(ToggleTodoHelper, self).init()
+            self.window = window
+            self.todo_visual = todo_visual
+            self.toggle_btn = toggle_btn
+            self.expanded = True  # Start expanded
+            return self
+
+        def toggleTodo_(self, sender):
+            frame = self.window.frame()
+            if self.expanded:
+                # Shrink window and hide to-do panel
+                new_frame = NSMakeRect(
+                    frame.origin.x,
+                    frame.origin.y,
+                    420,  # window_width_collapsed
+                    500
+                )
+                self.window.setFrame_display_animate_(new_frame, True)
+                self.todo_visual.setHidden_(True)
+                self.toggle_btn.setTitle_("Show To-Do")
+                self.expanded = False
+            else:
+                # Expand window and show to-do panel
+                new_frame = NSMakeRect(
+                    frame.origin.x,
+                    frame.origin.y,
+                    840,  # window_width_expanded
+                    500
+                )
+                self.window.setFrame_display_animate_(new_frame, True)
+                self.todo_visual.setHidden_(False)
+                self.toggle_btn.setTitle_("Hide To-Do")
+                self.expanded = True
+
+    class AirWidgetLauncher(NSObject):
+        def showAirWidget_(self, obj):
+            show_air_widget()
+
+    open_native_window()
+
+
+def start_dashboard(guard=None):
+    """Run the dashboard unless another one is open.
+
+    main.py claims guard before importing this module, so a second launch
+    never pays for the GUI imports; a pre-warmed worker claims it here.
+    """
+    def activate():
+        AppHelper.callAfter(activate_dashboard)
+    if guard is None:
+        guard = SingleInstance(DASHBOARD_LOCK, DASHBOARD_SOCKET,
+                               {"activate": activate})
+        if not guard.claim("activate"):
+            return  # the running dashboard has been brought to the front
+    guard.handlers["activate"] = activate
+    atexit.register(guard.release)
+    metrics.install_signal_handler()
+    preload_assets()  # a no-op in a pre-warmed worker, which did it already
+    AppKit.NSApplication.sharedApplication().setActivationPolicy_(
+        AppKit.NSApplicationActivationPolicyRegular
+    )
+    AppKit.NSApp.activateIgnoringOtherApps_(True)
+    run_dashboard()
@@ -0,0 +1,110 @@
+import os
+
+import AppKit
+import rumps
+from PyObjCTools import AppHelper
+
+from core.images import IconCache
+from core.ipc import DashboardLauncher
+from core.metrics import metrics
+from core.paths import CONFIG_JSON, DATA_DIR, TROPHY_LOG
+from core.state import menu_subtitle, state_repository
+from core.storage import ensure_data_files, write_behind
+from core.watch import FileWatcher
+
+
+class PSNTrophyMenuApp(rumps.App):
+    def __init__(self, prewarm=True):
+        ensure_data_files()
+        self.state = state_repository
+        self.icon_cache = IconCache()
+        self.icon_png = None
+        self.subtitle_item = rumps.MenuItem("Loading...")
+        # The icon is set from memory by refresh_menu(), not from a file
+        super().__init__("🎮", menu=[
+            self.subtitle_item,
+            None,
+            rumps.MenuItem("Profile", callback=self.launch_editor),
+            rumps.MenuItem("Quit", callback=self.quit_app)
+        ])
+        self.refresh_menu(None)
+        self.state.subscribe(self.on_state_changed)
+        self.launcher = DashboardLauncher()
+        if prewarm:
+            # Without a warm worker launch() falls back to a cold start
+            self.launcher.start()
+        # Re-render only when the data files actually change
+        self.watcher = FileWatcher(self.watched_paths())
+        self.watcher.start(self.on_files_changed)
+
+    def watched_paths(self):
+        snapshot = self.state.snapshot()
+        return [CONFIG_JSON, TROPHY_LOG, snapshot.profile_path]
+
+    def on_files_changed(self, changed):
+        # Called from the watcher thread; UI updates belong on the main thread
+        AppHelper.callAfter(self.sync_from_disk, changed)
+
+    def sync_from_disk(self, changed):
+        fields = self.state.refresh()
+        snapshot = self.state.snapshot()
+        if "profile_path" not in fields and snapshot.profile_path and \
+                os.path.abspath(snapshot.profile_path) in changed:
+            # Same path, new photo: only the icon needs re-rendering
+            self.update_subtitle_and_icon(snapshot, {"profile_path"})
+
+    def on_state_changed(self, snapshot, changed):
+        self.update_subtitle_and_icon(snapshot, changed)
+        if "profile_path" in changed:
+            self.watcher.set_paths(self.watched_paths())
+
+    @metrics.timed()
+    def refresh_menu(self, _):
+        self.update_subtitle_and_icon(self.state.snapshot())
+
+    @metrics.timed()
+    def update_subtitle_and_icon(self, snapshot, changed=None):
+        self.subtitle = menu_subtitle(snapshot)
+        if self.subtitle_item.title != self.subtitle:
+            self.subtitle_item.title = self.subtitle
+
+        if changed is not None and "profile_path" not in changed:
+            return
+        default_icon = os.path.join(DATA_DIR, "menu_icon.png")
+        profile_icon = snapshot.profile_path
+        if not (profile_icon and os.path.exists(profile_icon)):
+            profile_icon = default_icon
+        # Always make the icon circular; the cache only re-renders a changed photo
+        png = self.icon_cache.get(profile_icon)
+        if png is None and profile_icon != default_icon:
+            png = self.icon_cache.get(default_icon)
+        if png is not None and png != self.icon_png:
+            self.icon_png = png
+            self.set_icon_png(png)
+
+    @metrics.timed()
+    def set_icon_png(self, png):
+        """Show PNG bytes as the status item image, without a file round trip."""
+        image = AppKit.NSImage.alloc().initWithData_(
+            AppKit.NSData.dataWithBytes_length_(png, len(png)))
+        image.setSize_((20, 20))  # what rumps does for an icon file
+        self._icon_nsimage = image
+        try:
+            self._nsapp.setStatusBarIcon()
+        except AttributeError:
+            pass  # Not running yet; rumps shows _icon_nsimage on startup
+
+    def launch_editor(self, _):
+        self.launcher.launch()
+
+    def quit_app(self, _):
+        write_behind.flush()
+        self.launcher.stop()
+        rumps.quit_application()
+
+
+def run_menu_app():
+    metrics.install_signal_handler()
+    AppKit.NSApplication.sharedApplication().setActivationPolicy_(
+        AppKit.NSApplicationActivationPolicyAccessory)
+    PSNTrophyMenuApp().run()
@@ -0,0 +1,48 @@
+"""Point the core package at a scratch copy of data/ before anything imports it."""
+import os
+import shutil
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP = tempfile.mkdtemp(prefix="psn-tests-")
+DATA_DIR = os.path.join(TMP, "data")
+shutil.copytree(os.path.join(ROOT, "data"), DATA_DIR,
+                ignore=shutil.ignore_patterns("*.journal", "*.lock", "*.log", "*.db*"))
+os.environ["PSN_AGENT_DATA_DIR"] = DATA_DIR
+# Keeps the dashboard socket away from a dashboard that is really running
+os.environ["TMPDIR"] = TMP
+sys.path.insert(0, ROOT)
+
+from core.storage import ensure_data_files  # noqa: E402
+
+ensure_data_files()
+
+
+@pytest.fixture
+def gui_stubs():
+    """Swap the GUI frameworks for core.profiling's stubs for one test.
+
+    The app modules built on them are imported afresh and dropped again
+    afterwards, like the frameworks themselves.
+    """
+    from core import profiling
+    names = profiling.GUI_MODULES + ["dashboard", "menubar"]
+    saved = {name: sys.modules.get(name) for name in names}
+    profiling.install_gui_stubs()
+    sys.modules.pop("dashboard", None)
+    sys.modules.pop("menubar", None)
+    yield
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
+
+
+def pytest_sessionfinish(session, exitstatus):
+    from core.storage import write_behind
+    write_behind.flush()
+    shutil.rmtree(TMP, ignore_errors=True)
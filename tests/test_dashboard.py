@@ -0,0 +1,84 @@
+"""The dashboard's startup phases, timed headlessly on the GUI stubs."""
+import importlib
+import sys
+
+import pytest
+
+from core import profiling
+from core.metrics import metrics
+from core.net import connectivity
+from core.state import StateRepository, state_repository
+from core.storage import save_config, write_behind
+
+
+class RunLoop(profiling.Stub):
+    """AppHelper stand-in: callAfter/callLater queue until run() drains them."""
+
+    def __init__(self):
+        self.queue = []
+
+    def callAfter(self, fn, *args):
+        self.queue.append((0, fn, args))
+
+    def callLater(self, delay, fn, *args):
+        self.queue.append((delay, fn, args))
+
+    def run(self, until=None):
+        """Run queued calls, soonest first, up to delay ``until``."""
+        self.queue.sort(key=lambda call: call[0])
+        while self.queue and (until is None or self.queue[0][0] <= until):
+            _, fn, args = self.queue.pop(0)
+            fn(*args)
+
+
+@pytest.fixture
+def dashboard(gui_stubs, monkeypatch):
+    run_loop = RunLoop()
+    sys.modules["PyObjCTools"].AppHelper = run_loop
+    # No network: connectivity stays unknown, i.e. assumed online
+    monkeypatch.setattr(connectivity, "refresh", lambda: None)
+    monkeypatch.setattr(connectivity, "_callbacks", [])
+    monkeypatch.setattr(metrics, "enabled", True)
+    metrics.reset()
+    config = state_repository.config()
+    module = importlib.import_module("dashboard")
+    module.run_loop = run_loop
+    yield module
+    metrics.reset()
+    save_config(config)
+    write_behind.flush()
+    state_repository.refresh()
+
+
+def test_first_paint_does_not_wait_for_the_browser(dashboard):
+    dashboard.run_dashboard()
+    timings = dashboard.dashboard_timings
+    assert set(timings) == {"data", "profile_panel"}
+    dashboard.run_loop.run()
+    assert set(timings) == {"data", "profile_panel", "first_paint"}
+    assert timings["data"] <= timings["profile_panel"] <= timings["first_paint"]
+
+
+def test_prefetched_browser_is_timed_separately(dashboard):
+    state_repository.update_config(prefetch_guide=True)
+    dashboard.run_dashboard()
+    dashboard.run_loop.run(until=0)
+    assert "first_paint" in dashboard.dashboard_timings
+    assert "browser_init" not in dashboard.dashboard_timings
+    dashboard.run_loop.run()
+    assert "browser_init" in dashboard.dashboard_timings
+
+
+def test_phases_are_recorded_in_the_metrics(dashboard):
+    dashboard.run_dashboard()
+    dashboard.run_loop.run()
+    histograms = metrics.snapshot()["histograms"]
+    for phase in ("data", "profile_panel", "first_paint"):
+        assert histograms[f"dashboard.{phase}"]["count"] == 1
+
+
+def test_preload_leaves_the_state_repository_alone(dashboard, monkeypatch):
+    repository = StateRepository()
+    monkeypatch.setattr(dashboard, "state_repository", repository)
+    dashboard.preload_assets()
+    assert repository._snapshot is None
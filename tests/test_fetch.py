@@ -0,0 +1,87 @@
+"""Fetcher against bench's stand-in psnprofiles.com."""
+import time
+
+import pytest
+
+import bench
+from core.fetch import FetchError, Fetcher
+
+USER = "bench_user"
+
+
+def game(i):
+    return f"/trophies/{10000 + i}-bench-game-{i}/{USER}"
+
+
+@pytest.fixture
+def site(request):
+    site = bench.StandInSite(12, USER, **getattr(request, "param", {}))
+    yield site
+    site.close()
+
+
+def fetcher_for(site, **kwargs):
+    kwargs = dict({"rate": 1000.0, "burst": 1000, "backoff": 0.01}, **kwargs)
+    return Fetcher(site.url, **kwargs)
+
+
+@pytest.mark.parametrize("site", [{"throttle_every": 3, "retry_after": "0.1"}],
+                         indirect=True)
+def test_throttled_requests_wait_for_retry_after(site):
+    fetcher = fetcher_for(site, max_connections=1)
+    started = time.perf_counter()
+    for i in range(6):
+        assert fetcher.get(game(i)).status == 200
+    elapsed = time.perf_counter() - started
+    fetcher.close()
+    # Requests 3 and 6 are throttled; each retry waits out Retry-After
+    assert site.stats["throttled"] == 2
+    assert fetcher.stats == {"requests": 8, "retries": 2, "throttled": 2}
+    assert site.stats["requests"] == 8
+    assert elapsed >= 2 * 0.1
+
+
+@pytest.mark.parametrize("site", [{"throttle_every": 1}], indirect=True)
+def test_retries_run_out(site):
+    fetcher = fetcher_for(site, retries=2)
+    with pytest.raises(FetchError) as e:
+        fetcher.get(game(0))
+    fetcher.close()
+    assert e.value.status == 429
+    assert site.stats["requests"] == 3
+    assert fetcher.stats["retries"] == 2
+
+
+def test_errors_are_not_retried(site):
+    fetcher = fetcher_for(site)
+    with pytest.raises(FetchError) as e:
+        fetcher.get("/no-such-page")
+    fetcher.close()
+    assert e.value.status == 404
+    assert site.stats["requests"] == 1
+
+
+@pytest.mark.parametrize("site", [{"latency": 0.02}], indirect=True)
+def test_get_many_keeps_to_the_connection_limit(site):
+    fetcher = fetcher_for(site, max_connections=3)
+    results = dict(fetcher.get_many([game(i) for i in range(12)]))
+    fetcher.close()
+    assert sorted(results) == sorted(game(i) for i in range(12))
+    assert all(r.status == 200 for r in results.values())
+    assert 1 < site.stats["max_in_flight"] <= 3
+    # Keep-alive: no more connections than the pool holds
+    assert site.stats["connections"] <= 3
+    assert fetcher.pool.opened <= 3
+    assert site.stats["requests"] == fetcher.stats["requests"] == 12
+
+
+def test_get_many_keeps_to_the_rate_limit(site):
+    fetcher = fetcher_for(site, rate=50.0, burst=2, max_connections=4)
+    started = time.perf_counter()
+    results = list(fetcher.get_many([game(i) for i in range(12)]))
+    elapsed = time.perf_counter() - started
+    fetcher.close()
+    assert len(results) == 12
+    # Two go at once, the other ten one every 1/50 s
+    assert elapsed >= (12 - 2) / 50.0
+    assert site.stats["requests"] == 12
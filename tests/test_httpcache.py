@@ -0,0 +1,68 @@
+"""CachingFetcher and HttpCache against bench's stand-in psnprofiles.com."""
+import pytest
+
+import bench
+from core.fetch import Response
+from core.httpcache import CachingFetcher, HttpCache
+from core.storage import write_behind
+
+USER = "bench_user"
+GAME = f"/trophies/10000-bench-game-0/{USER}"
+NO_CACHE = {"Cache-Control": "no-cache"}
+
+
+@pytest.fixture
+def site():
+    site = bench.StandInSite(2, USER)
+    yield site
+    site.close()
+
+
+@pytest.fixture
+def fetcher(site, tmp_path):
+    fetcher = CachingFetcher(site.url, cache=HttpCache(str(tmp_path)),
+                             fresh_for=3600.0, rate=1000.0, backoff=0.01)
+    yield fetcher
+    fetcher.close()
+
+
+def test_fresh_copy_is_not_revalidated(site, fetcher):
+    first = fetcher.get(GAME)
+    assert (first.not_modified, first.revalidated) == (False, False)
+    second = fetcher.get(GAME)
+    assert second.body == first.body
+    assert (second.not_modified, second.revalidated) == (True, False)
+    assert site.stats["requests"] == 1
+
+
+def test_no_cache_asks_the_server(site, fetcher):
+    body = fetcher.get(GAME).body
+    response = fetcher.get(GAME, NO_CACHE)
+    assert response.body == body
+    assert (response.not_modified, response.revalidated) == (True, True)
+    assert site.stats["not_modified"] == 1
+    site.touch(GAME)
+    response = fetcher.get(GAME, NO_CACHE)
+    assert response.body != body
+    assert (response.not_modified, response.revalidated) == (False, False)
+    assert site.stats["requests"] == 3
+
+
+def page(url, body=b"<html></html>"):
+    return Response(200, {"etag": '"1"'}, body, url)
+
+
+def test_caches_sharing_a_directory_keep_each_others_entries(tmp_path):
+    # Two processes' caches, both opened before either wrote the index
+    first, second = HttpCache(str(tmp_path)), HttpCache(str(tmp_path))
+    first.store("https://example.com/a", page("https://example.com/a"))
+    write_behind.flush()
+    second.store("https://example.com/b", page("https://example.com/b"))
+    write_behind.flush()
+    urls = lambda cache: sorted(e["url"] for e in cache._entries.values())
+    assert urls(HttpCache(str(tmp_path))) == ["https://example.com/a",
+                                              "https://example.com/b"]
+    first.remove("https://example.com/a")
+    write_behind.flush()
+    assert urls(first) == urls(HttpCache(str(tmp_path))) == ["https://example.com/b"]
+    assert HttpCache(str(tmp_path)).size == first.size
@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import bench
+from conftest import ROOT
+from core.images import ImageTooLarge, open_downscaled
+
+PIL = pytest.importorskip("PIL")
+from PIL import ImageFile  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def photos(tmp_path_factory):
+    tmp = str(tmp_path_factory.mktemp("photos"))
+    return lambda fmt, width, height: bench.synthetic_photo(tmp, fmt, width, height)
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Record the size of every image actually decoded."""
+    sizes = []
+    load = ImageFile.ImageFile.load
+
+    def recording_load(self):
+        sizes.append(self.size)
+        return load(self)
+    monkeypatch.setattr(ImageFile.ImageFile, "load", recording_load)
+    return sizes
+
+
+def test_jpeg_is_decoded_at_an_eighth_through_draft(photos, decoded):
+    im = open_downscaled(photos("jpeg", 8000, 6000), (64, 64))
+    assert set(decoded) == {(1000, 750)}
+    assert 64 <= min(im.size) < 128
+    assert im.mode == "RGBA"
+
+
+def test_png_is_reduced_right_after_decoding(photos, decoded):
+    im = open_downscaled(photos("png", 1600, 1200), (64, 64))
+    assert set(decoded) == {(1600, 1200)}
+    assert 64 <= min(im.size) < 128
+
+
+def test_small_picture_is_not_reduced(photos):
+    assert open_downscaled(photos("png", 100, 80), (64, 64)).size == (100, 80)
+
+
+def test_too_many_pixels_is_refused_before_decoding(photos, decoded):
+    with pytest.raises(ImageTooLarge):
+        open_downscaled(photos("jpeg", 1600, 1200), (64, 64), max_pixels=1600 * 1200 - 1)
+    assert decoded == []
+
+
+def test_png_over_the_decode_budget_is_refused_before_decoding(photos, decoded):
+    path = photos("png", 1600, 1200)
+    with pytest.raises(ImageTooLarge):
+        open_downscaled(path, (64, 64), max_bytes=1600 * 1200 * 3 - 1)
+    assert decoded == []
+    # draft() brings the same dimensions under budget for a JPEG
+    open_downscaled(photos("jpeg", 1600, 1200), (64, 64), max_bytes=1600 * 1200 * 3 - 1)
+
+
+def test_48mp_png_is_refused_with_the_default_budget(tmp_path, decoded):
+    from PIL import Image
+    path = str(tmp_path / "huge.png")
+    # Only the header is read before refusing, so a flat picture will do
+    Image.new("L", (8000, 6000)).convert("RGB").save(path, compress_level=1)
+    decoded.clear()
+    with pytest.raises(ImageTooLarge):
+        open_downscaled(path, (64, 64))
+    assert decoded == []
+
+
+def test_48mp_jpeg_decodes_in_bounded_memory(photos):
+    # In a fresh process, so the peak RSS is this decode's alone
+    out = subprocess.run(
+        [sys.executable, os.path.join(ROOT, "bench.py"), bench.RSS_PROBE_FLAG,
+         photos("jpeg", 8000, 6000), "bounded"],
+        check=True, capture_output=True, text=True).stdout
+    probe = json.loads(out)
+    assert not probe["refused"]
+    assert probe["peak_rss_delta"] < 32 * 2 ** 20
@@ -0,0 +1,204 @@
+import fcntl
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from conftest import ROOT
+from core import paths
+from core.ipc import DashboardLauncher, SingleInstance, serve_dashboard_worker
+
+STAND_IN = f"""
+import os, sys, time
+sys.path.insert(0, {ROOT!r})
+from core.ipc import serve_dashboard_worker
+
+out, mode = sys.argv[1], sys.argv[2]
+
+def shown(how):
+    with open(out, "a") as f:
+        f.write(how + "\\n")
+
+if mode == "--dashboard-worker":
+    delay = os.environ.get("STAND_IN_IMPORT_DELAY", "0")
+    if delay == "crash":
+        sys.exit(1)
+    time.sleep(float(delay))  # the GUI imports
+    serve_dashboard_worker(sys.argv[3], lambda: shown("warm"), os.getppid())
+else:
+    shown("cold")
+"""
+
+
+def wait_for_lines(path, count, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if os.path.exists(path):
+            with open(path) as f:
+                lines = f.read().split()
+            if len(lines) >= count:
+                return lines
+        time.sleep(0.02)
+    raise AssertionError(f"{path} never got {count} lines")
+
+
+@pytest.fixture
+def launcher(tmp_path):
+    script = tmp_path / "stand_in.py"
+    script.write_text(STAND_IN)
+    out = str(tmp_path / "shown")
+    launcher = DashboardLauncher(command=[sys.executable, str(script), out],
+                                 socket_dir=str(tmp_path), connect_timeout=5)
+    launcher.out = out
+    yield launcher
+    launcher.stop()
+
+
+def test_launch_hands_off_to_the_worker(launcher):
+    launcher.start()
+    launcher.launch().join()
+    assert wait_for_lines(launcher.out, 1) == ["warm"]
+    # The next worker is already spawned
+    assert launcher._worker is not None
+
+
+def test_launch_does_not_wait_for_a_worker_still_importing(launcher, monkeypatch):
+    monkeypatch.setenv("STAND_IN_IMPORT_DELAY", "1")
+    launcher.start()
+    started = time.monotonic()
+    thread = launcher.launch()
+    assert time.monotonic() - started < 0.1
+    thread.join()
+    assert wait_for_lines(launcher.out, 1) == ["warm"]
+
+
+def test_launch_falls_back_to_a_cold_start(launcher, monkeypatch):
+    monkeypatch.setenv("STAND_IN_IMPORT_DELAY", "crash")
+    launcher.start()
+    launcher.launch().join()
+    assert wait_for_lines(launcher.out, 1) == ["cold"]
+
+
+def test_launch_without_a_worker_starts_cold_at_once(launcher):
+    launcher.launch()
+    assert wait_for_lines(launcher.out, 1) == ["cold"]
+
+
+# --- Single-instance guard ---
+@pytest.fixture
+def guard_paths(tmp_path):
+    return str(tmp_path / "dashboard.lock"), str(tmp_path / "dashboard.sock")
+
+
+def activations(guard_paths):
+    called = threading.Event()
+    return called, SingleInstance(*guard_paths, {"activate": called.set})
+
+
+def test_second_claim_activates_the_first(guard_paths):
+    called, first = activations(guard_paths)
+    assert first.claim("activate")
+    try:
+        second = SingleInstance(*guard_paths)
+        assert second.claim("activate") is False
+        assert called.wait(5)
+        assert second.notify("unknown-message") is False
+    finally:
+        first.release()
+
+
+def test_release_lets_the_next_process_in(guard_paths):
+    first = SingleInstance(*guard_paths)
+    assert first.acquire()
+    first.release()
+    assert not os.path.exists(guard_paths[1])
+    second = SingleInstance(*guard_paths)
+    assert second.acquire()
+    second.release()
+
+
+def test_recovers_from_a_crashed_holder(guard_paths):
+    lock_path, socket_path = guard_paths
+    # What a killed instance leaves behind: its pid and a dead socket file
+    with open(lock_path, "w") as f:
+        f.write("999999\n")
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    dead.bind(socket_path)
+    dead.close()
+    called, guard = activations(guard_paths)
+    assert guard.claim("activate", timeout=1)
+    try:
+        with open(lock_path) as f:
+            assert f.read() == f"{os.getpid()}\n"
+        assert SingleInstance(*guard_paths).notify("activate")
+        assert called.wait(5)
+    finally:
+        guard.release()
+
+
+def test_gives_up_on_a_holder_that_never_answers(guard_paths):
+    lock_path, _ = guard_paths
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT)
+    fcntl.flock(fd, fcntl.LOCK_EX)  # holds the lock but serves nothing
+    try:
+        guard = SingleInstance(*guard_paths)
+        started = time.monotonic()
+        assert guard.claim("activate", timeout=0.3) is True
+        assert 0.3 <= time.monotonic() - started < 2
+        assert guard.acquire() is False
+    finally:
+        os.close(fd)
+
+
+def test_second_dashboard_launch_skips_the_gui_imports():
+    called, guard = activations((paths.DASHBOARD_LOCK, paths.DASHBOARD_SOCKET))
+    assert guard.acquire()
+    try:
+        # AppKit is not importable here, so reaching `import dashboard`
+        # would fail the launch
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", os.path.join(ROOT, "main.py"),
+             "--dashboard"], capture_output=True, text=True, timeout=30)
+        assert result.returncode == 0, result.stderr
+        assert called.wait(5)
+        imported = {line.split("|")[-1].strip() for line in result.stderr.splitlines()}
+        assert "dashboard" not in imported
+        assert "AppKit" not in imported
+    finally:
+        guard.release()
+
+
+def connect_when_listening(path, timeout=5):
+    deadline = time.monotonic() + timeout
+    while True:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            conn.connect(path)
+            return conn
+        except (FileNotFoundError, ConnectionRefusedError):
+            # Not bound, or bound but not listening yet
+            conn.close()
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.01)
+
+
+def test_worker_survives_a_client_that_never_speaks(tmp_path):
+    path = str(tmp_path / "worker.sock")
+    opened = threading.Event()
+    server = threading.Thread(target=serve_dashboard_worker,
+                              args=(path, opened.set, os.getppid()), daemon=True)
+    server.start()
+    with connect_when_listening(path):
+        time.sleep(1.5)  # past the worker's receive timeout
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+            conn.settimeout(5)
+            conn.connect(path)
+            conn.sendall(b"open\n")
+            assert conn.recv(16).strip() == b"ok"
+    assert opened.wait(5)
+    server.join(5)
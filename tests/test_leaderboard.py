@@ -0,0 +1,49 @@
+import random
+
+from core.leaderboard import Leaderboard, load_profiles, save_profile
+from core.levels import calculate_level, calculate_points
+
+
+def random_trophies(rng):
+    return {"bronze": rng.randrange(2000), "silver": rng.randrange(500),
+            "gold": rng.randrange(150), "platinum": rng.randrange(20)}
+
+
+def full_sort(profiles):
+    rows = sorted((-calculate_points(t), name) for name, t in profiles.items())
+    return [(rank, name, -neg, calculate_level(-neg)[0])
+            for rank, (neg, name) in enumerate(rows, start=1)]
+
+
+def test_ranks_match_a_full_sort_after_random_updates():
+    rng = random.Random(4)
+    profiles = {f"user{i}": random_trophies(rng) for i in range(2000)}
+    board = Leaderboard(profiles)
+    assert board.ranking() == full_sort(profiles)
+    for step in range(500):
+        name = f"user{rng.randrange(2200)}"
+        if step % 10 == 0 and name in profiles:
+            del profiles[name]
+            board.remove(name)
+        else:
+            # Mostly re-ranks, sometimes a new profile or a tie
+            if step % 7 == 0:
+                profiles[name] = dict(profiles[rng.choice(list(profiles))])
+            else:
+                profiles[name] = random_trophies(rng)
+            board.update(name, profiles[name])
+    expected = full_sort(profiles)
+    assert len(board) == len(profiles)
+    assert board.ranking() == expected
+    assert board.ranking(10) == expected[:10]
+    for rank, name, _, _ in rng.sample(expected, 100):
+        assert board.rank_of(name) == rank
+
+
+def test_profiles_round_trip(tmp_path):
+    save_profile("alice", {"bronze": 3, "gold": 1}, str(tmp_path))
+    save_profile("bob", {"platinum": 1}, str(tmp_path))
+    profiles = load_profiles(str(tmp_path))
+    assert profiles == {"alice": {"bronze": 3, "silver": 0, "gold": 1, "platinum": 0},
+                        "bob": {"bronze": 0, "silver": 0, "gold": 0, "platinum": 1}}
+    assert [row[1] for row in Leaderboard(profiles).ranking()] == ["bob", "alice"]
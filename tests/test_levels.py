@@ -0,0 +1,48 @@
+import sys
+
+import pytest
+
+import bench
+from core.levels import LEVEL_ENDS, LEVEL_STARTS, MAX_LEVEL, calculate_level, calculate_levels
+
+PAST_CAP = 5000
+# Every level boundary and its neighbours, plus a stride through the rest;
+# the legacy loop is too slow to walk every point total
+POINTS = sorted({p for start in LEVEL_STARTS for p in (start - 1, start, start + 1) if p >= 0}
+                | set(range(0, LEVEL_ENDS[-1] + PAST_CAP, 97))
+                | set(range(LEVEL_ENDS[-1] - 5, LEVEL_ENDS[-1] + PAST_CAP)))
+
+
+@pytest.fixture(scope="module")
+def legacy():
+    return {p: bench.legacy_calculate_level(p) for p in POINTS}
+
+
+def legacy_percent(current, required):
+    return int((current / required) * 100)
+
+
+def test_calculate_level_matches_legacy(legacy):
+    for points in POINTS:
+        if points >= LEVEL_ENDS[-1]:
+            continue
+        level, current, required = legacy[points]
+        assert calculate_level(points) == \
+            (level, current, required, legacy_percent(current, required)), points
+
+
+def test_percent_is_100_at_the_cap(legacy):
+    for points in range(LEVEL_ENDS[-1], LEVEL_ENDS[-1] + PAST_CAP):
+        # The legacy loop reported points * 100 percent here
+        assert legacy[points] == (MAX_LEVEL, points, 1)
+        assert calculate_level(points) == (MAX_LEVEL, points, 1, 100)
+
+
+@pytest.mark.parametrize("numpy", [True, False])
+def test_calculate_levels_matches_legacy(numpy, legacy, monkeypatch):
+    if numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setitem(sys.modules, "numpy", None)
+    expected = [legacy[p][0] for p in POINTS]
+    assert list(calculate_levels(POINTS)) == expected
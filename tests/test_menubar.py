@@ -0,0 +1,55 @@
+"""The real menu bar app, ticking headlessly on the GUI stubs."""
+import importlib
+
+import pytest
+
+import bench
+from core.images import IconCache
+from core.state import menu_subtitle
+
+pytest.importorskip("PIL")
+
+TICKS = 3600
+
+
+@pytest.fixture
+def app(gui_stubs):
+    menubar = importlib.import_module("menubar")
+    app = menubar.PSNTrophyMenuApp(prewarm=False)
+    yield app
+    app.state.unsubscribe(app.on_state_changed)
+    app.watcher.stop()
+    app.launcher.stop()
+
+
+def test_an_hour_of_ticks_writes_no_files(app, monkeypatch):
+    renders = []
+    get = IconCache.get
+
+    def counting_get(cache, path, size=64):
+        png = get(cache, path, size)
+        renders.append(png)
+        return png
+    monkeypatch.setattr(IconCache, "get", counting_get)
+
+    def hour():
+        for _ in range(TICKS):
+            # What a watcher wake-up and a menu refresh do, with nothing changed
+            app.sync_from_disk(set())
+            app.refresh_menu(None)
+    _, written = bench.count_writes(hour)
+    assert written == []
+    assert app.icon_png is not None
+    assert len(renders) == TICKS
+    assert len(app.icon_cache._entries) == 1
+
+
+def test_subtitle_follows_the_state(app):
+    gold = app.state.snapshot().gold
+    try:
+        snapshot_changed = app.state.update_trophies({"gold": gold + 3})
+        assert "gold" in snapshot_changed
+        assert app.subtitle == menu_subtitle(app.state.snapshot())
+        assert app.subtitle_item.title == app.subtitle
+    finally:
+        app.state.update_trophies({"gold": gold})
@@ -0,0 +1,113 @@
+import socket
+import threading
+import time
+
+import pytest
+
+from core.net import ConnectivityMonitor
+
+SLOW = ("slow.invalid", 0)
+
+
+class SlowMonitor(ConnectivityMonitor):
+    """Probes of SLOW hang for the whole timeout, like a dropped SYN."""
+
+    def _probe(self, endpoint, results):
+        if endpoint == SLOW:
+            time.sleep(self.timeout)
+            results.put(False)
+        else:
+            super()._probe(endpoint, results)
+
+
+@pytest.fixture
+def open_port():
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    yield server.getsockname()
+    server.close()
+
+
+@pytest.fixture
+def closed_port():
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    address = sock.getsockname()
+    sock.close()
+    return address
+
+
+def probe(monitor):
+    monitor.refresh()
+    assert monitor.wait(5)
+    return monitor.is_online()
+
+
+def test_online_when_an_endpoint_accepts(open_port, closed_port):
+    assert probe(ConnectivityMonitor([closed_port, open_port], timeout=1)) is True
+
+
+def test_offline_when_every_endpoint_refuses(closed_port):
+    assert probe(ConnectivityMonitor([closed_port], timeout=1)) is False
+
+
+def test_first_success_wins(open_port):
+    monitor = SlowMonitor([SLOW, open_port], timeout=2)
+    started = time.monotonic()
+    assert probe(monitor) is True
+    assert time.monotonic() - started < 1
+
+
+def test_is_online_never_blocks():
+    monitor = SlowMonitor([SLOW], timeout=0.5, assume_online=True)
+    started = time.monotonic()
+    assert monitor.is_online() is True
+    assert time.monotonic() - started < 0.05
+    # The read started a probe, which reports offline once it times out
+    assert monitor.wait(5)
+    assert monitor.is_online() is False
+
+
+def test_result_is_cached_for_ttl(open_port):
+    monitor = ConnectivityMonitor([open_port], timeout=1, ttl=60)
+    probes = []
+    probe_all = monitor._probe_all
+
+    def counting_probe_all():
+        probes.append(time.monotonic())
+        probe_all()
+    monitor._probe_all = counting_probe_all
+    probe(monitor)
+    for _ in range(100):
+        assert monitor.is_online() is True
+    assert len(probes) == 1
+
+    monitor.ttl = 0
+    time.sleep(0.01)
+    monitor.is_online()
+    monitor.wait(5)
+    assert len(probes) == 2
+
+
+def test_on_change_fires_when_the_state_flips(open_port, closed_port):
+    monitor = ConnectivityMonitor([closed_port], timeout=1, assume_online=True)
+    changes = []
+    called = threading.Event()
+
+    def on_change(online):
+        changes.append(online)
+        called.set()
+    monitor.on_change(on_change)
+    probe(monitor)
+    assert called.wait(5)
+    assert changes == [False]
+
+    probe(monitor)  # still offline: no callback
+    assert changes == [False]
+
+    monitor.endpoints = [open_port]
+    called.clear()
+    probe(monitor)
+    assert called.wait(5)
+    assert changes == [False, True]
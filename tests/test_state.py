@@ -0,0 +1,74 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from conftest import ROOT
+from core import paths
+from core.state import StateRepository
+from core.storage import load_config, load_trophies, save_config, save_trophies, write_behind
+
+EDIT_ELSEWHERE = """
+from core.state import state_repository
+state_repository.update_config(username="newname")
+state_repository.update_trophies({"gold": 7})
+"""
+
+
+@pytest.fixture
+def repository():
+    config, trophies = load_config(), load_trophies()
+    yield StateRepository()
+    save_config(config)
+    save_trophies(trophies)
+    write_behind.flush()
+
+
+def edit_in_another_process():
+    # The child flushes its write-behind store at exit
+    subprocess.run([sys.executable, "-c", EDIT_ELSEWHERE], cwd=ROOT,
+                   env=os.environ, check=True)
+
+
+def test_update_keeps_edits_made_by_another_process(repository):
+    repository.update_config(username="oldname")
+    write_behind.flush()
+    edit_in_another_process()
+
+    repository.update_config(banner_path="banner.png")
+    write_behind.flush()
+    assert load_config()["username"] == "newname"
+    assert load_config()["banner_path"] == "banner.png"
+    assert repository.snapshot().username == "newname"
+    assert repository.snapshot().gold == 7
+
+
+def test_add_trophies_counts_from_the_file(repository):
+    repository.update_trophies({"gold": 1})
+    write_behind.flush()
+    edit_in_another_process()
+
+    repository.add_trophies({"gold": 2})
+    assert repository.snapshot().gold == 9
+    write_behind.flush()
+    assert load_trophies()["gold"] == "9"
+
+
+def test_refresh_reports_changed_fields(repository):
+    repository.snapshot()
+    assert repository.refresh() == set()
+    edit_in_another_process()
+    assert {"username", "gold"} <= repository.refresh()
+
+
+
+def test_missing_trophy_log_reads_as_zero():
+    write_behind.flush()
+    moved = paths.TROPHY_LOG + ".moved"
+    os.replace(paths.TROPHY_LOG, moved)
+    try:
+        snapshot = StateRepository().snapshot()
+        assert (snapshot.bronze, snapshot.gold, snapshot.level) == (0, 0, 1)
+    finally:
+        os.replace(moved, paths.TROPHY_LOG)
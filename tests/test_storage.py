@@ -0,0 +1,63 @@
+import json
+import threading
+import time
+
+from core import paths
+from core.storage import (load_config, load_trophies, save_config, save_trophies,
+                          trophy_history, write_behind)
+
+DURATION = 1.0
+
+
+def test_readers_never_see_a_partial_write(monkeypatch):
+    monkeypatch.setattr(write_behind, "delay", 0.02)
+    monkeypatch.setattr(write_behind, "max_delay", 0.1)
+    flush = write_behind.flush
+    flushes = []
+
+    def counting_flush():
+        flushes.append(time.monotonic())
+        flush()
+    monkeypatch.setattr(write_behind, "flush", counting_flush)
+    original = load_config()
+    stop = threading.Event()
+    saves = []
+    errors = []
+
+    def writer():
+        i = 0
+        while not stop.is_set():
+            i += 1
+            save_config({**original, "username": "user%d" % i, "padding": "x" * (i % 4096)})
+            save_trophies({"bronze": i, "silver": i // 2, "gold": i // 3, "platinum": 0})
+            saves.append(i)
+
+    def reader():
+        while not stop.is_set():
+            try:
+                with open(paths.CONFIG_JSON) as f:
+                    json.load(f)
+                assert trophy_history.latest() is not None
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=writer), threading.Thread(target=reader)]
+    for thread in threads:
+        thread.start()
+    time.sleep(DURATION)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    write_behind.flush()
+    try:
+        assert errors == []
+        last = saves[-1]
+        assert load_config()["username"] == "user%d" % last
+        assert load_trophies()["bronze"] == str(last)
+        # A few flushes per max_delay, not one per save
+        assert 1 <= len(flushes) <= DURATION / write_behind.max_delay * 3 + 2
+        assert len(flushes) * 100 < len(saves)
+    finally:
+        save_config(original)
+        write_behind.flush()
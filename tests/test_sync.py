@@ -0,0 +1,83 @@
+"""Incremental sync against bench's stand-in psnprofiles.com."""
+import pytest
+
+import bench
+from core.httpcache import CachingFetcher, HttpCache
+from core.paths import TROPHY_FIELDS
+from core.state import state_repository
+from core.storage import write_behind
+from core.sync import game_path, sync_profile
+from core.trophydb import TrophyDatabase
+
+USER = "bench_user"
+GAMES = 12
+# Games with trophies left to earn
+PLAYABLE = [i for i in range(GAMES)
+            if bench.fixture_game(i)["total"] - bench.fixture_game(i)["earned"] > 3]
+
+
+@pytest.fixture
+def site():
+    site = bench.StandInSite(GAMES, USER)
+    yield site
+    site.close()
+
+
+@pytest.fixture
+def db(tmp_path):
+    snapshot = state_repository.snapshot()
+    db = TrophyDatabase(str(tmp_path / "trophies.db"))
+    yield db
+    db.close()
+    state_repository.update_trophies({grade: getattr(snapshot, grade)
+                                      for grade in TROPHY_FIELDS})
+
+
+def sync(site, db, cache_dir, fresh_for=0.0):
+    fetcher = CachingFetcher(site.url, cache=HttpCache(cache_dir), fresh_for=fresh_for,
+                             rate=1000.0, backoff=0.01)
+    try:
+        return fetcher, sync_profile(USER, fetcher, db)
+    finally:
+        fetcher.close()
+        # The next sync's cache reads the index from disk
+        write_behind.flush()
+
+
+def game_rows(db, game_id):
+    return db._query("SELECT trophy_id, earned FROM trophies WHERE game_id = ? "
+                     "ORDER BY trophy_id", (game_id,))
+
+
+def test_only_the_played_game_is_refetched(site, db, tmp_path):
+    _, first = sync(site, db, str(tmp_path / "cache"))
+    assert len(first.trophies) == GAMES
+    played = PLAYABLE[0]
+    game_id = next(g.game_id for g in first.games if g.url.endswith(
+        f"/{10000 + played}-bench-game-{played}/{USER}"))
+    rows = game_rows(db, game_id)
+    site.play(played)
+    before = dict(site.stats)
+    _, result = sync(site, db, str(tmp_path / "cache"))
+    # The profile and that game's page, each changed so sent in full
+    assert site.stats["requests"] - before["requests"] == 2
+    assert site.stats["full"] - before["full"] == 2
+    assert set(result.trophies) == {game_id}
+    assert result.unchanged == {g.game_id for g in result.games} - {game_id}
+    assert game_rows(db, game_id) != rows
+    assert db.summary() == site.counts
+
+
+def test_fresh_cached_pages_of_changed_games_are_revalidated(site, db, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    sync(site, db, cache_dir, fresh_for=3600.0)
+    for played in PLAYABLE[:3]:
+        site.play(played)
+        # The profile is fresh in the cache too; without it nothing changed
+        HttpCache(cache_dir).remove(site.url + f"/{USER}")
+        write_behind.flush()
+        fetcher, result = sync(site, db, cache_dir, fresh_for=3600.0)
+        assert [game_path(g) for g in result.games if g.game_id in result.trophies] \
+            == [f"/trophies/{10000 + played}-bench-game-{played}/{USER}"]
+        assert db.summary() == site.counts
+        assert fetcher.stats["hits"] == 0
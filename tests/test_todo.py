@@ -0,0 +1,95 @@
+import os
+
+import pytest
+
+from core.todo import TodoJournal
+
+
+def reopen(journal):
+    journal.close()
+    return TodoJournal(journal.path)
+
+
+def test_items_survive_a_reload(tmp_path):
+    journal = TodoJournal(str(tmp_path / "todo.journal"))
+    first = journal.add("platinum Bloodborne")
+    journal.add("line\nbreak")
+    journal.remove(first)
+    journal = reopen(journal)
+    assert journal.items() == [(2, "line\nbreak")]
+
+
+def test_removed_id_is_not_reused_after_a_reload(tmp_path):
+    journal = TodoJournal(str(tmp_path / "todo.journal"))
+    assert journal.add("a") == 1
+    assert journal.add("b") == 2
+    journal.remove(2)
+    journal = reopen(journal)
+    assert journal.add("c") == 3
+
+
+def test_ids_are_not_reused_after_clear_and_compaction(tmp_path):
+    journal = TodoJournal(str(tmp_path / "todo.journal"))
+    for text in "abc":
+        journal.add(text)
+    journal.clear()
+    journal.compact()
+    journal = reopen(journal)
+    assert journal.items() == []
+    assert journal.add("d") == 4
+
+
+def test_compaction_keeps_items_and_ids(tmp_path):
+    journal = TodoJournal(str(tmp_path / "todo.journal"))
+    for i in range(50):
+        journal.remove(journal.add(str(i)))
+    kept = journal.add("kept")
+    journal.compact()
+    journal = reopen(journal)
+    assert journal.items() == [(kept, "kept")]
+    assert journal.add("next") == kept + 1
+    with open(journal.path) as f:
+        assert len(f.read().splitlines()) < 10
+
+
+def test_migrates_the_legacy_list(tmp_path):
+    legacy = tmp_path / "todo.json"
+    legacy.write_text('["one", "two"]')
+    journal = TodoJournal(str(tmp_path / "todo.journal"), legacy_path=str(legacy))
+    assert journal.items() == [(1, "one"), (2, "two")]
+    journal = reopen(journal)
+    assert journal.add("three") == 3
+
+
+def test_every_record_kind_folds_like_the_journal_says(tmp_path):
+    path = tmp_path / "todo.journal"
+    path.write_text('[]\n[1, "a"]\n[2, "b]\\n[c"]\n[]\n[]\n[3, "d"]\n[4, ""]\n'
+                    '[-3]\n[5, "e"]\n[]\n[6, "f"]\n[-9]\n[7, "g"]\n[-7]\n')
+    journal = TodoJournal(str(path))
+    assert journal.items() == [(6, "f")]
+    assert journal._records == 14
+    assert journal.add("next") == 10
+
+
+def test_failed_compaction_leaves_the_journal_usable(tmp_path, monkeypatch):
+    journal = TodoJournal(str(tmp_path / "todo.journal"))
+    for text in "abc":
+        journal.remove(journal.add(text))
+
+    def disk_full(*args):
+        with open(journal.path + ".compact", "w") as f:
+            f.write("[1, ")
+        raise OSError(28, "No space left on device")
+    monkeypatch.setattr(journal, "_write_compacted", disk_full)
+    with pytest.raises(OSError):
+        journal.compact()
+    assert journal._tail is None
+    assert not os.path.exists(journal.path + ".compact")
+
+    monkeypatch.undo()
+    kept = journal.add("kept")
+    journal.compact()
+    journal = reopen(journal)
+    assert journal.items() == [(kept, "kept")]
+    with open(journal.path) as f:
+        assert f.read() == '[4, "kept"]\n'
@@ -0,0 +1,68 @@
+import os
+import sys
+
+import bench
+from core import paths
+from core.state import StateRepository
+from core.watch import FileWatcher
+
+TICKS = 50
+_opened = None
+
+
+def _count_opens(event, args):
+    if event == "open" and _opened is not None and isinstance(args[0], str) \
+            and args[0].startswith(paths.DATA_DIR):
+        _opened.append(args[0])
+
+
+sys.addaudithook(_count_opens)  # audit hooks can't be removed
+
+
+def count_opens(fn):
+    global _opened
+    _opened = []
+    try:
+        fn()
+        return list(_opened)
+    finally:
+        _opened = None
+
+
+def test_ticks_do_not_open_files():
+    state = StateRepository()
+    watcher = FileWatcher([paths.CONFIG_JSON, paths.TROPHY_LOG])
+    state.snapshot()
+
+    def legacy():
+        for _ in range(TICKS):
+            bench.legacy_tick(paths, lambda source, cache: None)
+
+    def watched():
+        for _ in range(TICKS):
+            if watcher.poll():
+                state.refresh()
+            state.snapshot()
+    try:
+        legacy_opens = count_opens(legacy)
+        watched_opens = count_opens(watched)
+    finally:
+        watcher.stop()
+    assert len(legacy_opens) == 2 * TICKS
+    assert watched_opens == []
+
+
+def test_watcher_reports_replaced_file(tmp_path):
+    path = str(tmp_path / "config.json")
+    with open(path, "w") as f:
+        f.write("{}")
+    watcher = FileWatcher([path])
+    try:
+        assert watcher.poll() == set()
+        with open(path + ".tmp", "w") as f:
+            f.write('{"username": "x"}')
+        os.replace(path + ".tmp", path)
+        assert watcher.poll() == {os.path.abspath(path)}
+        assert watcher.poll() == set()
+    finally:
+        watcher.stop()